@@ -0,0 +1,86 @@
+"""
+Benchmark of Dag.build_dag on synthetic projects up to 10,000 tasks.
+
+Compare the construction resolving the dependencies through the name index
+against the previous implementation that was scanning the names already
+added for each dependency. The time per task of the index stays constant
+as the project grows.
+
+Usage: python -m benchmarks.dag [--nb-tasks 10000] [--repeat 3]
+"""
+
+import argparse
+import time
+
+from pydwt.core.dag import Dag
+
+from benchmarks.synthetic import build_tasks, wire_container
+
+
+class ScanDag(Dag):
+    """Previous implementation of Dag.build_dag, kept as reference."""
+
+    def build_dag(self) -> None:
+        edges = []
+
+        for i, task in enumerate(self.tasks):
+            self.node_names[i] = task.name
+            self.node_index[task.name] = i
+            self.graph.add_node(i, name=task.name)
+
+            if task.depends_on:
+                for dep_func in task.depends_on:
+                    dep_name = f"{dep_func.__module__}.{dep_func.__name__}"
+                    if dep_name in self.node_names.values():
+                        dep_index = next(
+                            index
+                            for index, name in self.node_names.items()
+                            if name == dep_name
+                        )
+                    else:
+                        dep_index = len(self.node_names)
+                        self.node_names[dep_index] = dep_name
+                        self.graph.add_node(dep_index, name=dep_name)
+
+                    edges.append((dep_index, i))
+            else:
+                edges.append((self.source, i))
+
+        self.graph.add_edges_from(edges)
+
+
+def measure(dag_class, tasks, repeat: int) -> float:
+    """Return the best build time of a fresh DAG over `repeat` runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        dag = dag_class()
+        dag.tasks = tasks
+        start = time.perf_counter()
+        dag.build_dag()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def report(tasks, repeat: int) -> None:
+    scan = measure(ScanDag, tasks, repeat)
+    index = measure(Dag, tasks, repeat)
+    per_task = index / len(tasks) * 1e6
+    print(f"{len(tasks):>8} {scan:>10.3f} {index:>10.3f} {per_task:>14.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--nb-tasks", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    wire_container()
+    all_tasks = build_tasks(args.nb_tasks, lambda: None)
+    print(f"{'tasks':>8} {'scan (s)':>10} {'index (s)':>10} {'index us/task':>14}")
+    for nb_tasks in (args.nb_tasks // 8, args.nb_tasks // 4, args.nb_tasks // 2):
+        report(all_tasks[:nb_tasks], args.repeat)
+    report(all_tasks, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
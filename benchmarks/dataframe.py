@@ -0,0 +1,87 @@
+"""
+Benchmark of the SQL generated for long chains of DataFrame operations.
+
+Compare the logical plan of the DataFrame, which merges consecutive
+projections and filters in a single SELECT, against the previous
+implementation that was wrapping every operation in a new CTE.
+
+Usage: python -m benchmarks.dataframe [--steps 10 30 100] [--repeat 20]
+"""
+
+import argparse
+import time
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, select
+from sqlalchemy.dialects import postgresql
+
+from pydwt.sql.dataframe import DataFrame
+
+
+def base_table():
+    metadata = MetaData()
+    table = Table(
+        "users",
+        metadata,
+        Column("user_id", Integer, primary_key=True),
+        Column("name", String),
+        Column("age", Integer),
+    )
+    return select(table).cte()
+
+
+def nested_chain(steps: int):
+    """Chain of operations wrapping each step in a CTE, as DataFrame used to."""
+    stmt = base_table()
+    for i in range(steps):
+        kind = i % 3
+        if kind == 0:
+            stmt = select(stmt, (stmt.c.age + i).label(f"col_{i}")).cte()
+        elif kind == 1:
+            stmt = select(stmt).where(stmt.c.age > i).cte()
+        else:
+            cols = [col for col in stmt.columns if col.name != f"col_{i - 2}"]
+            stmt = select(*cols).cte()
+    return select(stmt)
+
+
+def plan_chain(steps: int):
+    """Same chain of operations with the DataFrame logical plan."""
+    df = DataFrame(base_table(), engine=None)
+    for i in range(steps):
+        kind = i % 3
+        if kind == 0:
+            df = df.with_column(f"col_{i}", df.age + i)
+        elif kind == 1:
+            df = df.where(df.age > i)
+        else:
+            df = df.drop(f"col_{i - 2}")
+    return df._plan.to_select()
+
+
+def measure(build, steps: int, repeat: int):
+    """Return (build + compile time in ms, size of the SQL in characters)."""
+    dialect = postgresql.dialect()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        sql = str(build(steps).compile(dialect=dialect))
+    elapsed = (time.perf_counter() - start) / repeat * 1000
+    return elapsed, len(sql)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--steps", type=int, nargs="+", default=[10, 30, 100])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'steps':>6}{'nested (ms)':>14}{'plan (ms)':>12}", end="")
+    print(f"{'nested (chars)':>16}{'plan (chars)':>14}")
+    for steps in args.steps:
+        nested_time, nested_size = measure(nested_chain, steps, args.repeat)
+        plan_time, plan_size = measure(plan_chain, steps, args.repeat)
+        print(f"{steps:>6}{nested_time:>14.2f}{plan_time:>12.2f}", end="")
+        print(f"{nested_size:>16}{plan_size:>14}")
+
+
+if __name__ == "__main__":
+    main()
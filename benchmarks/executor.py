@@ -0,0 +1,88 @@
+"""
+Benchmark of the ThreadExecutor on a synthetic 1,000 nodes DAG.
+
+Compare the event-driven scheduler against the previous implementation
+that was polling the parents status and requeueing the tasks still pending.
+
+Usage: python -m benchmarks.executor [--nb-tasks 1000] [--nb-workers 5]
+"""
+
+import argparse
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+
+from pydwt.core.dag import Dag
+from pydwt.core.enums import Status
+from pydwt.core.executors import ThreadExecutor
+
+from benchmarks.synthetic import build_tasks, wire_container
+
+
+@dataclass
+class RequeueThreadExecutor(ThreadExecutor):
+    """Previous implementation of the ThreadExecutor, kept as reference."""
+
+    _queue: queue.Queue = field(init=False, default_factory=queue.Queue)
+
+    def run(self) -> None:
+        for task in self.tasks:
+            self._queue.put(task)
+
+        for _ in range(0, self.nb_workers):
+            threading.Thread(target=self.worker, daemon=True).start()
+        self._queue.join()
+
+    def worker(self) -> None:
+        while not self._queue.empty():
+            task = self._queue.get()
+            try:
+                parents_status = self.dag.check_parents_status(task)
+                if parents_status == Status.ERROR:
+                    task.status = Status.ERROR
+                elif parents_status == Status.PENDING:
+                    self._queue.put(task)
+                else:
+                    task.run()
+            except Exception:
+                task.status = Status.ERROR
+            finally:
+                self._queue.task_done()
+
+
+def measure(executor_class, nb_tasks: int, nb_workers: int, work: float):
+    """Run a fresh synthetic DAG and return (wall time, cpu time)."""
+    tasks = build_tasks(nb_tasks, lambda: time.sleep(work))
+    dag = Dag()
+    dag.tasks = tasks
+    dag.build_dag()
+    executor = executor_class(dag, nb_workers=nb_workers)
+    executor.tasks = tasks
+
+    start_wall, start_cpu = time.perf_counter(), time.process_time()
+    executor.run()
+    wall, cpu = time.perf_counter() - start_wall, time.process_time() - start_cpu
+    assert all(task.status == Status.SUCCESS for task in tasks)
+    return wall, cpu
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--nb-tasks", type=int, default=1000)
+    parser.add_argument("--nb-workers", type=int, default=5)
+    parser.add_argument("--work", type=float, default=0.001, help="seconds per task")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    wire_container()
+    print(f"{args.nb_tasks} tasks, {args.nb_workers} workers, {args.work}s per task")
+    print(f"{'executor':<24}{'wall (s)':>10}{'cpu (s)':>10}")
+    for executor_class in (RequeueThreadExecutor, ThreadExecutor):
+        wall, cpu = measure(executor_class, args.nb_tasks, args.nb_workers, args.work)
+        print(f"{executor_class.__name__:<24}{wall:>10.2f}{cpu:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Benchmark of the DAG exports on synthetic projects up to 5,000 tasks.
+
+Measure the time to lay out and write the DAG as DOT, SVG and HTML, and the
+size of the output. For reference, the spring layout of the PNG export is
+measured on 400 tasks: it is quadratic in the number of tasks, and networkx
+needs scipy for it above 500 tasks.
+
+Usage: python -m benchmarks.export [--nb-tasks 5000]
+"""
+
+import argparse
+import time
+
+import networkx as nx
+
+from pydwt.core.dag import Dag
+from pydwt.core.export import to_dot, to_html, to_svg
+
+from benchmarks.synthetic import build_tasks, wire_container
+
+
+def measure(export, dag) -> tuple:
+    """Return the time of an export and the size of its output in bytes."""
+    start = time.perf_counter()
+    output = export(dag)
+    return time.perf_counter() - start, len(output.encode())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--nb-tasks", type=int, default=5_000)
+    args = parser.parse_args()
+
+    wire_container()
+    all_tasks = build_tasks(args.nb_tasks, lambda: None)
+    print(f"{'tasks':>8} {'format':>7} {'time (s)':>9} {'size (kB)':>10}")
+    for nb_tasks in (args.nb_tasks // 10, args.nb_tasks // 2, args.nb_tasks):
+        dag = Dag()
+        dag.tasks = all_tasks[:nb_tasks]
+        dag.build_dag()
+        for name, export in (("dot", to_dot), ("svg", to_svg), ("html", to_html)):
+            elapsed, size = measure(export, dag)
+            print(f"{nb_tasks:>8} {name:>7} {elapsed:>9.3f} {size / 1e3:>10.0f}")
+
+    dag = Dag()
+    dag.tasks = all_tasks[:400]
+    dag.build_dag()
+    start = time.perf_counter()
+    nx.spring_layout(dag.graph)
+    elapsed = time.perf_counter() - start
+    print(f"{400:>8} {'spring':>7} {elapsed:>9.3f} {'-':>10}")
+
+
+if __name__ == "__main__":
+    main()
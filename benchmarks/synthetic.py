@@ -0,0 +1,59 @@
+"""
+Helpers to build synthetic projects for the benchmarks.
+"""
+
+import random
+from typing import Callable, List
+from unittest import mock
+
+from pydwt.core.containers import Container
+from pydwt.core.task import Task
+
+
+def wire_container() -> Container:
+    """Wire a container to the task module, as the CLI does."""
+    container = Container()
+    container.database_client.override(mock.Mock())
+    container.wire(modules=["pydwt.core.task"])
+    return container
+
+
+def make_model(index: int, body: Callable) -> Callable:
+    """Return a model function with a unique name."""
+
+    def model():
+        body()
+
+    model.__name__ = f"model_{index}"
+    model.__qualname__ = model.__name__
+    model.__module__ = "benchmarks.synthetic_project"
+    return model
+
+
+def build_tasks(
+    nb_tasks: int, body: Callable, max_parents: int = 3, seed: int = 42
+) -> List[Task]:
+    """Build a random DAG of tasks, each task depends on up to `max_parents`
+    tasks registered before it.
+
+    Args:
+        nb_tasks (int): Number of tasks in the DAG.
+        body (Callable): Function called by every task.
+        max_parents (int): Maximum number of parents of a task.
+        seed (int): Seed of the random generator.
+
+    Returns:
+        List[Task]: Tasks in registration order.
+    """
+    rng = random.Random(seed)
+    models = []
+    tasks = []
+    for i in range(nb_tasks):
+        model = make_model(i, body)
+        nb_parents = rng.randint(0, min(max_parents, i))
+        parents = rng.sample(models[max(0, i - 50) : i], nb_parents)
+        task = Task(depends_on=parents)
+        task(model)
+        models.append(model)
+        tasks.append(task)
+    return tasks
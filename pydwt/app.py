@@ -1,19 +1,19 @@
 import traceback
+from datetime import datetime
 from typing import Dict
 import os
 import sys
 from typing import Optional
 import typer
 import yaml
-from dependency_injector.wiring import register_loader_containers
-from pydwt.core.containers import Container
+from pydwt.core.containers import Container, register_loader
 import logging
 
 config_file = "settings.yml"
 sys.path.append(os.getcwd())
 app = typer.Typer()
 container = Container()
-register_loader_containers(container)
+register_loader(container)
 
 
 def load_config(path: str) -> Dict:
@@ -35,21 +35,148 @@ def new(project_name: str):
 def run(
     name: Optional[str] = typer.Argument(None),
     with_dep: bool = typer.Option(False, "--with-dep"),
+    skip_unchanged: bool = typer.Option(
+        False,
+        "--skip-unchanged",
+        help="Skip the tasks unchanged since their last successful run.",
+    ),
+    resume: Optional[int] = typer.Option(
+        None,
+        "--resume",
+        help="Identifier of a run to resume: only its tasks that did not "
+        "succeed are run, with their descendants.",
+    ),
+    select: Optional[str] = typer.Option(
+        None,
+        "--select",
+        "-s",
+        help="Tasks to run: task names or tag:<tag>, +name for its ancestors, "
+        "name+ for its descendants, separated by spaces for a union "
+        "and by commas for an intersection.",
+    ),
+    dry_run: bool = typer.Option(
+        False,
+        "--dry-run",
+        help="Print the tasks the run would process in order, without running "
+        "them nor importing the unchanged models.",
+    ),
 ):
     """Run the workflow DAG for the current project."""
     config = load_config(path=config_file)
     container.config.from_dict(config)
     project_handler = container.project_factory()
-    project_handler.run(name, with_dep)
+    if dry_run:
+        if name:
+            full_name = f"{project_handler.name}.{project_handler.models_folder}.{name}"
+            select = f"+{full_name}" if with_dep else full_name
+        for task_name in project_handler.plan(select):
+            typer.echo(task_name)
+        return
+    project_handler.run(name, with_dep, skip_unchanged, resume, select)
 
 
 @app.command()
-def export_dag():
+def export_dag(
+    format: str = typer.Option(
+        "png",
+        "--format",
+        "-f",
+        help="png, dot (Graphviz), svg (layered layout) or html (interactive, "
+        "with search and collapsible modules). Prefer svg or html for large DAGs.",
+    ),
+):
     """Export the workflow DAG for the current project."""
     config = load_config(path=config_file)
     container.config.from_dict(config)
     project_handler = container.project_factory()
-    project_handler.export_dag()
+    project_handler.export_dag(format)
+
+
+@app.command("compile")
+def compile_project(
+    output: str = typer.Option(
+        ".pydwt/compiled.json", "--output", "-o", help="JSON file to write."
+    ),
+    sql: bool = typer.Option(
+        False,
+        "--sql",
+        help="Add the SQL of the DataFrame-based models, found by a dry run of "
+        "each model: statements are recorded, never executed.",
+    ),
+    compare: Optional[str] = typer.Option(
+        None,
+        "--compare",
+        help="Compiled manifest of a previous deployment to list the tasks "
+        "added, removed or modified since.",
+    ),
+):
+    """Write the compiled manifest describing the tasks of the current project."""
+    config = load_config(path=config_file)
+    container.config.from_dict(config)
+    project_handler = container.project_factory()
+    # Read first, the previous manifest may be the one overwritten
+    from pydwt.core import compiler
+
+    previous = compiler.load(compare) if compare is not None else None
+    manifest = project_handler.compile(output, sql)
+    if previous is not None:
+        changes = compiler.diff(previous, manifest)
+        for change, sign in (("added", "+"), ("removed", "-"), ("modified", "~")):
+            for name in changes[change]:
+                typer.echo(f"{sign} {name}")
+
+
+@app.command()
+def history(
+    report: str = typer.Argument(
+        "percentiles", help="percentiles, slowest, regressions or runs"
+    ),
+    limit: int = typer.Option(
+        10, help="Number of tasks of the slowest report, or of runs of the runs report."
+    ),
+    last_runs: int = typer.Option(10, help="Number of runs of each task considered."),
+    threshold: float = typer.Option(
+        1.5, help="Minimal slowdown of the last run reported as a regression."
+    ),
+):
+    """Report the durations of the tasks recorded in the run history."""
+    config = load_config(path=config_file)
+    container.config.from_dict(config)
+    run_history = container.history()
+    if report == "percentiles":
+        typer.echo(f"{'task':<60} {'runs':>5} {'p50 (s)':>9} {'p95 (s)':>9}")
+        for stat in run_history.percentiles(last_runs):
+            typer.echo(
+                f"{stat.name:<60} {stat.runs:>5} {stat.p50:>9.2f} {stat.p95:>9.2f}"
+            )
+    elif report == "slowest":
+        typer.echo(f"{'task':<60} {'p50 (s)':>9} {'last (s)':>9}")
+        for stat in run_history.slowest(limit, last_runs):
+            typer.echo(f"{stat.name:<60} {stat.p50:>9.2f} {stat.last:>9.2f}")
+    elif report == "regressions":
+        typer.echo(f"{'task':<60} {'baseline (s)':>12} {'last (s)':>9} {'ratio':>6}")
+        for regression in run_history.regressions(last_runs, threshold):
+            typer.echo(
+                f"{regression.name:<60} {regression.baseline:>12.2f} "
+                f"{regression.last:>9.2f} {regression.ratio:>6.2f}"
+            )
+    elif report == "runs":
+        typer.echo(
+            f"{'run':>6} {'started at':<19} {'duration (s)':>12} {'ok':>5} {'error':>5}"
+        )
+        for summary in run_history.runs(limit):
+            started_at = datetime.fromtimestamp(summary.started_at)
+            duration = (
+                f"{summary.ended_at - summary.started_at:>12.2f}"
+                if summary.ended_at is not None
+                else f"{'not ended':>12}"
+            )
+            typer.echo(
+                f"{summary.run_id:>6} {started_at:%Y-%m-%d %H:%M:%S} {duration} "
+                f"{summary.succeeded:>5} {summary.failed:>5}"
+            )
+    else:
+        raise typer.BadParameter(f"unknown report {report}")
 
 
 @app.command()
@@ -1,21 +1,163 @@
+import logging
+import os
+import threading
 from dataclasses import dataclass, field
-from typing import Dict
-from sqlalchemy import create_engine, Engine
+from typing import Any, Dict
+from sqlalchemy import create_engine, event, Engine
+
+# Keys of the `pool` section of the connection settings
+# and the create_engine arguments they are forwarded to.
+POOL_PARAMS = {
+    "size": "pool_size",
+    "max_overflow": "max_overflow",
+    "pre_ping": "pool_pre_ping",
+    "recycle": "pool_recycle",
+    "timeout": "pool_timeout",
+}
+
+# Methods of the DBAPI connections cancelling the statement they are running,
+# from another thread: psycopg2 and psycopg provide `cancel`, sqlite3 `interrupt`.
+CANCEL_METHODS = ("cancel", "interrupt")
+
+
+@dataclass
+class PoolMetrics(object):
+    """Checkout metrics of a connection pool.
+
+    Attributes:
+        connects (int): Number of DBAPI connections opened by the pool.
+        checkouts (int): Number of connections checked out of the pool.
+        checkins (int): Number of connections returned to the pool.
+        in_use (int): Number of connections currently checked out.
+        peak_in_use (int): Maximum number of connections checked out at once.
+    """
+
+    connects: int = 0
+    checkouts: int = 0
+    checkins: int = 0
+    in_use: int = 0
+    peak_in_use: int = 0
+    _lock: threading.Lock = field(
+        init=False, default_factory=threading.Lock, repr=False, compare=False
+    )
+
+    def on_connect(self, *args) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def on_checkout(self, *args) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+
+    def on_checkin(self, *args) -> None:
+        with self._lock:
+            self.checkins += 1
+            self.in_use -= 1
 
 
 @dataclass
 class Connection(object):
     """Class representing a connection to a database.
 
+    The engine, and its connection pool, is created on the first call
+    to `get_engine` and then shared by every caller until `dispose`.
+
     Attributes:
         params (Dict): containning SQL alchemy DB url and Kwargs forwarded
-        to create_engine.
+        to create_engine. The optional `pool` key holds the pool settings:
+        size, max_overflow, pre_ping, recycle and timeout.
 
         engine (sqlalchemy.engine.Engine): Database engine.
+        metrics (PoolMetrics): Checkout metrics of the engine pool.
+
+    The DBAPI connection running a statement is tracked by thread,
+    so that a statement can be cancelled from another thread with `cancel`.
     """
 
     params: Dict
     engine: Engine = field(init=False, default=None)
+    metrics: PoolMetrics = field(init=False, default_factory=PoolMetrics)
+    _pid: int = field(init=False, default=None, repr=False)
+    _statements: Dict[int, Any] = field(
+        init=False, default_factory=dict, repr=False, compare=False
+    )
+    _lock: threading.Lock = field(
+        init=False, default_factory=threading.Lock, repr=False, compare=False
+    )
+
+    def get_engine(self) -> Engine:
+        """Return the engine of the connection, create it if needed.
+
+        An engine inherited from a parent process through fork is not reused,
+        the child process creates its own engine.
+        """
+        with self._lock:
+            if self.engine is not None and self._pid != os.getpid():
+                self.engine.dispose(close=False)
+                self.engine = None
+            if self.engine is None:
+                self.engine = self._create_engine()
+                self._pid = os.getpid()
+            return self.engine
+
+    def cancel(self, thread_id: int) -> bool:
+        """Cancel the statement run by a thread, if any.
+
+        The thread running the statement gets the error raised
+        by the database driver for a cancelled statement.
+
+        Args:
+            thread_id (int): Identifier of the thread running the statement.
+
+        Returns:
+            bool: True if a statement was cancelled.
+        """
+        dbapi_connection = self._statements.get(thread_id)
+        if dbapi_connection is None:
+            return False
+        for method in CANCEL_METHODS:
+            cancel = getattr(dbapi_connection, method, None)
+            if cancel is not None:
+                logging.warning(f"cancelling the statement of thread {thread_id}")
+                cancel()
+                return True
+        logging.warning(
+            f"can not cancel the statement of thread {thread_id}: "
+            f"{type(dbapi_connection).__name__} does not support cancellation"
+        )
+        return False
+
+    def dispose(self) -> None:
+        """Close all the connections of the pool and drop the engine."""
+        with self._lock:
+            if self.engine is None:
+                return
+            self.engine.dispose()
+            self.engine = None
+        logging.info(f"connection pool disposed: {self.metrics}")
+
+    def _create_engine(self) -> Engine:
+        params = dict(self.params)
+        pool = params.pop("pool", None) or {}
+        for key, value in pool.items():
+            if key not in POOL_PARAMS:
+                raise ValueError(f"Unsupported pool setting: {key}")
+            params[POOL_PARAMS[key]] = value
+
+        engine = create_engine(**params)
+        self.metrics = PoolMetrics()
+        event.listen(engine, "connect", self.metrics.on_connect)
+        event.listen(engine, "checkout", self.metrics.on_checkout)
+        event.listen(engine, "checkin", self.metrics.on_checkin)
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+        event.listen(engine, "after_cursor_execute", self._on_executed)
+        event.listen(engine, "handle_error", self._on_executed)
+        return engine
+
+    def _on_execute(self, conn, *args) -> None:
+        self._statements[threading.get_ident()] = conn.connection.dbapi_connection
 
-    def get_engine(self):
-        return create_engine(**self.params)
+    def _on_executed(self, *args) -> None:
+        self._statements.pop(threading.get_ident(), None)
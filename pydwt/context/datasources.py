@@ -1,5 +1,6 @@
 from dataclasses import dataclass
 from pydwt.sql.session import Session
+from pydwt.sql.metadata_cache import MetadataCache
 from pydwt.context.connection import Connection
 from typing import Dict
 
@@ -10,11 +11,13 @@ class Datasources(object):
 
     Attributes:
         referentiel (dict): A dictionary that contains metadata about the database.
-        engine (Any): A SQLAlchemy engine object that connects to the database.
+        connection (Connection): The connection to the database.
+        metadata_cache (MetadataCache): Cache of the reflected tables.
     """
 
     referentiel: Dict[str, dict]
     connection: Connection
+    metadata_cache: MetadataCache = None
 
     def get_source(self, name: str):
         """Returns a SQLAlchemy Table object for a given data source.
@@ -29,7 +32,9 @@ class Datasources(object):
         config = self.referentiel[name]
         engine = self.connection.get_engine()
         # Create a Session object for the schema that contains the table
-        session = Session(engine=engine, schema=config["schema"])
+        session = Session(
+            engine=engine, schema=config["schema"], metadata_cache=self.metadata_cache
+        )
 
         # Return a Table object for the table in the data source
         return session.table(config["table"])
@@ -0,0 +1,140 @@
+"""
+Module that provide the compiled manifest of a project, a JSON description of
+its whole DAG.
+
+For every task the manifest holds its dependencies, tags, schedule, resource
+pool, the materialization of its `tasks` settings and a fingerprint of its
+source code and settings. Compiled with the SQL, it also holds what the
+DataFrame-based models send to the database, found by a dry run of each model
+(see `pydwt.sql.dry_run`): the target, materialization type and SELECT of
+their materializations and their other statements, recorded, never executed.
+
+The manifest is plain JSON so that orchestration layers read it without
+importing the models, and two manifests are compared with `diff` to find the
+tasks changed between two deployments.
+"""
+
+import asyncio
+import dataclasses
+import inspect
+import json
+import logging
+import os
+import time
+from typing import Dict, List
+
+from pydwt.core.fingerprint import fingerprint, source_code
+
+# Version of the manifest format
+COMPILED_VERSION = 1
+
+
+def compile_tasks(tasks: List, sql: bool = False) -> Dict:
+    """Describe the tasks of a project.
+
+    Args:
+        tasks (List[Task]): The registered tasks.
+        sql (bool): True to add the SQL of the DataFrame-based models, found
+        by a dry run of each task.
+
+    Returns:
+        Dict: The manifest, with the tasks by name.
+    """
+    compiled = {}
+    for task in sorted(tasks, key=lambda task: task.name):
+        config = task.config if isinstance(task.config, dict) else {}
+        task_config = (config.get("tasks") or {}).get(task._task.__name__) or {}
+        entry = {
+            "module": task._task.__module__,
+            "depends_on": sorted(task.depends_on_name),
+            "tags": list(task.tags or []),
+            "schedule": _schedule(task.runs_on),
+            "pool": task.pool,
+            "slots": task.slots,
+            "materialize": task_config.get("materialize"),
+            "fingerprint": fingerprint([source_code(task._task), task_config]),
+        }
+        if sql:
+            entry.update(_trace(task))
+        compiled[task.name] = entry
+    return {"version": COMPILED_VERSION, "compiled_at": time.time(), "tasks": compiled}
+
+
+def save(manifest: Dict, path: str) -> None:
+    """Write a manifest to a JSON file, atomically."""
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True, default=str)
+    os.replace(tmp_path, path)
+
+
+def load(path: str) -> Dict:
+    """Read a manifest written by `save`.
+
+    Raises:
+        ValueError: If the file is not a manifest of this version.
+    """
+    with open(path) as f:
+        manifest = json.load(f)
+    if manifest.get("version") != COMPILED_VERSION:
+        raise ValueError(
+            f"{path} is not a compiled manifest of version {COMPILED_VERSION}"
+        )
+    return manifest
+
+
+def diff(old: Dict, new: Dict) -> Dict[str, List[str]]:
+    """Compare the tasks of two manifests.
+
+    Returns:
+        Dict[str, List[str]]: The names of the tasks `added`, `removed` and
+        `modified` from the old manifest to the new one.
+    """
+    old_tasks, new_tasks = old["tasks"], new["tasks"]
+    return {
+        "added": sorted(set(new_tasks) - set(old_tasks)),
+        "removed": sorted(set(old_tasks) - set(new_tasks)),
+        "modified": sorted(
+            name
+            for name in set(old_tasks) & set(new_tasks)
+            if old_tasks[name] != new_tasks[name]
+        ),
+    }
+
+
+def _schedule(schedule) -> Dict:
+    """Describe a schedule by its type and parameters."""
+    params = {}
+    if dataclasses.is_dataclass(schedule):
+        params = {
+            field.name: getattr(schedule, field.name)
+            for field in dataclasses.fields(schedule)
+            if field.name != "calendar"
+        }
+    return {"type": type(schedule).__name__, **params}
+
+
+def _trace(task) -> Dict:
+    """Dry run a task, see `pydwt.sql.dry_run`.
+
+    Returns:
+        Dict: The `materializations` and `statements` recorded, up to the
+        error stopping the dry run if any, logged as a warning.
+    """
+    # Only tracing needs SQLAlchemy
+    from pydwt.sql.dry_run import dry_run
+
+    with dry_run() as recorded:
+        try:
+            result = task._task()
+            if inspect.isawaitable(result):
+                asyncio.run(result)
+        except Exception as e:
+            logging.warning(f"dry run of task {task.name} stopped: {e}")
+    return {
+        "materializations": recorded.materializations,
+        "statements": recorded.statements,
+    }
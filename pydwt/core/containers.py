@@ -8,49 +8,174 @@ config is a configuration provider that should be used to provide
 a dictionary of configuration settings.
 database_client is a Connection provider which is used to create
 a database connection with the configuration provided.
+metadata_cache is a provider that returns the cache of the reflected tables
+shared by the sessions.
 datasources is a provider that returns a Datasources instance,
 which can be used to retrieve tables or views from the database.
+history is a provider that returns the store of the runs of the workflow.
+state is a provider that returns the fingerprints of the last successful run
+of the tasks.
+pools is a provider that returns the slots of the resource pools
+defined in the pools settings.
 cache_strategy is a provider that should be used to provide a cache strategy instance.
+executor_factory is a provider that returns the executor selected by the
+executor.type setting: a ThreadExecutor ("thread"), a ProcessExecutor ("process")
+or an AsyncExecutor ("asyncio").
 workflow_factory is a provider that returns a Workflow instance,
 which is used to execute tasks for a given DAG.
 project_factory is a provider that returns a Project instance,
 which is a collection of tasks that can be executed together as a single unit.
+
+The classes depending on SQLAlchemy or networkx are only imported when their
+provider is first called, so that the CLI commands that do not need them
+start without loading them.
 """
 
+import importlib
+from typing import Callable
+
 from dependency_injector import containers, providers
-from pydwt.context.connection import Connection
-from pydwt.core.workflow import Workflow
-from pydwt.core.dag import Dag
+from dependency_injector.wiring import register_loader_containers
+from pydwt.core.history import RunHistory
+from pydwt.core.pools import ResourcePools
 from pydwt.core.project import Project
-from pydwt.context.datasources import Datasources
-from pydwt.core.executors import ThreadExecutor
+
+
+def lazy(path: str) -> Callable:
+    """Return a callable importing the class at `path` on its first call,
+    then building an instance of it.
+
+    Args:
+        path (str): Full path of the class, `module.ClassName`.
+    """
+    module_name, class_name = path.rsplit(".", 1)
+
+    def build(*args, **kwargs):
+        cls = getattr(importlib.import_module(module_name), class_name)
+        return cls(*args, **kwargs)
+
+    build.__qualname__ = build.__name__ = class_name
+    return build
+
+
+# Packages the auto-wiring loader never wires: they inject nothing and wiring
+# the modules of pyarrow, or of pandas, crashes the interpreter
+UNWIRED_PACKAGES = ("pyarrow", "pandas")
+
+
+class _LoaderWiring(object):
+    """Wiring of a container by the auto-wiring loader, skipping the modules
+    of `UNWIRED_PACKAGES`."""
+
+    def __init__(self, container) -> None:
+        self.container = container
+
+    def wire(self, modules) -> None:
+        modules = [
+            module
+            for module in modules
+            if module.__name__.partition(".")[0] not in UNWIRED_PACKAGES
+        ]
+        if modules:
+            self.container.wire(modules=modules)
+
+
+def register_loader(container) -> None:
+    """Wire a container to the modules imported from now on, such as the
+    models of the project, except the modules of `UNWIRED_PACKAGES`.
+
+    Args:
+        container (Container): The container to wire.
+    """
+    register_loader_containers(_LoaderWiring(container))
 
 
 class Container(containers.DeclarativeContainer):
     # Configuration provider, contains the project configuration
-    config = providers.Configuration()
+    config = providers.Configuration(
+        default={
+            "executor": {"type": "thread", "nb_workers": 5, "max_concurrency": 100},
+            "history": {"path": ".pydwt/history.db"},
+            "state": {"path": ".pydwt/state.json"},
+            "discovery": {"manifest": ".pydwt/models.json"},
+        }
+    )
 
     # Singleton provider that provides the database connection instance
     database_client = providers.ThreadSafeSingleton(
-        Connection,
+        lazy("pydwt.context.connection.Connection"),
         config.connection,
     )
 
+    # Singleton provider that provides the cache of the reflected tables
+    metadata_cache = providers.ThreadSafeSingleton(
+        lazy("pydwt.sql.metadata_cache.MetadataCache"),
+        path=config.metadata_cache.path,
+        ttl_minutes=config.metadata_cache.ttl_minutes,
+    )
+
     # Singleton provider that provides the datasources instance
     datasources = providers.ThreadSafeSingleton(
-        Datasources, config.sources, database_client
+        lazy("pydwt.context.datasources.Datasources"),
+        config.sources,
+        database_client,
+        metadata_cache,
+    )
+
+    # Singleton provider that provides the store of the runs of the workflow
+    history = providers.ThreadSafeSingleton(RunHistory, path=config.history.path)
+
+    # Singleton provider that provides the state of the tasks between runs
+    state = providers.ThreadSafeSingleton(
+        lazy("pydwt.core.state.RunState"), path=config.state.path
     )
 
-    dag_factory = providers.ThreadSafeSingleton(Dag)
+    # Singleton provider that provides the slots of the resource pools
+    pools = providers.ThreadSafeSingleton(ResourcePools, config.pools)
+
+    dag_factory = providers.ThreadSafeSingleton(lazy("pydwt.core.dag.Dag"))
 
-    executor_factory = providers.Factory(ThreadExecutor, nb_workers=5, dag=dag_factory)
+    executor_factory = providers.Selector(
+        config.executor.type,
+        thread=providers.Factory(
+            lazy("pydwt.core.executors.ThreadExecutor"),
+            nb_workers=config.executor.nb_workers.as_int(),
+            dag=dag_factory,
+            pools=pools,
+        ),
+        process=providers.Factory(
+            lazy("pydwt.core.executors.ProcessExecutor"),
+            nb_workers=config.executor.nb_workers.as_int(),
+            dag=dag_factory,
+            pools=pools,
+            config=config,
+            metadata_cache=metadata_cache,
+        ),
+        asyncio=providers.Factory(
+            lazy("pydwt.core.executors.AsyncExecutor"),
+            nb_workers=config.executor.nb_workers.as_int(),
+            max_concurrency=config.executor.max_concurrency.as_int(),
+            dag=dag_factory,
+            pools=pools,
+        ),
+    )
 
     # Singleton provider that provides the workflow instance
     workflow_factory = providers.ThreadSafeSingleton(
-        Workflow, dag=dag_factory, executor=executor_factory
+        lazy("pydwt.core.workflow.Workflow"),
+        dag=dag_factory,
+        executor=executor_factory,
+        connection=database_client,
+        metadata_cache=metadata_cache,
+        history=history,
+        state=state,
+        timeout=config.workflow.timeout,
     )
 
     # Factory provider that provides the project instance
     project_factory = providers.Factory(
-        Project, workflow=workflow_factory, name=config.project.name
+        Project,
+        workflow=workflow_factory,
+        name=config.project.name,
+        manifest_path=config.discovery.manifest,
     )
@@ -1,6 +1,7 @@
 import networkx as nx
 from typing import Dict
 from pydwt.core.enums import Status
+from pydwt.core.selector import select_tasks
 import logging
 
 
@@ -8,8 +9,12 @@ class Dag(object):
     """DAG class to handle graph creation, traversal and saving the output.
 
     Attributes:
-        tasks (List): List of tasks to build the dag from.
+        tasks (List): List of tasks to build the dag from, or of the task
+        entries of the model manifest, the dependencies are resolved with
+        their `depends_on_name`.
         graph (nx.DiGraph): Directed Graph that holds the task relationships.
+        unselected (Set[str]): Names of the tasks left out by `select`, the
+        dependencies on them are considered satisfied.
     """
 
     def __init__(self) -> None:
@@ -19,6 +24,7 @@ class Dag(object):
         self.source = "s"
         self.node_index = {}
         self.node_names = {}
+        self.unselected = set()
 
     @property
     def tasks(self):
@@ -29,31 +35,35 @@ class Dag(object):
         self._tasks = value
 
     def build_dag(self) -> None:
-        """Build the directed acyclic graph from the tasks and their dependencies."""
-        edges = []
+        """Build the directed acyclic graph from the tasks and their dependencies.
+
+        The graph is rebuilt from scratch: the tasks are indexed first, then
+        every dependency is resolved by name in the index, so a task may depend
+        on a task registered after it. Dependencies on tasks left out by
+        `select` are skipped.
 
+        Raises:
+            ValueError: If a dependency is not one of the tasks.
+        """
+        self.graph = nx.DiGraph()
+        self.node_names = {i: task.name for i, task in enumerate(self.tasks)}
+        self.node_index = {name: i for i, name in self.node_names.items()}
+        self.graph.add_nodes_from(
+            (i, {"name": name}) for i, name in self.node_names.items()
+        )
+
+        edges = []
         for i, task in enumerate(self.tasks):
-            self.node_names[i] = task.name
-            self.node_index[task.name] = i
-            self.graph.add_node(i, name=task.name)
-
-            if task.depends_on:
-                for dep_func in task.depends_on:
-                    dep_name = f"{dep_func.__module__}.{dep_func.__name__}"
-                    if dep_name in self.node_names.values():
-                        dep_index = next(
-                            index
-                            for index, name in self.node_names.items()
-                            if name == dep_name
-                        )
-                    else:
-                        dep_index = len(self.node_names)
-                        self.node_names[dep_index] = dep_name
-                        self.graph.add_node(dep_index, name=dep_name)
-
-                    edges.append((dep_index, i))
-            else:
-                edges.append((self.source, i))
+            parents = []
+            for dep_name in task.depends_on_name:
+                dep_index = self.node_index.get(dep_name)
+                if dep_index is not None:
+                    parents.append(dep_index)
+                elif dep_name not in self.unselected:
+                    raise ValueError(
+                        f"Task {task.name} depends on {dep_name} which is not a task"
+                    )
+            edges.extend((parent, i) for parent in parents or [self.source])
 
         self.graph.add_edges_from(edges)
 
@@ -148,3 +158,22 @@ class Dag(object):
         self.tasks = filtred_tasks
         self.build_dag()
 
+    def select(self, selector: str) -> None:
+        """Filter the DAG to the tasks picked by a selector.
+
+        The selector syntax is described in `pydwt.core.selector`, for instance
+        `orders+` keeps the task orders and all its descendants. The
+        dependencies on the tasks that are not selected are considered
+        satisfied.
+
+        Args:
+            selector (str): The selector of the tasks to keep.
+
+        Raises:
+            ValueError: If the selector is invalid or one of its task names
+            matches no task.
+        """
+        names = select_tasks(self, selector)
+        self.unselected |= {task.name for task in self.tasks if task.name not in names}
+        self.tasks = [task for task in self.tasks if task.name in names]
+        self.build_dag()
@@ -0,0 +1,180 @@
+"""
+Module that provide the discovery of the models of a project.
+
+The model files are found recursively in the models folder and described in a
+JSON manifest: the path, modification time and size of each file, and the
+name, dependencies and tags of the tasks it registers. A file is only imported
+again when it changed since the manifest was written, so the DAG of a project
+can be built, selected and drawn from the manifest alone, and a partial run
+only imports the modules of the tasks it runs.
+"""
+
+import importlib
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterable, List, Set
+
+# Version of the manifest format, a manifest of another version is discarded
+MANIFEST_VERSION = 1
+
+
+@dataclass
+class TaskEntry(object):
+    """Task of a model file, as described in the manifest.
+
+    Has the attributes of a Task needed to build and select a DAG.
+
+    Attributes:
+        name (str): Full name of the task, `module.function_name`.
+        depends_on_name (List[str]): Full names of the parents of the task.
+        tags (List[str]): Tags of the task.
+    """
+
+    name: str
+    depends_on_name: List[str] = field(default_factory=list)
+    tags: List[str] = field(default_factory=list)
+
+
+@dataclass
+class ModelFile(object):
+    """Model file of the project, as described in the manifest.
+
+    Attributes:
+        module (str): Name of the module of the file.
+        mtime (float): Modification time of the file.
+        size (int): Size of the file in bytes.
+        tasks (List[TaskEntry]): Tasks registered by the module.
+    """
+
+    module: str
+    mtime: float
+    size: int
+    tasks: List[TaskEntry] = field(default_factory=list)
+
+
+class ModelManifest(object):
+    """Manifest of the model files of a project.
+
+    Args:
+        path (str): Path of the JSON file the manifest is persisted to.
+        Without path the manifest is not persisted and every model is imported.
+    """
+
+    def __init__(self, path: str = None) -> None:
+        self.path = path
+        self.files: Dict[str, ModelFile] = None
+
+    def refresh(
+        self, folder: str, package: str, tasks: List, import_all: bool = False
+    ) -> List[TaskEntry]:
+        """Find the model files, import the files changed since the manifest
+        was written and persist the manifest.
+
+        Args:
+            folder (str): Path of the models folder.
+            package (str): Name of the package of the models folder.
+            tasks (List[Task]): Registry the tasks of an imported model
+            append themselves to.
+            import_all (bool): True to import every model file.
+
+        Returns:
+            List[TaskEntry]: The tasks of all the model files.
+        """
+        known = self._load()
+        self.files = {}
+        changed = 0
+        for path, module in _find_models(folder, package):
+            stat = os.stat(path)
+            entry = known.get(path)
+            if (
+                import_all
+                or entry is None
+                or entry.mtime != stat.st_mtime
+                or entry.size != stat.st_size
+            ):
+                importlib.import_module(module)
+                entry = ModelFile(module, stat.st_mtime, stat.st_size)
+                # A module imported again registers its tasks again
+                registered = {
+                    task.name: TaskEntry(
+                        task.name, task.depends_on_name, list(task.tags or [])
+                    )
+                    for task in tasks
+                    if task._task.__module__ == module
+                }
+                entry.tasks = list(registered.values())
+                changed += 1
+            self.files[path] = entry
+        logging.info(
+            f"{len(self.files)} model files found, {changed} imported "
+            f"as new or changed"
+        )
+        self.save()
+        return [task for entry in self.files.values() for task in entry.tasks]
+
+    def modules(self, task_names: Iterable[str]) -> Set[str]:
+        """Return the modules registering some tasks.
+
+        Args:
+            task_names (Iterable[str]): Full names of the tasks.
+        """
+        task_names = set(task_names)
+        return {
+            entry.module
+            for entry in (self.files or {}).values()
+            if any(task.name in task_names for task in entry.tasks)
+        }
+
+    def save(self) -> None:
+        """Persist the manifest to its file, if any."""
+        if self.path is None or self.files is None:
+            return
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        content = {
+            "version": MANIFEST_VERSION,
+            "files": {path: asdict(entry) for path, entry in self.files.items()},
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(content, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def _load(self) -> Dict[str, ModelFile]:
+        """Load the persisted manifest, empty if there is none."""
+        if self.path is None or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path) as f:
+                content = json.load(f)
+            if content.get("version") != MANIFEST_VERSION:
+                return {}
+            return {
+                path: ModelFile(
+                    entry["module"],
+                    entry["mtime"],
+                    entry["size"],
+                    [TaskEntry(**task) for task in entry["tasks"]],
+                )
+                for path, entry in content["files"].items()
+            }
+        except Exception as e:
+            logging.warning(f"can not load model manifest {self.path}: {e}")
+            return {}
+
+
+def _find_models(folder: str, package: str):
+    """Yield the path and module name of every model file under a folder,
+    in a stable order."""
+    for root, dirs, files in os.walk(folder):
+        dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+        relative = os.path.relpath(root, folder)
+        prefix = package
+        if relative != ".":
+            prefix = f"{package}.{relative.replace(os.sep, '.')}"
+        for file in sorted(files):
+            if file.endswith(".py") and file != "__init__.py":
+                yield os.path.join(root, file), f"{prefix}.{file[:-3]}"
@@ -5,3 +5,4 @@ class Status(enum.Enum):
     ERROR = 0
     SUCCESS = 1
     PENDING = 2
+    SKIPPED = 3
@@ -1,11 +1,31 @@
+import asyncio
+import heapq
+import importlib
+import itertools
+import math
+import multiprocessing
 import queue
 import threading
+import time
 from abc import ABC
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
 from dataclasses import dataclass, field
-from typing import Any, List
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from pydwt.core.enums import Status
+from pydwt.core.pools import ResourcePools
+from pydwt.core.scheduler import DependencyScheduler
 import logging
 
+# Seconds an executor waits for an attempt to return once its task is
+# cancelled, before setting the task in ERROR and moving on without it.
+CANCEL_GRACE = 5.0
+
 
 class AbstractExecutor(ABC):
     nb_workers: int
@@ -29,38 +49,519 @@ class AbstractExecutor(ABC):
 
 @dataclass
 class ThreadExecutor(AbstractExecutor):
+    """Executor running the tasks in a pool of threads.
+
+    Attributes:
+        dag (Dag): DAG object for the tasks.
+        nb_workers (int): Number of threads.
+        durations (Dict[str, float]): Duration of the tasks in previous runs,
+        used to run the tasks of the critical path first.
+        on_finish (Callable): Optional callback called with each finished task.
+        cancel_grace (float): Seconds to wait for a cancelled task before
+        setting it in ERROR and replacing its worker.
+        pools (ResourcePools): Slots of the resource pools used by the tasks.
+    """
+
     dag: Any
     nb_workers: int = 2
-    _queue: queue.Queue = field(init=False, default_factory=queue.Queue)
+    durations: Dict[str, float] = field(default_factory=dict)
+    on_finish: Callable = None
+    cancel_grace: float = CANCEL_GRACE
+    pools: ResourcePools = field(default_factory=ResourcePools)
+    _queue: queue.PriorityQueue = field(init=False, default_factory=queue.PriorityQueue)
+    _ready: List = field(init=False, default_factory=list)
+    _scheduler: DependencyScheduler = field(init=False, default=None)
+    _counter: Any = field(init=False, default=None)
+    _lock: threading.Lock = field(init=False, default_factory=threading.Lock)
+    _workers: List[threading.Thread] = field(init=False, default_factory=list)
+    _running: Dict[str, Any] = field(init=False, default_factory=dict)
 
     def run(self) -> None:
-        """Run all workers"""
-        for task in self.tasks:
-            self._queue.put(task)
+        """Run all workers until every task of the DAG is finished.
+
+        Tasks are put in the queue only once all their parents are finished
+        and the slots they take in their pool are free, workers pull the task
+        with the highest priority first, block on the queue and are stopped
+        when the DAG is done. A failed attempt to retry
+        is put back in the queue after its delay, without holding a worker.
+        A worker still blocked `cancel_grace` seconds after the deadline of its
+        task is left behind: the task is set in ERROR and a new worker started.
+        """
+        self.pools.check(self.tasks)
+        self._queue = queue.PriorityQueue()
+        self._ready = []
+        self._counter = itertools.count()
+        self._scheduler = DependencyScheduler(
+            self.dag, self.tasks, self.durations, self.on_finish
+        )
+        self._workers = []
+        self._running = {}
+        for task in self._scheduler.start():
+            self._put(task)
 
         for _ in range(0, self.nb_workers):
-            threading.Thread(target=self.worker, daemon=True).start()
-        self._queue.join()
+            self._start_worker()
+
+        self._scheduler.wait()
+        with self._lock:
+            workers = list(self._workers)
+        for _ in workers:
+            self._queue.put((math.inf, next(self._counter), None, False))
+        for worker in workers:
+            worker.join()
+
+    def _start_worker(self) -> None:
+        worker = threading.Thread(target=self.worker, daemon=True)
+        with self._lock:
+            self._workers.append(worker)
+        worker.start()
+
+    def _put(self, task, retrying: bool = False) -> None:
+        """Make a task ready, by decreasing priority then by release order,
+        and dispatch the ready tasks."""
+        priority = self._scheduler.priority(task)
+        with self._lock:
+            heapq.heappush(
+                self._ready, (-priority, next(self._counter), task, retrying)
+            )
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Queue the ready tasks whose slots are free, the others stay ready
+        until slots are released."""
+        with self._lock:
+            waiting = []
+            while self._ready:
+                item = heapq.heappop(self._ready)
+                if self.pools.acquire(item[2]):
+                    self._queue.put(item)
+                else:
+                    waiting.append(item)
+            for item in waiting:
+                heapq.heappush(self._ready, item)
+
+    def _release(self, task) -> None:
+        """Free the slots of a task and dispatch the tasks waiting for them."""
+        self.pools.release(task)
+        self._dispatch()
+
+    def _retry_later(self, task, delay: float) -> None:
+        """Queue the next attempt of a task once its delay is elapsed."""
+        timer = threading.Timer(delay, self._put, (task, True))
+        timer.daemon = True
+        timer.start()
 
     def worker(self) -> None:
-        """Pull a task from the queue and process"""
-        while not self._queue.empty():
-            task = self._queue.get()
+        """Pull a task from the queue, run one attempt of it and queue
+        its retry or the children it released"""
+        while True:
+            _, _, task, retrying = self._queue.get()
+            if task is None:
+                self._queue.task_done()
+                break
+            delay = None
+            attempt = object()
+            abandon = None
             try:
-                parents_status = self.dag.check_parents_status(task)
-                if parents_status == Status.ERROR:
-                    logging.error(
-                        f"task {task.name} can not be run because\
-                        some parent are in ERROR"
-                    )
-                    task.status = Status.ERROR
-                elif parents_status == Status.PENDING:
-                    logging.info(f"task {task.name} is pending")
-                    self._queue.put(task)
-                else:
-                    task.run()
+                if retrying or task.begin():
+                    with self._lock:
+                        self._running[task.name] = attempt, threading.current_thread()
+                    abandon = self._abandon_later(task, attempt)
+                    delay = task.attempt()
             except Exception as e:
                 logging.error(f"task {task.name} failed with error: {e}")
                 task.status = Status.ERROR
             finally:
+                if abandon is not None:
+                    abandon.cancel()
                 self._queue.task_done()
+                with self._lock:
+                    running = self._running.pop(task.name, (attempt, None))
+                    abandoned = running[0] is not attempt
+            if abandoned:
+                # The task was finished and this worker replaced meanwhile
+                break
+            self._release(task)
+            if delay is not None:
+                self._retry_later(task, delay)
+            else:
+                self._finish(task)
+
+    def _finish(self, task) -> None:
+        for child in self._scheduler.finish(task):
+            self._put(child)
+
+    def _abandon_later(self, task, attempt) -> Optional[threading.Timer]:
+        """Start a timer abandoning the attempt of a task that is still
+        running `cancel_grace` seconds after the deadline of the task."""
+        if task.deadline is None:
+            return None
+        delay = max(0, task.deadline - time.time()) + self.cancel_grace
+        timer = threading.Timer(delay, self._abandon, (task, attempt))
+        timer.daemon = True
+        timer.start()
+        return timer
+
+    def _abandon(self, task, attempt) -> None:
+        """Set in ERROR a task whose attempt did not return once cancelled,
+        release its children and replace the worker blocked by the attempt."""
+        with self._lock:
+            running_attempt, worker = self._running.get(task.name, (None, None))
+            if running_attempt is not attempt:
+                return
+            self._running[task.name] = None, worker
+            self._workers.remove(worker)
+        logging.error(
+            f"task {task.name} did not stop {self.cancel_grace} seconds "
+            "after being cancelled: moving on without it"
+        )
+        task.status = Status.ERROR
+        task.ended_at = time.time()
+        self._start_worker()
+        self._release(task)
+        self._finish(task)
+
+
+# Dependency container of a worker process of the ProcessExecutor
+_worker_container = None
+
+# Attributes of a task sent to a worker process with each attempt,
+# and reported back once the attempt is run
+_RUN_ATTRIBUTES = (
+    "status",
+    "_count_call",
+    "started_at",
+    "ended_at",
+    "row_count",
+    "deadline",
+    "_cancelled",
+)
+
+
+def _initialize_worker(config: Dict, log_level: int) -> None:
+    """Build the dependency container of a worker process.
+
+    Workers are spawned, not forked: nothing is inherited from the parent
+    process, so each worker creates its own database connection and engine.
+
+    Args:
+        config (Dict): Configuration of the project.
+        log_level (int): Logging level of the parent process.
+    """
+    global _worker_container
+    from pydwt.core.containers import Container, register_loader
+
+    logging.basicConfig(
+        format="%(levelname)s %(asctime)s: %(message)s",
+        datefmt="%m/%d/%Y %I:%M:%S %p",
+        level=log_level,
+    )
+    _worker_container = Container()
+    _worker_container.config.from_dict(config)
+    register_loader(_worker_container)
+    _worker_container.wire(modules=["pydwt.core.task"])
+
+
+def _run_task_in_worker(task_name: str, run: Tuple) -> Tuple:
+    """Import the model module of a task and run one attempt of the task.
+
+    Args:
+        task_name (str): Full name of the task, `module.function_name`.
+        run (Tuple): Run attributes of the task, set by `begin` in the parent
+        process or reported by the previous attempt.
+
+    Returns:
+        Tuple: Run attributes of the task (status, number of attempts,
+        start and end timestamps and row count, see `_RUN_ATTRIBUTES`),
+        the delay before the next attempt, None if the task is finished,
+        and the tables reflected by the attempt, persisted by the parent.
+    """
+    module_name = task_name.rsplit(".", 1)[0]
+    importlib.import_module(module_name)
+    workflow = _worker_container.workflow_factory()
+    task = next(task for task in workflow.tasks if task.name == task_name)
+    for attribute, value in zip(_RUN_ATTRIBUTES, run):
+        setattr(task, attribute, value)
+    delay = task.attempt()
+    reflected = {}
+    if workflow.metadata_cache is not None:
+        reflected = workflow.metadata_cache.take_reflected()
+    run = tuple(getattr(task, attribute) for attribute in _RUN_ATTRIBUTES)
+    return run, delay, reflected
+
+
+def _terminate_workers(pool: ProcessPoolExecutor, futures: List[Future]) -> None:
+    """Terminate the worker processes of a pool, some of them still running
+    a task that was abandoned.
+
+    Args:
+        pool (ProcessPoolExecutor): The pool.
+        futures (List[Future]): The futures of the abandoned tasks.
+    """
+    # shutdown(cancel_futures=True) needs Python 3.9, the futures not started
+    # yet are cancelled one by one
+    for future in futures:
+        future.cancel()
+    pool.shutdown(wait=False)
+    # The pool has no public API to stop a running call: its processes are
+    # terminated through `_processes`, present with the same meaning in every
+    # Python version supported, and None once the pool is broken
+    for process in list((pool._processes or {}).values()):
+        process.terminate()
+
+
+@dataclass
+class ProcessExecutor(AbstractExecutor):
+    """Executor running each task in a pool of worker processes.
+
+    Useful for CPU-heavy Python tasks that would otherwise share the GIL.
+    The parent process keeps the scheduling: the status of every task
+    is reported back to the parent-side tasks once run by a worker.
+    At most `nb_workers` tasks are submitted at once, so the ready task with
+    the highest priority whose slots are free is always the next one
+    submitted. Each attempt of a task is submitted separately, a failed
+    attempt to retry is submitted again once its delay is elapsed. The worker
+    cancels an attempt reaching the deadline of its task, the parent sets in
+    ERROR a task still running `cancel_grace` seconds after its deadline and
+    terminates the worker processes left behind at the end of the run.
+
+    Attributes:
+        dag (Dag): DAG object for the tasks.
+        nb_workers (int): Number of worker processes.
+        config (Dict): Configuration of the project, used to build the
+        dependency container of the workers.
+        durations (Dict[str, float]): Duration of the tasks in previous runs,
+        used to run the tasks of the critical path first.
+        on_finish (Callable): Optional callback called with each finished task.
+        cancel_grace (float): Seconds to wait for a cancelled task before
+        setting it in ERROR.
+        pools (ResourcePools): Slots of the resource pools used by the tasks.
+        metadata_cache (MetadataCache): Cache the tables reflected by the
+        workers are merged into, persisted by the workflow once the run is
+        finished.
+    """
+
+    dag: Any
+    nb_workers: int = 2
+    config: Dict = field(default_factory=dict)
+    durations: Dict[str, float] = field(default_factory=dict)
+    on_finish: Callable = None
+    cancel_grace: float = CANCEL_GRACE
+    pools: ResourcePools = field(default_factory=ResourcePools)
+    metadata_cache: Any = None
+    _queue: Any = field(init=False, default=None)
+
+    def run(self) -> None:
+        """Run the tasks in the worker processes until the DAG is finished."""
+        self.pools.check(self.tasks)
+        scheduler = DependencyScheduler(
+            self.dag, self.tasks, self.durations, self.on_finish
+        )
+        counter = itertools.count()
+        ready = []
+        # Attempts to retry, by time they are due
+        delayed = []
+
+        def push(tasks, retrying=False):
+            for task in tasks:
+                priority = scheduler.priority(task)
+                heapq.heappush(ready, (-priority, next(counter), task, retrying))
+
+        def abandon_at(future):
+            deadline = futures[future].deadline
+            return math.inf if deadline is None else deadline + self.cancel_grace
+
+        pool = ProcessPoolExecutor(
+            max_workers=self.nb_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_initialize_worker,
+            initargs=(self.config or {}, logging.getLogger().level),
+        )
+        with pool:
+            futures = {}
+            abandoned = []
+            push(scheduler.start())
+            while ready or futures or delayed:
+                while delayed and delayed[0][0] <= time.time():
+                    _, _, task = heapq.heappop(delayed)
+                    push([task], retrying=True)
+                waiting = []
+                while ready and len(futures) < self.nb_workers:
+                    item = heapq.heappop(ready)
+                    _, _, task, retrying = item
+                    if not self.pools.acquire(task):
+                        waiting.append(item)
+                        continue
+                    if not retrying and not task.begin():
+                        self.pools.release(task)
+                        push(scheduler.finish(task))
+                        continue
+                    run = tuple(getattr(task, a) for a in _RUN_ATTRIBUTES)
+                    futures[pool.submit(_run_task_in_worker, task.name, run)] = task
+                for item in waiting:
+                    heapq.heappush(ready, item)
+
+                dues = [abandon_at(future) for future in futures]
+                if delayed:
+                    dues.append(delayed[0][0])
+                due = min(dues, default=math.inf)
+                timeout = None if due == math.inf else max(0, due - time.time())
+                if not futures:
+                    time.sleep(timeout)
+                    continue
+                done, _ = wait(futures, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in [f for f in futures if f not in done]:
+                    if abandon_at(future) <= time.time():
+                        task = futures.pop(future)
+                        self.pools.release(task)
+                        abandoned.append(future)
+                        logging.error(
+                            f"task {task.name} did not stop {self.cancel_grace} "
+                            "seconds after being cancelled: moving on without it"
+                        )
+                        task.status = Status.ERROR
+                        task.ended_at = time.time()
+                        push(scheduler.finish(task))
+                for future in done:
+                    task = futures.pop(future)
+                    self.pools.release(task)
+                    delay = None
+                    reflected = {}
+                    try:
+                        run, delay, reflected = future.result()
+                        for attribute, value in zip(_RUN_ATTRIBUTES, run):
+                            setattr(task, attribute, value)
+                    except Exception as e:
+                        logging.error(f"task {task.name} failed with error: {e}")
+                        task.status = Status.ERROR
+                    if reflected and self.metadata_cache is not None:
+                        self.metadata_cache.merge(reflected)
+                    if delay is not None:
+                        due = time.time() + delay
+                        heapq.heappush(delayed, (due, next(counter), task))
+                    else:
+                        push(scheduler.finish(task))
+            if abandoned:
+                _terminate_workers(pool, abandoned)
+
+
+@dataclass
+class AsyncExecutor(AbstractExecutor):
+    """Executor running the DAG on an asyncio event loop.
+
+    Tasks wrapping an `async def` function are awaited directly on the loop,
+    at most `max_concurrency` at a time. Other tasks are offloaded to a pool
+    of `nb_workers` threads. Released tasks are started by decreasing priority.
+    An attempt is started once the slots its task takes in its pool are free.
+    The delay before retrying a failed attempt is awaited without holding
+    a thread, a concurrency slot nor a pool slot. A task still running `cancel_grace`
+    seconds after its deadline is set in ERROR without waiting for it.
+
+    Attributes:
+        dag (Dag): DAG object for the tasks.
+        nb_workers (int): Number of threads running the synchronous tasks.
+        max_concurrency (int): Maximum number of `async def` tasks
+        awaited concurrently.
+        durations (Dict[str, float]): Duration of the tasks in previous runs,
+        used to run the tasks of the critical path first.
+        on_finish (Callable): Optional callback called with each finished task.
+        cancel_grace (float): Seconds to wait for a cancelled task before
+        setting it in ERROR.
+        pools (ResourcePools): Slots of the resource pools used by the tasks.
+    """
+
+    dag: Any
+    nb_workers: int = 2
+    max_concurrency: int = 100
+    durations: Dict[str, float] = field(default_factory=dict)
+    on_finish: Callable = None
+    cancel_grace: float = CANCEL_GRACE
+    pools: ResourcePools = field(default_factory=ResourcePools)
+    _queue: Any = field(init=False, default=None)
+    _pool: ThreadPoolExecutor = field(init=False, default=None)
+    _semaphore: asyncio.Semaphore = field(init=False, default=None)
+    _threads: asyncio.Semaphore = field(init=False, default=None)
+    _released: asyncio.Condition = field(init=False, default=None)
+
+    def run(self) -> None:
+        """Run the event loop until every task of the DAG is finished."""
+        asyncio.run(self._run())
+
+    async def _run(self) -> None:
+        self.pools.check(self.tasks)
+        scheduler = DependencyScheduler(
+            self.dag, self.tasks, self.durations, self.on_finish
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._threads = asyncio.Semaphore(self.nb_workers)
+        self._released = asyncio.Condition()
+        self._pool = ThreadPoolExecutor(max_workers=self.nb_workers)
+        try:
+            running = {asyncio.ensure_future(self.worker(t)) for t in scheduler.start()}
+            while running:
+                done, running = await asyncio.wait(
+                    running, return_when=asyncio.FIRST_COMPLETED
+                )
+                for future in done:
+                    for child in scheduler.finish(future.result()):
+                        running.add(asyncio.ensure_future(self.worker(child)))
+        finally:
+            # Threads of abandoned tasks are not waited for
+            self._pool.shutdown(wait=False)
+
+    async def worker(self, task):
+        """Run the attempts of a task on the loop or in the thread pool
+        and return it."""
+        try:
+            if task.begin():
+                delay = await self._attempt(task)
+                while delay is not None:
+                    await asyncio.sleep(delay)
+                    delay = await self._attempt(task)
+        except asyncio.TimeoutError:
+            logging.error(
+                f"task {task.name} did not stop {self.cancel_grace} seconds "
+                "after being cancelled: moving on without it"
+            )
+            task.status = Status.ERROR
+            task.ended_at = time.time()
+        except Exception as e:
+            logging.error(f"task {task.name} failed with error: {e}")
+            task.status = Status.ERROR
+        return task
+
+    async def _attempt(self, task):
+        """Run one attempt of a task once its slots are free,
+        return the delay before the next one."""
+        async with self._released:
+            await self._released.wait_for(lambda: self.pools.acquire(task))
+        try:
+            return await self._run_attempt(task)
+        finally:
+            self.pools.release(task)
+            async with self._released:
+                self._released.notify_all()
+
+    async def _run_attempt(self, task):
+        """Run one attempt of a task, return the delay before the next one.
+
+        Raises:
+            asyncio.TimeoutError: If the attempt is still running
+            `cancel_grace` seconds after the deadline of the task.
+        """
+        timeout = None
+        if task.deadline is not None:
+            timeout = max(0, task.deadline - time.time()) + self.cancel_grace
+        if task.is_async:
+            async with self._semaphore:
+                return await asyncio.wait_for(task.aattempt(), timeout)
+        loop = asyncio.get_running_loop()
+        async with self._threads:
+            attempt = loop.run_in_executor(self._pool, task.attempt)
+            try:
+                return await asyncio.wait_for(attempt, timeout)
+            except asyncio.TimeoutError:
+                # The thread blocked by the attempt is left behind with its pool
+                self._pool.shutdown(wait=False)
+                self._pool = ThreadPoolExecutor(max_workers=self.nb_workers)
+                raise
@@ -0,0 +1,25 @@
+"""
+Module that provide the fingerprints of the tasks, hashes of their source code
+and settings, shared by the run state and the compiled manifest.
+"""
+
+import hashlib
+import inspect
+import json
+from typing import Any, List
+
+
+def source_code(func) -> str:
+    """Return the source code of a function, its bytecode if the source
+    is not available."""
+    try:
+        return inspect.getsource(func)
+    except (OSError, TypeError):
+        return func.__code__.co_code.hex()
+
+
+def fingerprint(content: List[Any]) -> str:
+    """Return the SHA-256 hash of JSON serializable content, the same for
+    dictionaries with the same items in another order."""
+    serialized = json.dumps(content, sort_keys=True, default=str)
+    return hashlib.sha256(serialized.encode()).hexdigest()
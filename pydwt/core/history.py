@@ -0,0 +1,334 @@
+"""
+Module that provide a local store of the workflow runs, kept in a SQLite file.
+
+Every run of a workflow records the start, end, number of attempts, status and
+row count of each of its tasks, checkpointed as soon as each task is finished
+so that a failed run can be resumed. The history is then queried to report the
+slowest tasks, the tasks slower than their baseline and the percentiles of
+the duration of each task, and to estimate the duration of the tasks when
+scheduling the next run.
+"""
+
+import contextlib
+import os
+import sqlite3
+import statistics
+from dataclasses import dataclass
+from typing import Dict, Iterator, List
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at REAL NOT NULL,
+    ended_at REAL
+);
+CREATE TABLE IF NOT EXISTS task_runs (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id),
+    task_name TEXT NOT NULL,
+    started_at REAL,
+    ended_at REAL,
+    attempts INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    row_count INTEGER
+);
+CREATE INDEX IF NOT EXISTS task_runs_task_name ON task_runs (task_name, run_id);
+"""
+
+
+@dataclass
+class TaskStats(object):
+    """Durations of a task over several runs, in seconds.
+
+    Attributes:
+        name (str): Name of the task.
+        runs (int): Number of successful runs.
+        p50 (float): Median duration.
+        p95 (float): 95th percentile of the duration.
+        last (float): Duration of the last successful run.
+    """
+
+    name: str
+    runs: int
+    p50: float
+    p95: float
+    last: float
+
+
+@dataclass
+class RunSummary(object):
+    """Outcome of a workflow run.
+
+    Attributes:
+        run_id (int): Identifier of the run.
+        started_at (float): Start of the run, as a timestamp.
+        ended_at (float): End of the run, None if the run did not end.
+        succeeded (int): Number of tasks in SUCCESS or SKIPPED.
+        failed (int): Number of tasks in ERROR.
+    """
+
+    run_id: int
+    started_at: float
+    ended_at: float
+    succeeded: int
+    failed: int
+
+
+@dataclass
+class Regression(object):
+    """Task whose last run is slower than its baseline.
+
+    Attributes:
+        name (str): Name of the task.
+        baseline (float): Median duration over the baseline runs.
+        last (float): Duration of the last run.
+        ratio (float): last / baseline.
+    """
+
+    name: str
+    baseline: float
+    last: float
+    ratio: float
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Return the q-th percentile of values with the nearest-rank method."""
+    values = sorted(values)
+    rank = max(1, -(-len(values) * q // 100))
+    return values[int(rank) - 1]
+
+
+class RunHistory(object):
+    """Store of the workflow runs.
+
+    Args:
+        path (str): Path of the SQLite file, created on first use.
+        Without path nothing is recorded.
+    """
+
+    def __init__(self, path: str = None) -> None:
+        self.path = path
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    def record_run(self, started_at: float, ended_at: float, tasks: List) -> int:
+        """Record a workflow run and the tasks it ran.
+
+        Args:
+            started_at (float): Start of the run, as a timestamp.
+            ended_at (float): End of the run, as a timestamp.
+            tasks (List[Task]): Tasks of the run.
+
+        Returns:
+            int: Identifier of the run, None if the history is disabled.
+        """
+        run_id = self.start_run(started_at)
+        if run_id is not None:
+            self.end_run(run_id, ended_at, tasks)
+        return run_id
+
+    def start_run(self, started_at: float) -> int:
+        """Record the start of a workflow run.
+
+        Args:
+            started_at (float): Start of the run, as a timestamp.
+
+        Returns:
+            int: Identifier of the run, None if the history is disabled.
+        """
+        if not self.enabled:
+            return None
+        with self._connect() as conn:
+            return conn.execute(
+                "INSERT INTO runs (started_at) VALUES (?)", (started_at,)
+            ).lastrowid
+
+    def checkpoint(self, run_id: int, task) -> None:
+        """Record a task of a run as soon as it is finished.
+
+        Args:
+            run_id (int): Identifier of the run.
+            task (Task): The finished task.
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM task_runs WHERE run_id = ? AND task_name = ?",
+                (run_id, task.name),
+            )
+            conn.execute(
+                "INSERT INTO task_runs VALUES (?, ?, ?, ?, ?, ?, ?)",
+                _task_row(run_id, task),
+            )
+
+    def end_run(self, run_id: int, ended_at: float, tasks: List) -> None:
+        """Record the end of a workflow run and all its tasks.
+
+        Args:
+            run_id (int): Identifier of the run.
+            ended_at (float): End of the run, as a timestamp.
+            tasks (List[Task]): Tasks of the run.
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE runs SET ended_at = ? WHERE run_id = ?", (ended_at, run_id)
+            )
+            conn.execute("DELETE FROM task_runs WHERE run_id = ?", (run_id,))
+            conn.executemany(
+                "INSERT INTO task_runs VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [_task_row(run_id, task) for task in tasks],
+            )
+
+    def task_statuses(self, run_id: int) -> Dict[str, str]:
+        """Return the status of the tasks recorded for a run, by task name.
+
+        Raises:
+            ValueError: If the run is not in the history.
+        """
+        if not self.enabled or not os.path.exists(self.path):
+            raise ValueError(f"Run {run_id} is not in the run history")
+        with self._connect() as conn:
+            run = conn.execute(
+                "SELECT run_id FROM runs WHERE run_id = ?", (run_id,)
+            ).fetchone()
+            if run is None:
+                raise ValueError(f"Run {run_id} is not in the run history")
+            rows = conn.execute(
+                "SELECT task_name, status FROM task_runs WHERE run_id = ?",
+                (run_id,),
+            )
+            return dict(rows.fetchall())
+
+    def runs(self, limit: int = 10) -> List[RunSummary]:
+        """Return the last runs, the most recent first.
+
+        Args:
+            limit (int): Maximum number of runs returned.
+        """
+        if not self.enabled or not os.path.exists(self.path):
+            return []
+        with self._connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT r.run_id, r.started_at, r.ended_at,
+                    SUM(t.status IN ('SUCCESS', 'SKIPPED')),
+                    SUM(t.status = 'ERROR')
+                FROM runs r LEFT JOIN task_runs t ON t.run_id = r.run_id
+                GROUP BY r.run_id
+                ORDER BY r.run_id DESC
+                LIMIT ?
+                """,
+                (limit,),
+            )
+            return [
+                RunSummary(run_id, started_at, ended_at, succeeded or 0, failed or 0)
+                for run_id, started_at, ended_at, succeeded, failed in rows.fetchall()
+            ]
+
+    def durations(self, last_runs: int = 10) -> Dict[str, float]:
+        """Return the median duration of each task over its last successful runs.
+
+        Args:
+            last_runs (int): Number of runs of each task to consider.
+        """
+        return {
+            name: statistics.median(values[-last_runs:])
+            for name, values in self._durations().items()
+        }
+
+    def percentiles(self, last_runs: int = None) -> List[TaskStats]:
+        """Return the p50, p95 and last duration of each task, by name.
+
+        Args:
+            last_runs (int): Number of runs of each task to consider,
+            all of them by default.
+        """
+        stats = []
+        for name, values in sorted(self._durations().items()):
+            values = values[-last_runs:] if last_runs else values
+            stats.append(
+                TaskStats(
+                    name=name,
+                    runs=len(values),
+                    p50=percentile(values, 50),
+                    p95=percentile(values, 95),
+                    last=values[-1],
+                )
+            )
+        return stats
+
+    def slowest(self, limit: int = 10, last_runs: int = 10) -> List[TaskStats]:
+        """Return the tasks with the highest median duration.
+
+        Args:
+            limit (int): Maximum number of tasks returned.
+            last_runs (int): Number of runs of each task to consider.
+        """
+        stats = self.percentiles(last_runs)
+        return sorted(stats, key=lambda stat: stat.p50, reverse=True)[:limit]
+
+    def regressions(
+        self, baseline_runs: int = 10, threshold: float = 1.5
+    ) -> List[Regression]:
+        """Return the tasks whose last run is slower than the median of the
+        runs before it by at least `threshold` times, the worst first.
+
+        Args:
+            baseline_runs (int): Number of runs before the last one
+            making the baseline.
+            threshold (float): Minimal ratio between the last duration
+            and the baseline.
+        """
+        regressions = []
+        for name, values in self._durations().items():
+            if len(values) < 2:
+                continue
+            baseline = statistics.median(values[-baseline_runs - 1 : -1])
+            last = values[-1]
+            if baseline > 0 and last / baseline >= threshold:
+                regressions.append(Regression(name, baseline, last, last / baseline))
+        return sorted(regressions, key=lambda r: r.ratio, reverse=True)
+
+    def _durations(self) -> Dict[str, List[float]]:
+        """Return the durations of the successful runs of each task,
+        from the oldest to the newest."""
+        if not self.enabled or not os.path.exists(self.path):
+            return {}
+        durations = {}
+        with self._connect() as conn:
+            rows = conn.execute("""
+                SELECT task_name, ended_at - started_at
+                FROM task_runs
+                WHERE status = 'SUCCESS' AND started_at IS NOT NULL
+                ORDER BY run_id
+                """)
+            for name, duration in rows.fetchall():
+                durations.setdefault(name, []).append(duration)
+        return durations
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open the SQLite file, create it and its tables if needed,
+        commit and close it on exit."""
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        try:
+            conn.executescript(SCHEMA)
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+
+def _task_row(run_id: int, task) -> tuple:
+    return (
+        run_id,
+        task.name,
+        task.started_at,
+        task.ended_at,
+        task._count_call,
+        task.status.name,
+        task.row_count,
+    )
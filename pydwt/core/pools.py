@@ -0,0 +1,76 @@
+"""
+Module that provide the resource pools limiting the tasks run concurrently.
+
+A pool is a named number of slots, defined in the `pools` section of the
+settings. A task declares the pool it uses and the number of slots it takes:
+executors only dispatch a task once its slots are free, so that, for instance,
+only a few heavy statements run at once on the warehouse while light tasks
+use all the workers.
+"""
+
+import threading
+from typing import Dict, List
+
+
+class ResourcePools(object):
+    """Slots of the resource pools, shared by the workers of an executor.
+
+    Tasks without pool are not limited.
+
+    Args:
+        pools (Dict[str, int]): Number of slots by pool name.
+    """
+
+    def __init__(self, pools: Dict[str, int] = None) -> None:
+        self.pools = {name: int(slots) for name, slots in (pools or {}).items()}
+        self._lock = threading.Lock()
+        self._used: Dict[str, int] = {name: 0 for name in self.pools}
+
+    def check(self, tasks: List) -> None:
+        """Check that the pool of every task exists and is large enough.
+
+        Raises:
+            ValueError: If a task takes less than one slot, the slots of its
+            pool would no longer be counted, or if a task uses an unknown pool
+            or takes more slots than its pool has, it could never be dispatched.
+        """
+        for task in tasks:
+            if task.slots < 1:
+                raise ValueError(
+                    f"Task {task.name} takes {task.slots} slots, at least 1 is required"
+                )
+            if task.pool is None:
+                continue
+            if task.pool not in self.pools:
+                raise ValueError(f"Task {task.name} uses unknown pool {task.pool}")
+            if task.slots > self.pools[task.pool]:
+                raise ValueError(
+                    f"Task {task.name} takes {task.slots} slots, "
+                    f"pool {task.pool} only has {self.pools[task.pool]}"
+                )
+
+    def acquire(self, task) -> bool:
+        """Take the slots of a task if they are free.
+
+        Returns:
+            bool: True if the task can be dispatched.
+        """
+        if task.pool is None:
+            return True
+        with self._lock:
+            if self._used[task.pool] + task.slots > self.pools[task.pool]:
+                return False
+            self._used[task.pool] += task.slots
+            return True
+
+    def release(self, task) -> None:
+        """Free the slots of a task."""
+        if task.pool is None:
+            return
+        with self._lock:
+            self._used[task.pool] -= task.slots
+
+    def used(self, name: str) -> int:
+        """Return the number of slots of a pool currently taken."""
+        with self._lock:
+            return self._used[name]
@@ -4,11 +4,14 @@ import os
 import sys
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict
+from typing import TYPE_CHECKING, Dict, List
 
 import yaml
 
-from pydwt.core.workflow import Workflow
+from pydwt.core.discovery import ModelManifest, TaskEntry
+
+if TYPE_CHECKING:
+    from pydwt.core.workflow import Workflow
 
 
 @dataclass
@@ -23,14 +26,21 @@ class Project:
         contains the models (default: "models").
         dags_folder (str): Name of the folder to store
         the DAGs (default: "dags").
+        manifest_path (str): Path of the manifest of the model files, only
+        the files changed since it was written are imported to build the
+        DAG. Without path every model is imported.
     """
 
-    workflow: Workflow
+    workflow: "Workflow"
     name: str
     models_folder: str = field(default="models")
     dags_folder: str = field(default="dags")
+    manifest_path: str = field(default=None)
+    manifest: ModelManifest = field(init=False, default=None)
 
     def __post_init__(self) -> None:
+        self.manifest = ModelManifest(self.manifest_path)
+
         # Add the current working directory to the system path
         # to allow importing modules from the project.
         sys.path.append(os.getcwd())
@@ -54,43 +64,180 @@ class Project:
         self._create_dags_directory(project_name)
         self._create_settings(project_name)
 
+    def discover_models(self, import_all: bool = False) -> List[TaskEntry]:
+        """Find the models in the models folder of the project and its
+        subfolders, and refresh the manifest of the model files.
+
+        Args:
+            import_all (bool): True to import every model, otherwise only
+            the models changed since the manifest was written are imported.
+
+        Returns:
+            List[TaskEntry]: The tasks of all the models.
+        """
+        manifest = self.manifest
+        return manifest.refresh(
+            os.path.join(self.name, self.models_folder),
+            f"{self.name}.{self.models_folder}",
+            self.workflow.tasks,
+            import_all=import_all or self.manifest_path is None,
+        )
+
     def import_all_models(self) -> None:
         """Import all the models from the models folder of the project."""
-        models_folders = os.path.join(self.name, "models")
-        models = [
-            file.split(".")[0]
-            for file in os.listdir(models_folders)
-            if file.endswith(".py")
+        self.discover_models(import_all=True)
+
+    def import_models(self, task_names: List[str]) -> None:
+        """Import the models registering some tasks, found by the last
+        discovery.
+
+        Args:
+            task_names (List[str]): Full names of the tasks.
+        """
+        for module in sorted(self.manifest.modules(task_names)):
+            importlib.import_module(module)
+
+    def plan(self, select: str = None) -> List[str]:
+        """Return the tasks a run would process, in an order respecting
+        their dependencies, without importing the unchanged models.
+
+        Args:
+            select (str): Optional selector of the tasks, see `run`.
+
+        Raises:
+            ValueError: If the selector is invalid or matches no task.
+        """
+        # networkx is only needed once the models are found
+        import networkx as nx
+
+        from pydwt.core.dag import Dag
+
+        dag = Dag()
+        dag.tasks = self.discover_models()
+        dag.build_dag()
+        if select is not None:
+            dag.select(select)
+        return [
+            dag.node_names[node]
+            for node in nx.lexicographical_topological_sort(
+                dag.graph, key=lambda node: str(dag.node_names.get(node, ""))
+            )
+            if node != dag.source
         ]
-        for model in models:
-            importlib.import_module(f"{self.name}.models.{model}")
 
-    def run(self, task_name: str = None, with_dep: bool = False) -> None:
-        """Run the DAG-based workflow."""
+    def run(
+        self,
+        task_name: str = None,
+        with_dep: bool = False,
+        skip_unchanged: bool = False,
+        resume: int = None,
+        select: str = None,
+    ) -> None:
+        """Run the DAG-based workflow.
 
-        task_full_name = f"{self.name}.models.{task_name}" if task_name else None
-        self.import_all_models()
-        if task_name and with_dep:
+        Args:
+            task_name (str): Optional task to run, `module.function_name`.
+            with_dep (bool): True to run the task with all its parents.
+            skip_unchanged (bool): True to skip the tasks unchanged since
+            their last successful run.
+            resume (int): Identifier of a previous run to resume: only its
+            tasks that did not succeed are run, with their descendants.
+            select (str): Selector of the tasks to run, for instance
+            `+model`, `model+` or `tag:nightly`.
+        """
+
+        task_full_name = None
+        if task_name:
+            task_full_name = f"{self.name}.{self.models_folder}.{task_name}"
+        self.workflow.skip_unchanged = skip_unchanged
+        if resume is not None and task_name:
+            raise ValueError("resume can not be used with a task-name")
+        if select is not None and (task_name or resume is not None):
+            raise ValueError("select can not be used with a task-name or resume")
+        if with_dep and not task_name:
+            raise ValueError("with-dep must be with a task-name")
+
+        # Only the models of the tasks run are imported, the others are
+        # known from the manifest
+        if select is not None:
+            select = " ".join(self._import_selection(select)) or select
+        elif task_name:
+            self._import_selection(f"+{task_full_name}" if with_dep else task_full_name)
+        else:
+            self.import_all_models()
+
+        if resume is not None:
+            self.workflow.resume(resume)
+
+        elif select is not None:
+            self.workflow.run_selection(select)
+
+        elif task_name and with_dep:
             self.workflow.run_with_name_and_deps(task_full_name)
 
         elif task_name and not with_dep:
             self.workflow.run_with_name_no_deps(task_full_name)
 
-        elif not task_name and not with_dep:
-            self.workflow.run()
         else:
-            raise ValueError("with-dep must be with a task-name")
+            self.workflow.run()
 
-    def export_dag(self) -> None:
-        """Export the DAG to a PNG image file."""
-        self.import_all_models()
+    def export_dag(self, format: str = "png") -> None:
+        """Export the DAG to a file, built from the manifest of the model
+        files without importing the unchanged models.
+
+        Args:
+            format (str): "png", "dot", "svg" or "html".
+        """
         dag_file_name = os.path.join(
             self.name,
             self.dags_folder,
             f'dag_{datetime.now().strftime("%Y%m%d_%H:%M:%S")}',
         )
+        if format != "png":
+            dag_file_name = f"{dag_file_name}.{format}"
+        self.workflow.dag.tasks = self.discover_models()
         self.workflow.dag.build_dag()
-        self.workflow.export_dag(dag_file_name)
+        self.workflow.export_dag(dag_file_name, format)
+
+    def compile(self, path: str, sql: bool = False) -> Dict:
+        """Write the compiled manifest of the project, a JSON description
+        of its tasks, see `pydwt.core.compiler`.
+
+        Args:
+            path (str): Path of the JSON file to write.
+            sql (bool): True to add the SQL of the DataFrame-based models,
+            found by a dry run of each model.
+
+        Returns:
+            Dict: The manifest.
+        """
+        from pydwt.core import compiler
+
+        self.import_all_models()
+        manifest = compiler.compile_tasks(self.workflow.tasks, sql=sql)
+        compiler.save(manifest, path)
+        logging.info(f"{len(manifest['tasks'])} tasks compiled to {path}")
+        return manifest
+
+    def _import_selection(self, select: str) -> List[str]:
+        """Import the models of the tasks picked by a selector, the other
+        tasks are left out of the DAG of the workflow.
+
+        Returns:
+            List[str]: Full names of the selected tasks.
+        """
+        from pydwt.core.dag import Dag
+        from pydwt.core.selector import select_tasks
+
+        dag = Dag()
+        dag.tasks = self.discover_models()
+        dag.build_dag()
+        selected = select_tasks(dag, select)
+        self.import_models(selected)
+        self.workflow.dag.unselected |= {
+            task.name for task in dag.tasks if task.name not in selected
+        }
+        return sorted(selected)
 
     def _create_models_directory(self, project_name: str) -> None:
         """
@@ -128,6 +275,10 @@ class Project:
             "tasks": {"task_one": {"materialize": "view"}},
             "sources": {"one": {"table": "table_name", "schema": "some_schema"}},
             "connection": {"url": "<connection-string>", "echo": True},
+            "executor": {"type": "thread", "nb_workers": 5},
+            "history": {"path": ".pydwt/history.db"},
+            "state": {"path": ".pydwt/state.json"},
+            "discovery": {"manifest": ".pydwt/models.json"},
         }
         if not os.path.exists(settings_projects):
             with open(settings_projects, "w") as file:
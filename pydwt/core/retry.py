@@ -0,0 +1,52 @@
+"""
+Module that provide the retry policy of the tasks.
+
+A failed attempt is retried after an exponential backoff with jitter, so that
+the retries of the tasks failing at the same time are spread out instead of
+all hitting the database again within milliseconds.
+"""
+
+import random
+from dataclasses import dataclass
+from typing import Tuple, Type
+
+
+@dataclass
+class RetryPolicy(object):
+    """Delay between the attempts of a task and errors worth a retry.
+
+    The delay before the retry following the n-th attempt is
+    `min(max_delay, base_delay * multiplier ** (n - 1))`, reduced by a random
+    share of at most `jitter` of it.
+
+    Attributes:
+        base_delay (float): Delay in seconds before the first retry.
+        multiplier (float): Factor applied to the delay after each retry.
+        max_delay (float): Maximum delay in seconds.
+        jitter (float): Maximum share of the delay randomly removed, from 0 to 1.
+        retry_on (Tuple[Type[Exception]]): Errors that are retried.
+        no_retry_on (Tuple[Type[Exception]]): Errors that are never retried,
+        even if they are subclasses of `retry_on`.
+    """
+
+    base_delay: float = 1.0
+    multiplier: float = 2.0
+    max_delay: float = 300.0
+    jitter: float = 0.5
+    retry_on: Tuple[Type[Exception], ...] = (Exception,)
+    no_retry_on: Tuple[Type[Exception], ...] = ()
+
+    def should_retry(self, error: Exception) -> bool:
+        """True if an attempt failing with this error should be retried."""
+        return isinstance(error, self.retry_on) and not isinstance(
+            error, self.no_retry_on
+        )
+
+    def delay(self, attempt: int) -> float:
+        """Return the delay in seconds before retrying the n-th attempt.
+
+        Args:
+            attempt (int): Number of the attempt that failed, starting at 1.
+        """
+        delay = min(self.max_delay, self.base_delay * self.multiplier ** (attempt - 1))
+        return delay * (1 - self.jitter * random.random())
@@ -1,11 +1,35 @@
 """
 Module that provide API to create classe that implements schedule
 intervals
+
+The dates a schedule runs on are computed once per month and memoized, shared
+by the schedules of the same type and parameters, so evaluating all the tasks
+of a run, or listing the runs of a whole year with `next_run_after`, only
+builds the calendar of each month once.
 """
+
 import datetime
+import threading
 from abc import ABC, abstractmethod
-from calendar import Calendar
-from dataclasses import dataclass, field
+from calendar import Calendar, monthrange
+from dataclasses import dataclass, field, fields
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple, Union
+
+# Number of months searched by `next_run_after` before giving up
+MAX_SEARCH_MONTHS = 120
+
+# Run dates by schedule and month, see `ScheduleInterface.run_dates`
+_RUN_DATES: Dict[Tuple, FrozenSet[datetime.date]] = {}
+_RUN_DATES_LOCK = threading.Lock()
+
+
+def _as_date(date: Union[datetime.date, datetime.datetime, None]) -> datetime.date:
+    """Return the day of a date or datetime, today if None."""
+    if date is None:
+        return datetime.date.today()
+    if isinstance(date, datetime.datetime):
+        return date.date()
+    return date
 
 
 @dataclass
@@ -13,19 +37,96 @@ class ScheduleInterface(ABC):
     calendar: Calendar = field(default_factory=Calendar)
 
     @abstractmethod
-    def is_scheduled(self, date: datetime = datetime.datetime.now()):
+    def is_scheduled(self, date: datetime.datetime = None):
         """Abstract method to be implemented by child class defining the schedule
         time to run the script.
+
+        Args:
+            date (datetime): The date to check, now by default.
         """
         raise NotImplementedError
 
+    def month_run_dates(self, year: int, month: int) -> Iterable[datetime.date]:
+        """Return the dates of a month the schedule runs on.
+
+        Every day of the month is checked with `is_scheduled` by default,
+        schedules defined by the calendar of the month override it.
+        """
+        return [
+            day
+            for day in self.calendar.itermonthdates(year, month)
+            if day.month == month
+            and self.is_scheduled(datetime.datetime.combine(day, datetime.time()))
+        ]
+
+    def run_dates(self, year: int, month: int) -> FrozenSet[datetime.date]:
+        """Return the dates of a month the schedule runs on, computed once
+        for all the schedules of the same type and parameters."""
+        key = self._cache_key()
+        if key is None:
+            return frozenset(self.month_run_dates(year, month))
+        key = (key, year, month)
+        dates = _RUN_DATES.get(key)
+        if dates is None:
+            dates = frozenset(self.month_run_dates(year, month))
+            with _RUN_DATES_LOCK:
+                _RUN_DATES[key] = dates
+        return dates
+
+    def next_run_after(
+        self, date: Union[datetime.date, datetime.datetime]
+    ) -> Optional[datetime.date]:
+        """Return the first date strictly after a date the schedule runs on.
+
+        Calling it again with the returned date lists the runs of a period,
+        for instance of a year for capacity planning.
+
+        Returns:
+            Optional[datetime.date]: The date, None if the schedule does not
+            run in the next `MAX_SEARCH_MONTHS` months.
+        """
+        day = _as_date(date)
+        year, month = day.year, day.month
+        for _ in range(MAX_SEARCH_MONTHS):
+            later = sorted(d for d in self.run_dates(year, month) if d > day)
+            if later:
+                return later[0]
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        return None
+
+    def _in_run_dates(self, date: Union[datetime.date, datetime.datetime]) -> bool:
+        """True if the day of a date is one of the run dates of its month."""
+        day = _as_date(date)
+        return day in self.run_dates(day.year, day.month)
+
+    def _cache_key(self) -> Optional[Tuple]:
+        """Return the type and parameters of the schedule, None if they can
+        not be hashed and the run dates are not memoized."""
+        params = tuple(
+            (f.name, getattr(self, f.name))
+            for f in fields(self)
+            if f.name != "calendar"
+        )
+        key = (type(self), self.calendar.firstweekday, params)
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
 
 class Daily(ScheduleInterface):
     """Provide a daily implementation of schedule interface"""
 
-    def is_scheduled(self, date: datetime.datetime = datetime.datetime.now()):
+    def is_scheduled(self, date: datetime.datetime = None):
         return True
 
+    def month_run_dates(self, year: int, month: int) -> Iterable[datetime.date]:
+        return [
+            datetime.date(year, month, day)
+            for day in range(1, monthrange(year, month)[1] + 1)
+        ]
+
 
 @dataclass
 class Weekly(ScheduleInterface):
@@ -33,8 +134,8 @@ class Weekly(ScheduleInterface):
 
     weekday: int = 0
 
-    def is_scheduled(self, date: datetime.datetime = datetime.datetime.now()):
-        return self.weekday == date.weekday()
+    def is_scheduled(self, date: datetime.datetime = None):
+        return self.weekday == _as_date(date).weekday()
 
 
 @dataclass
@@ -45,15 +146,17 @@ class SemiMonthly(ScheduleInterface):
 
     weekday: int = 0
 
-    def is_scheduled(self, date: datetime.datetime = datetime.datetime.now()):
-        weeksofmonth = self.calendar.monthdatescalendar(date.year, date.month)
-        dates_to_check = [
+    def is_scheduled(self, date: datetime.datetime = None):
+        return self._in_run_dates(date)
+
+    def month_run_dates(self, year: int, month: int) -> Iterable[datetime.date]:
+        weeksofmonth = self.calendar.monthdatescalendar(year, month)
+        return [
             d
             for week in weeksofmonth
             for d in week
-            if d.weekday() == self.weekday and d.month == date.month
+            if d.weekday() == self.weekday and d.month == month
         ][::2]
-        return date.date() in dates_to_check
 
 
 @dataclass
@@ -64,15 +167,17 @@ class Monthly(ScheduleInterface):
 
     weekday: int = 0
 
-    def is_scheduled(self, date: datetime.datetime = datetime.datetime.now()):
-        weeksofmonth = self.calendar.monthdatescalendar(date.year, date.month)
-        date_to_check = [
+    def is_scheduled(self, date: datetime.datetime = None):
+        return self._in_run_dates(date)
+
+    def month_run_dates(self, year: int, month: int) -> Iterable[datetime.date]:
+        weeksofmonth = self.calendar.monthdatescalendar(year, month)
+        return [
             d
             for week in weeksofmonth
             for d in week
-            if d.weekday() == self.weekday and d.month == date.month
-        ][0]
-        return date.date() == date_to_check
+            if d.weekday() == self.weekday and d.month == month
+        ][:1]
 
 
 @dataclass
@@ -81,10 +186,13 @@ class MonthlyLastOpenDayInMonth(ScheduleInterface):
     of the month.
     """
 
-    def is_scheduled(self, date: datetime.datetime = datetime.datetime.now()):
-        weeksofmonth = self.calendar.monthdatescalendar(date.year, date.month)
+    def is_scheduled(self, date: datetime.datetime = None):
+        return self._in_run_dates(date)
+
+    def month_run_dates(self, year: int, month: int) -> Iterable[datetime.date]:
+        weeksofmonth = self.calendar.monthdatescalendar(year, month)
         last_week = weeksofmonth[-1]
-        date_to_check = [
-            d for d in last_week if d.weekday() not in [5, 6] and d.month == date.month
-        ][-1]
-        return date.date() == date_to_check
+        open_days = [
+            d for d in last_week if d.weekday() not in [5, 6] and d.month == month
+        ]
+        return open_days[-1:]
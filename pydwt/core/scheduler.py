@@ -0,0 +1,174 @@
+"""
+Module that provide an event-driven scheduler for the tasks of a DAG.
+
+Instead of polling the status of the parents of a task, the scheduler keeps
+an in-degree counter per DAG node: the number of parents that are not finished
+yet. A task is released as soon as the counter of its node drops to zero.
+
+Each task also gets a priority: the duration of the longest path from the task
+to the end of the DAG, so that executors start the critical path first.
+"""
+
+import logging
+import threading
+from typing import Callable, Dict, List
+
+import networkx as nx
+
+from pydwt.core.enums import Status
+
+
+class DependencyScheduler(object):
+    """Release the tasks of a DAG once all their parents are finished.
+
+    Only the tasks in status PENDING are scheduled. Parents that are already
+    in SUCCESS do not hold their children back, parents in ERROR propagate
+    the error to all their descendants and dependencies that are not part
+    of the scheduled tasks are considered satisfied.
+
+    Released tasks are returned by decreasing priority. The priority of a task
+    is its duration plus the highest priority of its children. Durations come
+    from previous runs, tasks without history are given the mean of the known
+    durations, or a uniform estimate if there is no history at all.
+
+    Attributes:
+        dag (Dag): DAG object holding the relationships between the tasks.
+        tasks (List): List of tasks to schedule.
+        durations (Dict[str, float]): Optional duration of the tasks by name.
+        on_finish (Callable): Optional callback called with each task
+        that is finished, before its children are released.
+    """
+
+    def __init__(
+        self,
+        dag,
+        tasks: List,
+        durations: Dict[str, float] = None,
+        on_finish: Callable = None,
+    ) -> None:
+        self._lock = threading.Lock()
+        self._on_finish = on_finish
+        self._all_done = threading.Event()
+        self._tasks = {task.name: task for task in tasks}
+        self._children: Dict[str, List[str]] = {name: [] for name in self._tasks}
+        self._in_degree: Dict[str, int] = {}
+        self._done = set()
+        self._failed_parents = set()
+
+        for name, task in self._tasks.items():
+            if task.status != Status.PENDING:
+                continue
+            self._in_degree[name] = 0
+            for parent_name in self._parents_name(dag, name):
+                parent = self._tasks.get(parent_name)
+                if parent is None:
+                    continue
+                self._children[parent_name].append(name)
+                if parent.status == Status.PENDING:
+                    self._in_degree[name] += 1
+                elif parent.status == Status.ERROR:
+                    self._failed_parents.add(parent_name)
+
+        self._priority = self._critical_path(dag, durations or {})
+
+    @staticmethod
+    def _parents_name(dag, task_name: str) -> List[str]:
+        """Return the names of the parents of a task in the DAG."""
+        node_index = dag.node_index[task_name]
+        return [
+            dag.graph.nodes[parent]["name"]
+            for parent in dag.graph.predecessors(node_index)
+            if parent != dag.source
+        ]
+
+    def _critical_path(self, dag, durations: Dict[str, float]) -> Dict[str, float]:
+        """Return the duration of the longest path from each task to the end
+        of the DAG, computed from the leaves up in reverse topological order."""
+        known = [durations[name] for name in self._tasks if name in durations]
+        default = sum(known) / len(known) if known else 1.0
+        priority = {}
+        for node in reversed(list(nx.topological_sort(dag.graph))):
+            if node == dag.source:
+                continue
+            name = dag.graph.nodes[node]["name"]
+            if name not in self._tasks:
+                continue
+            priority[name] = durations.get(name, default) + max(
+                (priority[child] for child in self._children[name]), default=0
+            )
+        return priority
+
+    def priority(self, task) -> float:
+        """Return the priority of a task, the higher the sooner it should run."""
+        return self._priority.get(task.name, 0)
+
+    @property
+    def finished(self) -> bool:
+        """True when every scheduled task is finished."""
+        return self._all_done.is_set()
+
+    def start(self) -> List:
+        """Return the tasks that can be run right away.
+
+        Tasks whose parents are already in ERROR are set in ERROR
+        without being run.
+        """
+        with self._lock:
+            for parent_name in self._failed_parents:
+                self._cancel_descendants(parent_name)
+            ready = [
+                self._tasks[name]
+                for name, in_degree in self._in_degree.items()
+                if in_degree == 0 and name not in self._done
+            ]
+            self._check_all_done()
+        return sorted(ready, key=self.priority, reverse=True)
+
+    def finish(self, task) -> List:
+        """Mark a task as finished and return the children it released.
+
+        Args:
+            task (Task): The task that has just been run.
+
+        Returns:
+            List: Tasks whose last pending parent was this task,
+            by decreasing priority.
+        """
+        if self._on_finish is not None:
+            self._on_finish(task)
+        ready = []
+        with self._lock:
+            self._done.add(task.name)
+            if task.status == Status.ERROR:
+                self._cancel_descendants(task.name)
+            else:
+                for child_name in self._children[task.name]:
+                    if child_name in self._done:
+                        continue
+                    self._in_degree[child_name] -= 1
+                    if self._in_degree[child_name] == 0:
+                        ready.append(self._tasks[child_name])
+            self._check_all_done()
+        return sorted(ready, key=self.priority, reverse=True)
+
+    def wait(self, timeout: float = None) -> bool:
+        """Block until every scheduled task is finished."""
+        return self._all_done.wait(timeout)
+
+    def _cancel_descendants(self, task_name: str) -> None:
+        """Set in ERROR all the pending descendants of a task."""
+        stack = list(self._children[task_name])
+        while stack:
+            child_name = stack.pop()
+            if child_name in self._done:
+                continue
+            logging.error(
+                f"task {child_name} can not be run because some parent are in ERROR"
+            )
+            self._tasks[child_name].status = Status.ERROR
+            self._done.add(child_name)
+            stack.extend(self._children[child_name])
+
+    def _check_all_done(self) -> None:
+        if len(self._done) == len(self._in_degree):
+            self._all_done.set()
@@ -0,0 +1,120 @@
+"""
+Module that provide the selector syntax picking the tasks of a partial run.
+
+A selector is a list of terms separated by spaces and selects the union of its
+terms. A term is a list of atoms separated by commas and selects the
+intersection of its atoms. An atom is a task name, or `tag:<tag>` for the tasks
+with this tag, prefixed by `+` to add the ancestors of the matching tasks and
+suffixed by `+` to add their descendants:
+
+* `orders+`: the task orders and everything downstream of it.
+* `+orders`: the task orders and everything it depends on.
+* `+orders+`: both.
+* `tag:nightly,orders+`: the tasks tagged nightly downstream of orders.
+* `orders customers+`: orders, customers and the descendants of customers.
+
+A task name matches the full name of a task, `module.function_name`, or any
+suffix of it made of whole dotted parts, for instance `example.task_one` or
+`task_one`. The ancestors, or descendants, of all the tasks matching an atom
+are collected in a single traversal of the graph.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Iterable, List, Set
+
+
+@dataclass
+class Atom(object):
+    """Tasks matching a name or a tag, with their ancestors or descendants.
+
+    Attributes:
+        value (str): Task name, or `tag:<tag>`.
+        ancestors (bool): True to add the ancestors of the matching tasks.
+        descendants (bool): True to add the descendants of the matching tasks.
+    """
+
+    value: str
+    ancestors: bool = False
+    descendants: bool = False
+
+
+def parse(selector: str) -> List[List[Atom]]:
+    """Parse a selector into its terms, each term being a list of atoms.
+
+    Raises:
+        ValueError: If the selector is empty or an atom has no name.
+    """
+    terms = []
+    for term in selector.split():
+        atoms = []
+        for part in term.split(","):
+            value = part.strip("+")
+            if not value:
+                raise ValueError(f"Invalid selector {selector}: empty atom")
+            atoms.append(Atom(value, part.startswith("+"), part.endswith("+")))
+        terms.append(atoms)
+    if not terms:
+        raise ValueError("Empty selector")
+    return terms
+
+
+def select_tasks(dag, selector: str) -> Set[str]:
+    """Return the names of the tasks of a built DAG picked by a selector.
+
+    Args:
+        dag (Dag): The built DAG of the tasks.
+        selector (str): The selector, see the module documentation.
+
+    Raises:
+        ValueError: If the selector is invalid or one of its task names
+        matches no task.
+    """
+    selected = set()
+    for term in parse(selector):
+        term_names = None
+        for atom in term:
+            names = _select_atom(dag, atom)
+            term_names = names if term_names is None else term_names & names
+        selected |= term_names
+    return selected
+
+
+def _select_atom(dag, atom: Atom) -> Set[str]:
+    seeds = _match(dag, atom.value)
+    nodes = set(seeds)
+    if atom.ancestors:
+        nodes |= _reachable(dag.graph.predecessors, seeds)
+    if atom.descendants:
+        nodes |= _reachable(dag.graph.successors, seeds)
+    nodes.discard(dag.source)
+    return {dag.node_names[node] for node in nodes}
+
+
+def _match(dag, value: str) -> Set[int]:
+    """Return the nodes of the tasks matching a task name or a tag."""
+    if value.startswith("tag:"):
+        tag = value[len("tag:") :]
+        return {
+            dag.node_index[task.name] for task in dag.tasks if tag in (task.tags or [])
+        }
+    nodes = {
+        node
+        for name, node in dag.node_index.items()
+        if name == value or name.endswith(f".{value}")
+    }
+    if not nodes:
+        raise ValueError(f"No task matches {value}")
+    return nodes
+
+
+def _reachable(neighbors: Callable, seeds: Iterable) -> Set:
+    """Return the nodes reachable from any of the seeds, visiting each node
+    once for all the seeds."""
+    seen = set()
+    stack = list(seeds)
+    while stack:
+        for node in neighbors(stack.pop()):
+            if node not in seen:
+                seen.add(node)
+                stack.append(node)
+    return seen
@@ -0,0 +1,138 @@
+"""
+Module that provide the state of the tasks between runs, kept in a JSON file.
+
+The state holds, for each task, the fingerprint of its last successful run and
+the time it ended. The fingerprint of a task is a hash of the source code of
+the wrapped function, of its section of the tasks configuration and of the
+fingerprints and last successes of its parents: it only stays the same when
+nothing changed upstream of the task since its last successful run.
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Dict, List
+
+import networkx as nx
+
+from pydwt.core.enums import Status
+from pydwt.core.fingerprint import fingerprint, source_code
+
+
+class RunState(object):
+    """State of the tasks between runs.
+
+    Args:
+        path (str): Path of the JSON file the state is persisted to.
+        Without path the state is not persisted.
+    """
+
+    def __init__(self, path: str = None) -> None:
+        self.path = path
+        self._lock = threading.RLock()
+        self._tasks: Dict[str, Dict] = None
+
+    def get(self, task_name: str) -> Dict:
+        """Return the state of a task: its fingerprint and last success,
+        an empty dict if the task never succeeded."""
+        with self._lock:
+            return dict(self._load().get(task_name, {}))
+
+    def fingerprint(self, task, parents: List) -> str:
+        """Return the fingerprint of a task.
+
+        Args:
+            task (Task): The task.
+            parents (List[Task]): The parents of the task in the DAG.
+        """
+        config = task.config if isinstance(task.config, dict) else {}
+        task_config = (config.get("tasks") or {}).get(task._task.__name__)
+        upstream = sorted(
+            (parent.name, state.get("fingerprint"), state.get("last_success"))
+            for parent, state in ((p, self.get(p.name)) for p in parents)
+        )
+        return fingerprint([source_code(task._task), task_config, upstream])
+
+    def skip_unchanged(self, dag) -> List:
+        """Set in SKIPPED the tasks whose fingerprint is the one of their last
+        successful run and whose parents are all skipped too.
+
+        Args:
+            dag (Dag): The built DAG of the tasks.
+
+        Returns:
+            List[Task]: The skipped tasks.
+        """
+        skipped = []
+        for task, parents in _tasks_with_parents(dag):
+            if task.status != Status.PENDING:
+                continue
+            if not all(parent.status == Status.SKIPPED for parent in parents):
+                continue
+            if self.get(task.name).get("fingerprint") == self.fingerprint(
+                task, parents
+            ):
+                logging.info(f"task {task.name} is unchanged: skipping")
+                task.status = Status.SKIPPED
+                skipped.append(task)
+        return skipped
+
+    def record(self, dag) -> None:
+        """Record the fingerprint of the tasks that succeeded and persist
+        the state. The parents are recorded before their children, so the
+        fingerprint of a child includes the last success of its parents.
+
+        Args:
+            dag (Dag): The built DAG of the tasks that were run.
+        """
+        with self._lock:
+            tasks = self._load()
+            for task, parents in _tasks_with_parents(dag):
+                if task.status != Status.SUCCESS or task.ended_at is None:
+                    continue
+                tasks[task.name] = {
+                    "fingerprint": self.fingerprint(task, parents),
+                    "last_success": task.ended_at,
+                }
+            self.save()
+
+    def save(self) -> None:
+        """Persist the state to its file, if any."""
+        if self.path is None:
+            return
+        with self._lock:
+            folder = os.path.dirname(self.path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self._load(), f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+    def _load(self) -> Dict[str, Dict]:
+        """Load the persisted state on first use."""
+        if self._tasks is not None:
+            return self._tasks
+        self._tasks = {}
+        if self.path is None or not os.path.exists(self.path):
+            return self._tasks
+        try:
+            with open(self.path) as f:
+                self._tasks = json.load(f)
+        except Exception as e:
+            logging.warning(f"can not load run state {self.path}: {e}")
+        return self._tasks
+
+
+def _tasks_with_parents(dag):
+    """Yield each task of the DAG with its parents, parents first."""
+    for node in nx.topological_sort(dag.graph):
+        if node == dag.source:
+            continue
+        parents = [
+            dag.tasks[parent]
+            for parent in dag.graph.predecessors(node)
+            if parent != dag.source
+        ]
+        yield dag.tasks[node], parents
@@ -1,15 +1,19 @@
+import asyncio
 import functools
+import inspect
 import logging
+import threading
 import traceback
 import time
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Callable, Dict, List
+from typing import Callable, Dict, List, Optional
 
 from dependency_injector.wiring import Provide
 
 from pydwt.core.containers import Container
+from pydwt.core.retry import RetryPolicy
 from pydwt.core.schedule import Daily, ScheduleInterface
 from pydwt.core.workflow import Workflow
 from pydwt.core.enums import Status
@@ -23,15 +27,26 @@ class BaseTask(ABC):
     :param depends_on: List of other tasks that this task depends on
     :param runs_on: Schedule for running this task. Default is `Daily()`
     :param retry: Number of times to retry this task in case of failure
+    :param retry_policy: Delay between the attempts and errors retried.
     :param ttl_minutes: Time-to-live in minutes.
     If a positive value is provided, the task will only run
     if the time elapsed since the last run is
     greater than or equal to this value.
+    :param timeout: Maximum duration in seconds of the task, retries included.
+    :param pool: Name of the resource pool the task uses.
+    :param slots: Number of slots of the pool the task takes.
+    :param tags: Tags of the task, selected with `tag:<tag>`.
     """
 
     depends_on: List[Callable] = field(default_factory=list)
     runs_on: ScheduleInterface = field(default_factory=Daily)
     retry: int = 0
+    retry_policy: RetryPolicy = field(default_factory=RetryPolicy)
+    ttl_minutes: float = None
+    timeout: float = None
+    pool: str = None
+    slots: int = 1
+    tags: List[str] = field(default_factory=list)
     name: str = field(init=False)
     _task: Callable = field(init=False, default=None)
     _count_call: int = 0
@@ -39,6 +54,12 @@ class BaseTask(ABC):
     config: Dict = Provide[Container.config]
     sources: Dict = Provide[Container.datasources]
     status: Status = Status.PENDING
+    started_at: float = field(init=False, default=None)
+    ended_at: float = field(init=False, default=None)
+    row_count: int = field(init=False, default=None)
+    deadline: float = field(init=False, default=None)
+    _cancelled: bool = field(init=False, default=False, repr=False)
+    _thread_id: int = field(init=False, default=None, repr=False)
 
     @property
     def depends_on_name(self):
@@ -52,6 +73,11 @@ class BaseTask(ABC):
     def runs_on_name(self):
         return str(type(self.runs_on).__name__)
 
+    @property
+    def is_async(self) -> bool:
+        """True if the task wraps an `async def` function."""
+        return inspect.iscoroutinefunction(self._task)
+
     def __call__(self, func: Callable):
         """
         Decorator for registering a task in the DAG.
@@ -75,6 +101,41 @@ class BaseTask(ABC):
         """
         raise NotImplementedError
 
+    @abstractmethod
+    async def arun(self):
+        """
+        Run this task on the running event loop.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def begin(self) -> bool:
+        """
+        Prepare the first attempt of this task.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def attempt(self) -> Optional[float]:
+        """
+        Run one attempt of this task.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def aattempt(self) -> Optional[float]:
+        """
+        Run one attempt of this task on the running event loop.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def cancel(self) -> None:
+        """
+        Cancel the running attempt of this task.
+        """
+        raise NotImplementedError
+
     @abstractmethod
     def _run_task_with_retry(self):
         raise NotImplementedError
@@ -88,9 +149,20 @@ class Task(BaseTask):
     :param depends_on: List of other tasks that this task depends on
     :param runs_on: Schedule for running this task. Default is `Daily()`
     :param retry: Number of times to retry this task in case of failure
+    :param retry_policy: Delay between the attempts and errors retried.
     :param ttl_minutes: Time-to-live in minutes.
     If a positive value is provided,the task will only run
     if the time elapsed since the last run is greater than or equal to this value.
+    :param timeout: Maximum duration in seconds of the task, retries included.
+    Once elapsed, or once the deadline of the workflow is reached,
+    the statement the task runs on the database is cancelled
+    and the task is set in ERROR without retry.
+    :param pool: Name of the resource pool the task uses, see `settings.yml`.
+    Without pool the task is only limited by the workers of the executor.
+    :param slots: Number of slots of the pool the task takes: the task is only
+    dispatched once this number of slots is free in the pool.
+    :param tags: Tags of the task, a partial run selects the tasks
+    with a tag with `tag:<tag>`.
     """
 
     workflow: Workflow = Provide[Container.workflow_factory]
@@ -99,17 +171,103 @@ class Task(BaseTask):
 
     def run(self):
         """
-        Run this task.
+        Run this task, waiting between the attempts.
         """
-        if not self.runs_on.is_scheduled():
-            logging.info(f"task {self.name} is not scheduled to be run: skipping")
+        if not self.begin():
+            return
+        self._run_task_with_retry()
+
+    async def arun(self):
+        """
+        Run this task on the running event loop, the wrapped
+        `async def` function is awaited directly.
+        """
+        if not self.begin():
             return
+        await self._arun_task_with_retry()
+
+    def begin(self) -> bool:
+        """
+        Prepare the first attempt of this task.
+
+        :return: False if the task must not be run, because it is not
+        scheduled today or its last successful run is within its ttl.
+        """
+        if not self.runs_on.is_scheduled(getattr(self.workflow, "run_date", None)):
+            logging.info(f"task {self.name} is not scheduled to be run: skipping")
+            return False
+        if self._is_fresh():
+            self.status = Status.SKIPPED
+            return False
 
         logging.info(f"task {self.name} is scheduled to be run")
-        start_time = time.time()
-        self._run_task_with_retry()
-        elapsed_time = time.time() - start_time
-        logging.info(f"task {self.name} completed in {elapsed_time:.2f} seconds")
+        self._count_call = 0
+        self._cancelled = False
+        self.started_at = time.time()
+        self.ended_at = None
+        self.deadline = self._deadline()
+        return True
+
+    def attempt(self) -> Optional[float]:
+        """
+        Run one attempt of this task, started with `begin`.
+
+        :return: The delay in seconds before the next attempt if this one
+        failed and must be retried, None once the task is finished.
+        """
+        if self._timed_out():
+            return self._on_timeout()
+        self._count_call += 1
+        self._thread_id = threading.get_ident()
+        watchdog = self._watchdog()
+        try:
+            result = self._task()
+            if inspect.isawaitable(result):
+                result = asyncio.run(result)
+            self._set_row_count(result)
+        except Exception as e:
+            return self._on_timeout() if self._cancelled else self._on_failure(e)
+        finally:
+            self._thread_id = None
+            if watchdog is not None:
+                watchdog.cancel()
+        if self._cancelled:
+            return self._on_timeout()
+        self._on_success()
+        return None
+
+    async def aattempt(self) -> Optional[float]:
+        """
+        Run one attempt of this task on the running event loop.
+
+        :return: The delay in seconds before the next attempt if this one
+        failed and must be retried, None once the task is finished.
+        """
+        if self._timed_out():
+            return self._on_timeout()
+        self._count_call += 1
+        timeout = None if self.deadline is None else self.deadline - time.time()
+        try:
+            self._set_row_count(await asyncio.wait_for(self._task(), timeout))
+        except asyncio.TimeoutError:
+            self._cancelled = True
+            return self._on_timeout()
+        except Exception as e:
+            return self._on_failure(e)
+        self._on_success()
+        return None
+
+    def cancel(self) -> None:
+        """
+        Cancel the running attempt of this task: the statement it runs on
+        the database connection of the workflow is cancelled and the attempt
+        ends in ERROR, without retry.
+        """
+        self._cancelled = True
+        thread_id = self._thread_id
+        connection = getattr(self.workflow, "connection", None)
+        if thread_id is not None and connection is not None:
+            connection.cancel(thread_id)
 
     def __eq__(self, other):
         if isinstance(other, Task):
@@ -121,21 +279,93 @@ class Task(BaseTask):
             )
         return False
 
+    def _is_fresh(self) -> bool:
+        """True if the last successful run of the task, kept in the run state
+        of the workflow, is more recent than `ttl_minutes`."""
+        state = getattr(self.workflow, "state", None)
+        if not self.ttl_minutes or state is None:
+            return False
+        last_success = state.get(self.name).get("last_success")
+        if last_success is None:
+            return False
+        age_minutes = (time.time() - last_success) / 60
+        if age_minutes >= self.ttl_minutes:
+            return False
+        logging.info(
+            f"task {self.name} succeeded {age_minutes:.1f} minutes ago, "
+            f"less than its ttl of {self.ttl_minutes} minutes: skipping"
+        )
+        return True
+
+    def _deadline(self) -> Optional[float]:
+        """Return the time the run of the task must be finished by: the
+        earliest of its timeout and of the deadline of the workflow."""
+        deadlines = [getattr(self.workflow, "deadline", None)]
+        if self.timeout:
+            deadlines.append(self.started_at + self.timeout)
+        return min((d for d in deadlines if d is not None), default=None)
+
+    def _timed_out(self) -> bool:
+        return self._cancelled or (
+            self.deadline is not None and time.time() >= self.deadline
+        )
+
+    def _watchdog(self) -> Optional[threading.Timer]:
+        """Start a timer cancelling the attempt once the deadline is reached."""
+        if self.deadline is None:
+            return None
+        timer = threading.Timer(max(0, self.deadline - time.time()), self.cancel)
+        timer.daemon = True
+        timer.start()
+        return timer
+
+    def _set_row_count(self, result) -> None:
+        """A task returning an int reports the number of rows it produced."""
+        is_count = isinstance(result, int) and not isinstance(result, bool)
+        self.row_count = result if is_count else None
+
     def _run_task_with_retry(self):
-        self._count_call = 0
-        for n in range(self.retry + 1):
-            try:
-                self._count_call += 1
-                self._task()
-                self.status = Status.SUCCESS
-                break
-            except Exception:
-                if n == self.retry:
-                    logging.error(
-                        f"task  {self.name} failed after {self.retry}\
-                        attempts: {traceback.print_exc()}"
-                    )
-                    self.status = Status.ERROR
-
-                else:
-                    logging.info(f"retrying task {self.name} try number: {n}")
+        delay = self.attempt()
+        while delay is not None:
+            time.sleep(delay)
+            delay = self.attempt()
+
+    async def _arun_task_with_retry(self):
+        delay = await self.aattempt()
+        while delay is not None:
+            await asyncio.sleep(delay)
+            delay = await self.aattempt()
+
+    def _on_success(self) -> None:
+        self.status = Status.SUCCESS
+        self._end()
+
+    def _on_failure(self, error: Exception) -> Optional[float]:
+        """Return the delay before the next attempt if the error is retried
+        and attempts are left, otherwise set the task in ERROR."""
+        if self._count_call <= self.retry and self.retry_policy.should_retry(error):
+            delay = self.retry_policy.delay(self._count_call)
+            logging.info(
+                f"retrying task {self.name} in {delay:.2f} seconds "
+                f"try number: {self._count_call}"
+            )
+            return delay
+
+        logging.error(
+            f"task  {self.name} failed after {self._count_call}\
+            attempts: {traceback.print_exc()}"
+        )
+        self.status = Status.ERROR
+        self._end()
+        return None
+
+    def _on_timeout(self) -> None:
+        logging.error(f"task {self.name} timed out after {self._count_call} attempts")
+        self.status = Status.ERROR
+        self._end()
+        return None
+
+    def _end(self) -> None:
+        self.ended_at = time.time()
+        elapsed_time = self.ended_at - self.started_at
+        logging.info(f"task {self.name} completed in {elapsed_time:.2f} seconds")
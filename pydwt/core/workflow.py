@@ -1,14 +1,20 @@
+import datetime
 import logging
 import time
 
 from dataclasses import dataclass, field
-from typing import List
+from typing import Callable, List
 
-import matplotlib.pyplot as plt
 import networkx as nx
 
+from pydwt.context.connection import Connection
 from pydwt.core.dag import Dag
+from pydwt.core.enums import Status
 from pydwt.core.executors import AbstractExecutor
+from pydwt.core.export import to_dot, to_html, to_svg
+from pydwt.core.history import RunHistory
+from pydwt.core.state import RunState
+from pydwt.sql.metadata_cache import MetadataCache
 
 
 @dataclass
@@ -18,11 +24,38 @@ class Workflow(object):
     Attributes:
         tasks (List[Type[Task]]): List of tasks to run in the DAG.
         dag (Dag): DAG object for the tasks.
+        executor (AbstractExecutor): Executor running the tasks.
+        connection (Connection): Database connection shared by the tasks,
+        its engine is disposed when a run is finished.
+        metadata_cache (MetadataCache): Cache of the reflected tables,
+        persisted once a run is finished.
+        history (RunHistory): Store the tasks of every run are recorded to,
+        as soon as they are finished. The durations of the previous runs
+        prioritize the critical path.
+        state (RunState): Fingerprints of the last successful run of the tasks.
+        skip_unchanged (bool): True to skip the tasks unchanged since
+        their last successful run.
+        timeout (float): Maximum duration in seconds of a run, the tasks
+        still running once elapsed are cancelled and the pending ones
+        are set in ERROR.
+        deadline (float): Time the current run must be finished by.
+        run_id (int): Identifier of the current run in the history.
+        run_date (datetime): Time the current run started at, the schedules
+        of all its tasks are evaluated at this time.
     """
 
     tasks: List = field(default_factory=list, init=False)
     dag: Dag
     executor: AbstractExecutor
+    connection: Connection = None
+    metadata_cache: MetadataCache = None
+    history: RunHistory = None
+    state: RunState = None
+    skip_unchanged: bool = False
+    timeout: float = None
+    deadline: float = field(init=False, default=None)
+    run_id: int = field(init=False, default=None)
+    run_date: datetime.datetime = field(init=False, default=None)
 
     def __post_init__(self) -> None:
         """Create a DAG object after initialization."""
@@ -33,35 +66,183 @@ class Workflow(object):
     def run(self) -> None:
         """Run the tasks in the DAG."""
         self.dag.build_dag()
-        start_time_workflow = time.time()
-        self.executor.run()
-        elapsed_time_workflow = time.time() - start_time_workflow
-        logging.info(f"workflow completed in {elapsed_time_workflow:.2f} seconds")
+        self._execute(self.tasks)
+
+    def resume(self, run_id: int) -> None:
+        """Run again the tasks of a previous run that did not succeed.
+
+        The tasks in SUCCESS or SKIPPED in the run are set in SUCCESS, the
+        other tasks, failed or never run, are run with their descendants.
+
+        Args:
+            run_id (int): Identifier of the run in the history.
+
+        Raises:
+            ValueError: If there is no history or the run is not in it.
+        """
+        if self.history is None:
+            raise ValueError("Resuming a run requires the run history")
+        statuses = self.history.task_statuses(run_id)
+        resumed = 0
+        for task in self.tasks:
+            if statuses.get(task.name) in (Status.SUCCESS.name, Status.SKIPPED.name):
+                task.status = Status.SUCCESS
+                resumed += 1
+        logging.info(f"resuming run {run_id}: {resumed} tasks already succeeded")
+        self.run()
 
     def run_with_name_and_deps(self, task_name: str) -> None:
         """Run the tasks in the DAG."""
         self.dag.build_dag()
         self.dag.filter_dag(task_name)
+        self._execute(self.dag.tasks)
 
-        self.tasks = self.dag.tasks
-        self.executor.tasks = self.tasks
+    def run_selection(self, selector: str) -> None:
+        """Run the tasks picked by a selector, see `pydwt.core.selector`.
 
-        start_time_workflow = time.time()
-        self.executor.run()
-        elapsed_time_workflow = time.time() - start_time_workflow
-        logging.info(f"workflow completed in {elapsed_time_workflow:.2f} seconds")
+        Args:
+            selector (str): The selector, for instance `orders+` to run
+            the task orders and all its descendants.
+        """
+        self.dag.build_dag()
+        self.dag.select(selector)
+        self._execute(self.dag.tasks)
 
     def run_with_name_no_deps(self, task_name: str) -> None:
         """Run the tasks in the DAG."""
+        self.dag.build_dag()
         task = next(task for task in self.tasks if task.name == task_name)
-        task.run()
+        self._execute([task], run=task.run)
+
+    def _execute(self, tasks: List, run: Callable[[], None] = None) -> None:
+        """Run tasks, recorded in the history and the run state, and dispose
+        the connection once finished.
+
+        Args:
+            tasks (List[Task]): The tasks of the run.
+            run (Callable): Function running the tasks, by default the
+            executor, run with the durations of the previous runs and
+            without the unchanged tasks.
+        """
+        if run is None:
+            self.tasks = tasks
+            self.executor.tasks = tasks
+            self._load_durations()
+            self._skip_unchanged()
+            run = self.executor.run
+        start_time_workflow = time.time()
+        self._set_deadline(start_time_workflow)
+        self._start_run(start_time_workflow)
+        try:
+            run()
+        finally:
+            self._record_run(tasks)
+            self._record_state()
+            self._dispose_connection()
+        elapsed_time_workflow = time.time() - start_time_workflow
+        logging.info(f"workflow completed in {elapsed_time_workflow:.2f} seconds")
 
-    def export_dag(self, path: str) -> None:
-        """Export the DAG to a PNG image file.
+    def _set_deadline(self, start_time: float) -> None:
+        """Set the time the run started at must be finished by, and the date
+        the schedules of its tasks are evaluated at."""
+        self.run_date = datetime.datetime.fromtimestamp(start_time)
+        self.deadline = start_time + self.timeout if self.timeout else None
+
+    def _start_run(self, start_time: float) -> None:
+        """Record the start of the run and checkpoint its tasks as soon
+        as they are finished, a failure to record is logged without
+        failing the run."""
+        self.run_id = None
+        self.executor.on_finish = None
+        if self.history is None:
+            return
+        try:
+            self.run_id = self.history.start_run(start_time)
+        except Exception as e:
+            logging.warning(f"can not record the run in {self.history.path}: {e}")
+        if self.run_id is not None:
+            logging.info(f"run {self.run_id} started")
+            self.executor.on_finish = self._checkpoint
+
+    def _checkpoint(self, task) -> None:
+        """Record a finished task of the run in the history."""
+        try:
+            self.history.checkpoint(self.run_id, task)
+        except Exception as e:
+            logging.warning(f"can not checkpoint task {task.name}: {e}")
+
+    def _load_durations(self) -> None:
+        """Give the executor the durations of the tasks in the previous runs."""
+        if self.history is not None:
+            self.executor.durations = self.history.durations()
+
+    def _skip_unchanged(self) -> None:
+        """Skip the tasks unchanged since their last successful run."""
+        if self.skip_unchanged and self.state is not None:
+            skipped = self.state.skip_unchanged(self.dag)
+            logging.info(f"{len(skipped)} unchanged tasks skipped")
+
+    def _record_state(self) -> None:
+        """Record the fingerprints of the tasks that succeeded, a failure
+        to record is logged without failing the run."""
+        if self.state is None:
+            return
+        try:
+            self.state.record(self.dag)
+        except Exception as e:
+            logging.warning(f"can not record the run state in {self.state.path}: {e}")
+
+    def _record_run(self, tasks: List) -> None:
+        """Record the tasks of the run in the history, a failure to record
+        is logged without failing the run."""
+        if self.run_id is None:
+            return
+        try:
+            self.history.end_run(self.run_id, time.time(), tasks)
+        except Exception as e:
+            logging.warning(f"can not record the run in {self.history.path}: {e}")
+
+    def _dispose_connection(self) -> None:
+        """Dispose the connection pool and log how much of it was used, and
+        persist the tables reflected during the run, a failure to persist
+        is logged without failing the run."""
+        if self.metadata_cache is not None:
+            self.metadata_cache.flush()
+        if self.connection is None:
+            return
+        logging.info(
+            f"peak of {self.connection.metrics.peak_in_use} connections in use "
+            f"for {self.executor.nb_workers} workers"
+        )
+        self.connection.dispose()
+
+    def export_dag(self, path: str, format: str = "png") -> None:
+        """Export the DAG to a file.
 
         Args:
-            path (str): Path to the directory where the image file should be saved.
+            path (str): Path of the file to write.
+            format (str): "png" for an image drawn with a spring layout,
+            "dot" for Graphviz, "svg" for an image with a layered layout or
+            "html" for an interactive page, see `pydwt.core.export`. The
+            spring layout is only readable for small DAGs.
+
+        Raises:
+            ValueError: If the format is not supported.
         """
+        if format == "png":
+            self._export_png(path)
+            return
+        writers = {"dot": to_dot, "svg": to_svg, "html": to_html}
+        if format not in writers:
+            raise ValueError(f"Unsupported DAG export format: {format}")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(writers[format](self.dag))
+
+    def _export_png(self, path: str) -> None:
+        """Draw the DAG with a spring layout to a PNG image file."""
+        # Only this command draws, matplotlib is slow to import
+        import matplotlib.pyplot as plt
+
         graph = self.dag.graph
         node_names = nx.get_node_attributes(graph, "name")
         pos = nx.spring_layout(graph)
@@ -0,0 +1,82 @@
+"""
+Module that provide the conversion of DataFrame rows to Apache Arrow
+record batches, built batch by batch.
+
+pyarrow is an optional dependency, it is imported on first use.
+"""
+
+import datetime
+import importlib
+from typing import Iterator, List
+
+import sqlalchemy
+
+
+def import_pyarrow(module: str = "pyarrow"):
+    """Import pyarrow, or one of its submodules, or raise an explicit error
+    if it is not installed."""
+    try:
+        return importlib.import_module(module)
+    except ImportError as e:
+        raise ImportError(
+            "pyarrow is required to export a DataFrame to Arrow, "
+            "install it with `pip install pydwt[arrow]`"
+        ) from e
+
+
+def arrow_type(pa, sql_type: sqlalchemy.types.TypeEngine):
+    """Return the Arrow type of a SQLAlchemy type, None if it must be inferred."""
+    types = {
+        bool: pa.bool_(),
+        int: pa.int64(),
+        float: pa.float64(),
+        str: pa.string(),
+        bytes: pa.binary(),
+        datetime.datetime: pa.timestamp("us"),
+        datetime.date: pa.date32(),
+        datetime.time: pa.time64("us"),
+    }
+    try:
+        return types.get(sql_type.python_type)
+    except NotImplementedError:
+        return None
+
+
+def to_record_batches(
+    names: List[str], sql_types: List, batches: Iterator[List]
+) -> Iterator:
+    """Convert batches of rows to Arrow record batches.
+
+    Column types come from the SQLAlchemy types when they are known, otherwise
+    they are inferred from the first batch with non null values, so every
+    record batch has the same schema.
+
+    Args:
+        names (List[str]): Names of the columns.
+        sql_types (List[TypeEngine]): SQLAlchemy types of the columns.
+        batches (Iterator[List]): Batches of rows.
+
+    Returns:
+        Iterator[RecordBatch]: Record batches.
+    """
+    pa = import_pyarrow()
+    types = [arrow_type(pa, sql_type) for sql_type in sql_types]
+    for batch in batches:
+        arrays = []
+        for i, values in enumerate(zip(*batch)):
+            array = pa.array(values, type=types[i])
+            if types[i] is None and array.type != pa.null():
+                types[i] = array.type
+            arrays.append(array)
+        yield pa.RecordBatch.from_arrays(arrays, names=names)
+
+
+def schema(names: List[str], sql_types: List):
+    """Return the Arrow schema used when a DataFrame has no rows."""
+    pa = import_pyarrow()
+    return pa.schema(
+        [
+            (name, arrow_type(pa, sql_type) or pa.null())
+            for name, sql_type in zip(names, sql_types)
+        ]
+    )
@@ -1,14 +1,32 @@
 from __future__ import annotations
-from typing import List, Literal
+from typing import Iterator, List, Literal, Optional, Union
 import sqlalchemy
-from sqlalchemy import select, join, union_all, text, column
-from pydwt.sql.materializations import CreateTableAs, CreateViewAs
+from sqlalchemy import func, select, join, union_all, text
+from sqlalchemy.sql.util import ClauseAdapter
+from pydwt.sql import arrow, dry_run
+from pydwt.sql.materializations import (
+    CreateTableAs,
+    CreateViewAs,
+    DropTableIfExists,
+    incremental_statements,
+    swap_statements,
+)
+from pydwt.sql.plan import LogicalPlan
+
+
+def _row_count(result: sqlalchemy.CursorResult) -> Optional[int]:
+    """Number of rows written by a statement, None if the driver does not know."""
+    return result.rowcount if result.rowcount >= 0 else None
 
 
 class DataFrame(dict):
     """DataFrame class is an interface that allows to manipulate data
     using SQL-like operations on top of SQLAlchemy core.
 
+    Each DataFrame holds a logical plan: consecutive projections and filters
+    are merged in a single SELECT, SQL is only generated when the DataFrame
+    is collected, shown or materialized.
+
     Args:
         base (selectable): Initial SQLAlchemy selectable object.
         engine (Engine): SQLAlchemy engine to execute the SQL commands.
@@ -23,16 +41,35 @@ class DataFrame(dict):
 
     def __init__(self, base, engine):
         """Initialize the DataFrame object."""
-        self._stmt = base
         self._engine = engine
-        for col in self._stmt.columns:
-            name = str(col).split(".")[-1]
-            self[name] = getattr(self._stmt.c, name)
+        self._set_plan(LogicalPlan.scan(base))
+
+    @classmethod
+    def _from_plan(cls, plan: LogicalPlan, engine) -> DataFrame:
+        """Create a DataFrame from a logical plan."""
+        df = cls.__new__(cls)
+        df._engine = engine
+        df._set_plan(plan)
+        return df
+
+    def _set_plan(self, plan: LogicalPlan) -> None:
+        self._plan = plan
+        for name, col in plan.columns:
+            self[name] = col
+
+    @property
+    def _stmt(self):
+        """The DataFrame as a FROM clause, built from the plan on demand."""
+        return self._plan.to_from_clause()
+
+    def _adapt(self, expr):
+        """Rewrite an expression on the columns of `_stmt`."""
+        return ClauseAdapter(self._stmt).traverse(expr)
 
     @property
     def columns(self) -> List[str]:
         """Return a list of the column names in the dataframe."""
-        return [str(col).split(".")[-1] for col in self._stmt.columns]
+        return self._plan.names
 
     def select(self, *args) -> DataFrame:
         """Create a new DataFrame that only has the columns specified.
@@ -50,8 +87,8 @@ class DataFrame(dict):
             else:
                 columns.append(arg)
 
-        projection = select(*columns).cte()
-        return DataFrame(projection, self._engine)
+        names = [col.name for col in select(*columns).subquery().columns]
+        return self._with_plan(self._plan.project(list(zip(names, columns))))
 
     def where(self, expr) -> DataFrame:
         """Create a new DataFrame that only has rows that meet the condition.
@@ -63,10 +100,8 @@ class DataFrame(dict):
             DataFrame: New DataFrame with only the rows that meet the condition.
         """
         if isinstance(expr, str):
-            filtered = select(self._stmt).where(text(expr)).cte()
-        else:
-            filtered = select(self._stmt).where(expr).cte()
-        return DataFrame(filtered, self._engine)
+            expr = text(expr)
+        return self._with_plan(self._plan.filter(expr))
 
     def filter(self, condition: str) -> DataFrame:
         """
@@ -92,7 +127,8 @@ class DataFrame(dict):
         Returns:
             DataFrame: New DataFrame with an additional column.
         """
-        return DataFrame(select(self._stmt, expr.label(name)).cte(), self._engine)
+        columns = [*self._plan.columns, (name, expr.label(name))]
+        return self._with_plan(self._plan.project(columns))
 
     def with_column_renamed(self, old_name: str, new_name: str) -> DataFrame:
         """Create a new DataFrame with the given column renamed.
@@ -104,12 +140,11 @@ class DataFrame(dict):
         Returns:
             DataFrame: New DataFrame with the given column renamed.
         """
-        cols = [
-            self[old_name].label(new_name) if col == old_name else self[col]
-            for col in self.columns
+        columns = [
+            (new_name, col.label(new_name)) if name == old_name else (name, col)
+            for name, col in self._plan.columns
         ]
-        stmt = select(*cols)
-        return DataFrame(stmt.cte(), self._engine)
+        return self._with_plan(self._plan.project(columns))
 
     def drop(self, *args) -> DataFrame:
         """Returns a new DataFrame object with the specified columns removed.
@@ -120,9 +155,8 @@ class DataFrame(dict):
         Returns:
             A new DataFrame object with the specified columns removed.
         """
-        cols = [self[col] for col in self.columns if col not in args]
-        stmt = select(*cols)
-        return DataFrame(stmt.cte(), self._engine)
+        columns = [(name, col) for name, col in self._plan.columns if name not in args]
+        return self._with_plan(self._plan.project(columns))
 
     def group_by(self, *args, **kwargs) -> DataFrame:
         """Create a new DataFrame that has grouped rows.
@@ -138,6 +172,7 @@ class DataFrame(dict):
             DataFrame: New DataFrame with grouped rows.
         """
         grouped = None
+        args = [self._adapt(arg) for arg in args]
         agg = kwargs.get("agg", None)
         if agg:
             agg_expr = []
@@ -166,7 +201,8 @@ class DataFrame(dict):
         if how not in ["inner", "left", "right", "full"]:
             raise ValueError(f"Unsupported join type {how}.")
 
-        # Perform the join operation
+        # Perform the join operation on the plans built as FROM clauses
+        expr = other._adapt(self._adapt(expr))
         if how == "left":
             stmt = select(join(self._stmt, other._stmt, expr, isouter=True))
         elif how == "right":
@@ -184,7 +220,7 @@ class DataFrame(dict):
         Print the first 20 rows of the DataFrame.
         """
         conn = self._engine.connect()
-        q = select(self._stmt).limit(20)
+        q = self._plan.to_select().limit(20)
         print(conn.execute(q).fetchall())
         conn.close()
 
@@ -192,35 +228,134 @@ class DataFrame(dict):
         "Return the DataFrame as a SQLAlchemy cte"
         return self._stmt
 
-    def materialize(self, name: str, as_: Literal["view", "table"]) -> None:
+    def materialize(
+        self,
+        name: str,
+        as_: Literal["view", "table", "table_swap", "incremental"],
+        unique_key: Union[str, List[str]] = None,
+        watermark: str = None,
+    ) -> Optional[int]:
         """
         Materialize the query as a table or view in the database.
 
         Args:
             name (str): The name of the table or view to create.
-            as_ (Literal["view", "table"]): The type of object to create.
+            as_ (Literal["view", "table", "table_swap", "incremental"]): The
+            type of object to create. "table_swap" builds the table under a
+            temporary name and then swaps it with the existing table, so the
+            table is never missing and is kept as is if the build fails.
+            "incremental" creates the table on the first run, then only
+            upserts the rows whose watermark is newer than the maximum watermark
+            of the table.
+            unique_key (Union[str, List[str]]): With "incremental", the columns
+            identifying a row: rows of the table with the same key as a new row
+            are replaced. Without unique key new rows are appended.
+            watermark (str): With "incremental", the column ordering the rows,
+            usually an update timestamp.
+
+        Returns:
+            Optional[int]: The number of rows written, when the database reports
+            it, so that a task can return it to the run history.
 
         Raises:
             ValueError: If an unsupported materialization type is specified.
 
         """
-        # Convert the statement to a SELECT statement
-        self._stmt = select(self._stmt)
+        recorded = dry_run.active()
+        if recorded is not None:
+            if as_ not in ("view", "table", "table_swap", "incremental"):
+                raise ValueError(f"Unsupported materialization type: {as_}")
+            recorded.materializations.append(
+                {"name": name, "as": as_, "sql": self._compile()}
+            )
+            return None
+        if as_ == "incremental":
+            return self._materialize_incremental(name, unique_key, watermark)
+        if as_ == "table_swap":
+            return self._materialize_swap(name)
+
+        # Generate the SELECT statement of the plan
+        stmt = self._plan.to_select()
 
         if as_ == "view":
-            materialization = CreateViewAs(name, self._stmt)
+            materialization = CreateViewAs(name, stmt)
         elif as_ == "table":
-            materialization = CreateTableAs(name, self._stmt)
+            materialization = CreateTableAs(name, stmt)
         else:
             # Raise an error if an unsupported materialization type is specified
             raise ValueError(f"Unsupported materialization type: {as_}")
 
         # Execute the materialization query
-        q = materialization.compile(bind=self._engine)
         conn = self._engine.connect()
-        conn.execute(q)
+        result = conn.execute(materialization)
         conn.commit()
         conn.close()
+        return _row_count(result) if as_ == "table" else None
+
+    def _compile(self) -> str:
+        """Return the SELECT query of the plan compiled for the dialect of the
+        engine, with the parameters inlined when they can be."""
+        stmt = self._plan.to_select()
+        dialect = self._engine.dialect
+        try:
+            return str(
+                stmt.compile(dialect=dialect, compile_kwargs={"literal_binds": True})
+            )
+        except Exception:
+            return str(stmt.compile(dialect=dialect))
+
+    def _materialize_swap(self, name: str) -> Optional[int]:
+        """Build the table under a temporary name, then swap it with the
+        existing table, in a single transaction."""
+        schema, _, table_name = name.rpartition(".")
+        tmp_name = f"{name}__pydwt_tmp"
+        with self._engine.begin() as conn:
+            conn.execute(DropTableIfExists(tmp_name))
+            result = conn.execute(
+                CreateTableAs(tmp_name, self._plan.to_select(), replace=False)
+            )
+            exists = sqlalchemy.inspect(conn).has_table(table_name, schema or None)
+            for statement in swap_statements(name, tmp_name, exists, conn.dialect):
+                conn.execute(statement)
+        return _row_count(result)
+
+    def _materialize_incremental(
+        self, name: str, unique_key: Union[str, List[str]], watermark: str
+    ) -> Optional[int]:
+        """Create the table if it does not exist, otherwise upsert the rows
+        newer than its maximum watermark, in a single transaction. Return the
+        number of rows created or upserted."""
+        if watermark not in self.columns:
+            raise ValueError(f"Watermark column {watermark} is not in the dataframe")
+        unique_key = [unique_key] if isinstance(unique_key, str) else unique_key or []
+        for key in unique_key:
+            if key not in self.columns:
+                raise ValueError(f"Unique key column {key} is not in the dataframe")
+
+        schema, _, table_name = name.rpartition(".")
+        with self._engine.begin() as conn:
+            if not sqlalchemy.inspect(conn).has_table(table_name, schema or None):
+                return _row_count(
+                    conn.execute(
+                        CreateTableAs(name, self._plan.to_select(), replace=False)
+                    )
+                )
+
+            target = sqlalchemy.table(
+                table_name, sqlalchemy.column(watermark), schema=schema or None
+            )
+            last = conn.execute(select(func.max(target.c[watermark]))).scalar()
+            new_rows = self if last is None else self.where(self[watermark] > last)
+            statements = incremental_statements(
+                name,
+                new_rows._plan.to_select(),
+                unique_key,
+                self.columns,
+                conn.dialect,
+            )
+            for statement in statements:
+                result = conn.execute(statement)
+        return _row_count(result)
 
     def collect(self) -> List[dict]:
         """
@@ -231,10 +366,161 @@ class DataFrame(dict):
             where each dictionary represents a row in the dataframe.
         """
         conn = self._engine.connect()
-        result = conn.execute(select(self._stmt)).fetchall()
+        result = conn.execute(self._plan.to_select()).fetchall()
         conn.close()
         return result
 
+    def iter_batches(self, batch_size: int = 1000) -> Iterator[List[sqlalchemy.Row]]:
+        """
+        Iterate over the data in the dataframe by batches of rows.
+
+        Rows are fetched with a server-side cursor where the driver supports it,
+        so only one batch is held in memory at a time. The connection is opened
+        on the first batch and closed once the iterator is exhausted or closed.
+
+        Args:
+            batch_size (int): Number of rows per batch.
+
+        Returns:
+            Iterator[List[Row]]: Iterator over lists of at most `batch_size` rows.
+        """
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be positive, got {batch_size}")
+        with self._engine.connect() as conn:
+            conn = conn.execution_options(stream_results=True, yield_per=batch_size)
+            result = conn.execute(self._plan.to_select())
+            for batch in result.partitions():
+                yield batch
+
+    def stream(self, batch_size: int = 1000) -> Iterator[sqlalchemy.Row]:
+        """
+        Iterate over the rows of the dataframe without loading them all in memory.
+
+        Args:
+            batch_size (int): Number of rows fetched from the database at once.
+
+        Returns:
+            Iterator[Row]: Iterator over the rows of the dataframe.
+        """
+        for batch in self.iter_batches(batch_size):
+            yield from batch
+
+    def iter_arrow_batches(self, batch_size: int = 100_000) -> Iterator:
+        """
+        Iterate over the data in the dataframe as Arrow record batches.
+
+        Requires pyarrow.
+
+        Args:
+            batch_size (int): Number of rows per record batch.
+
+        Returns:
+            Iterator[pyarrow.RecordBatch]: Iterator over the record batches.
+        """
+        sql_types = [col.type for _, col in self._plan.columns]
+        return arrow.to_record_batches(
+            self.columns, sql_types, self.iter_batches(batch_size)
+        )
+
+    def to_arrow(self, batch_size: int = 100_000):
+        """
+        Retrieve all the data in the dataframe as an Arrow table,
+        built batch by batch. Requires pyarrow.
+
+        Args:
+            batch_size (int): Number of rows fetched at once.
+
+        Returns:
+            pyarrow.Table: The data of the dataframe.
+        """
+        pa = arrow.import_pyarrow()
+        tables = [
+            pa.Table.from_batches([batch])
+            for batch in self.iter_arrow_batches(batch_size)
+        ]
+        if not tables:
+            sql_types = [col.type for _, col in self._plan.columns]
+            return arrow.schema(self.columns, sql_types).empty_table()
+        # Columns of unknown type are typed null until their first value
+        schema = pa.unify_schemas([table.schema for table in tables])
+        return pa.concat_tables([table.cast(schema) for table in tables])
+
+    def to_pandas(self, batch_size: int = 100_000):
+        """
+        Retrieve all the data in the dataframe as a pandas DataFrame,
+        converted from an Arrow table. Requires pyarrow and pandas.
+
+        Args:
+            batch_size (int): Number of rows fetched at once.
+
+        Returns:
+            pandas.DataFrame: The data of the dataframe.
+        """
+        return self.to_arrow(batch_size).to_pandas()
+
+    def to_parquet(self, path: str, batch_size: int = 100_000, **kwargs) -> None:
+        """
+        Write the data in the dataframe to a Parquet file, one batch at a time.
+        Requires pyarrow.
+
+        Args:
+            path (str): Path of the Parquet file.
+            batch_size (int): Number of rows fetched and written at once.
+            **kwargs: Forwarded to `pyarrow.parquet.ParquetWriter`.
+        """
+        pq = arrow.import_pyarrow("pyarrow.parquet")
+        self._write_arrow(
+            lambda schema: pq.ParquetWriter(path, schema, **kwargs), batch_size
+        )
+
+    def to_feather(self, path: str, batch_size: int = 100_000) -> None:
+        """
+        Write the data in the dataframe to a Feather (Arrow IPC) file,
+        one batch at a time. Requires pyarrow.
+
+        Args:
+            path (str): Path of the Feather file.
+            batch_size (int): Number of rows fetched and written at once.
+        """
+        pa = arrow.import_pyarrow()
+        self._write_arrow(lambda schema: pa.ipc.new_file(path, schema), batch_size)
+
+    def _write_arrow(self, open_writer, batch_size: int) -> None:
+        """Write the record batches with a writer opened once the type of
+        every column is known.
+
+        The columns of unknown SQL type are typed null until their first non
+        null value: the batches are held until then, and all the batches are
+        cast to the schema unified from the held ones.
+        """
+        pa = arrow.import_pyarrow()
+        writer, schema, held = None, None, []
+
+        def open_with(batches):
+            nonlocal writer, schema
+            schema = pa.unify_schemas([batch.schema for batch in batches])
+            writer = open_writer(schema)
+            for batch in batches:
+                writer.write_table(pa.Table.from_batches([batch]).cast(schema))
+
+        try:
+            for batch in self.iter_arrow_batches(batch_size):
+                if writer is not None:
+                    writer.write_table(pa.Table.from_batches([batch]).cast(schema))
+                    continue
+                held.append(batch)
+                if all(column.type != pa.null() for column in batch.schema):
+                    open_with(held)
+                    held = []
+            if writer is None and held:
+                open_with(held)
+            if writer is None:
+                sql_types = [col.type for _, col in self._plan.columns]
+                writer = open_writer(arrow.schema(self.columns, sql_types))
+        finally:
+            if writer is not None:
+                writer.close()
+
     def union(self, other: "DataFrame") -> DataFrame:
         """
         Return a new DataFrame that is the union
@@ -260,7 +546,7 @@ class DataFrame(dict):
                 self = self.with_column(col, sqlalchemy.sql.expression.null())
 
         # Construct the union statement
-        union_stmt = union_all(select(self._stmt), select(other._stmt)).cte()
+        union_stmt = union_all(self._plan.to_select(), other._plan.to_select()).cte()
 
         # Return the result as a new DataFrame
         return DataFrame(union_stmt, self._engine)
@@ -270,6 +556,8 @@ class DataFrame(dict):
         Returns:
             DataFrame: New DataFrame with only distinct rows based on the columns specified.
         """
-        stmt = select(self._stmt).distinct()
+        return self._with_plan(self._plan.with_distinct())
 
-        return DataFrame(stmt.cte(), self._engine)
+    def _with_plan(self, plan: LogicalPlan) -> DataFrame:
+        """Create a new DataFrame from a plan derived from this DataFrame."""
+        return DataFrame._from_plan(plan, self._engine)
@@ -0,0 +1,108 @@
+"""
+Module that provide the dry run of the models, used to compile their SQL
+without executing it.
+
+While a dry run is active, the statements sent by any engine of the process
+are recorded instead of executed: the DBAPI cursor is never called, so the
+database is left untouched. Only the reflection of the source tables reaches
+the database, it reads the catalog. A model reading rows, to collect or export
+them, gets no result and its dry run stops there, before writing any file.
+`DataFrame.materialize` records its target, materialization type and SELECT
+compiled for the dialect of the engine instead of running its statements.
+"""
+
+import contextlib
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy import Engine, event
+
+
+@dataclass
+class DryRun(object):
+    """What the models sent to the database during a dry run.
+
+    Attributes:
+        materializations (List[Dict]): The calls to `DataFrame.materialize`,
+        with the `name` of the target, the materialization type `as` and the
+        `sql` of the SELECT.
+        statements (List[str]): The other statements, as sent to the driver.
+    """
+
+    materializations: List[Dict] = field(default_factory=list)
+    statements: List[str] = field(default_factory=list)
+
+
+# Active dry run, process-wide so that the threads started by a model are
+# not left out
+_active: Optional[DryRun] = None
+_lock = threading.Lock()
+# Threads reflecting a table, their statements are executed
+_reflecting = threading.local()
+_listening = False
+
+
+@contextlib.contextmanager
+def dry_run() -> Iterator[DryRun]:
+    """Record the statements sent to the database instead of executing them.
+
+    Yields:
+        DryRun: The statements recorded.
+    """
+    global _active
+    _listen()
+    recorded = DryRun()
+    with _lock:
+        previous, _active = _active, recorded
+    try:
+        yield recorded
+    finally:
+        with _lock:
+            _active = previous
+
+
+def active() -> Optional[DryRun]:
+    """Return the active dry run, None if statements are executed."""
+    return _active
+
+
+@contextlib.contextmanager
+def reflecting() -> Iterator[None]:
+    """Execute the statements of the current thread while reflecting
+    a table, even during a dry run."""
+    previous = getattr(_reflecting, "active", False)
+    _reflecting.active = True
+    try:
+        yield
+    finally:
+        _reflecting.active = previous
+
+
+def _listen() -> None:
+    """Listen to the executions of every engine, once."""
+    global _listening
+    with _lock:
+        if _listening:
+            return
+        event.listen(Engine, "do_execute", _record)
+        event.listen(Engine, "do_executemany", _record)
+        event.listen(Engine, "do_execute_no_params", _record_no_params)
+        _listening = True
+
+
+def _record(cursor, statement, parameters, context) -> bool:
+    """Record a statement instead of executing it during a dry run.
+
+    Returns:
+        bool: True if the statement must not be executed.
+    """
+    recorded = _active
+    if recorded is None or getattr(_reflecting, "active", False):
+        return False
+    recorded.statements.append(statement)
+    return True
+
+
+def _record_no_params(cursor, statement, context) -> bool:
+    return _record(cursor, statement, None, context)
@@ -1,7 +1,20 @@
+from sqlalchemy import and_, column, delete, exists, insert, literal, select, table
+from sqlalchemy.engine import Dialect
 from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.sql.expression import ClauseElement, Executable
 from sqlalchemy.sql.selectable import Selectable
-from typing import Any
+from typing import Any, List
+
+# Dialects supporting the MERGE statement used by incremental materializations,
+# with the minimal server version, the others delete the rows to replace and
+# insert the new rows. SQL Server is left out as it does not accept the CTEs
+# of the new rows query inside the USING clause.
+MERGE_DIALECTS = {"oracle": (), "snowflake": (), "postgresql": (15,)}
+
+# Dialects swapping two tables in a single statement, used by the table_swap
+# materialization. The others rename the tables one after the other, inside
+# the transaction of the materialization.
+SWAP_DIALECTS = ("snowflake", "mysql", "mariadb")
 
 
 class CreateTableAs(Executable, ClauseElement):
@@ -14,9 +27,10 @@ class CreateTableAs(Executable, ClauseElement):
 
     inherit_cache = True
 
-    def __init__(self, name: str, select_query: Selectable):
+    def __init__(self, name: str, select_query: Selectable, replace: bool = True):
         self.name = name
         self.select_query = select_query
+        self.replace = replace
 
 
 @compiles(CreateTableAs)
@@ -29,6 +43,15 @@ def visit_create_table_as(element: Any, compiler: Any, **kw: str) -> str:
     :return: _description_
     :rtype: str
     """
+    if not element.replace:
+        return """
+CREATE TABLE {0}
+AS
+{1}
+""".format(
+            element.name,
+            compiler.process(element.select_query, literal_binds=True),
+        )
     return """
 DROP TABLE IF EXISTS {0};
 CREATE TABLE {0}
@@ -73,3 +96,215 @@ AS
         element.name,
         compiler.process(element.select_query, literal_binds=True),
     )
+
+
+class MergeInto(Executable, ClauseElement):
+    """MERGE the rows of a query into a table on a unique key.
+
+    :param name: Name of the target table.
+    :param select_query: Query returning the new rows.
+    :param unique_key: Columns identifying a row.
+    :param columns: Columns of the query, in order.
+    """
+
+    inherit_cache = False
+
+    def __init__(
+        self,
+        name: str,
+        select_query: Selectable,
+        unique_key: List[str],
+        columns: List[str],
+    ):
+        self.name = name
+        self.select_query = select_query
+        self.unique_key = unique_key
+        self.columns = columns
+
+
+@compiles(MergeInto)
+def visit_merge_into(element: Any, compiler: Any, **kw: str) -> str:
+    """Compile a MergeInto element to a MERGE statement.
+
+    :param element: The MergeInto element.
+    :param compiler: The SQL compiler of the dialect.
+    :return: The MERGE statement.
+    """
+    quote = compiler.preparer.quote
+    source = compiler.process(
+        element.select_query.subquery("pydwt_new"), asfrom=True, **kw
+    )
+    on = " AND ".join(
+        f"pydwt_target.{quote(key)} = pydwt_new.{quote(key)}"
+        for key in element.unique_key
+    )
+    updates = ", ".join(
+        f"{quote(col)} = pydwt_new.{quote(col)}"
+        for col in element.columns
+        if col not in element.unique_key
+    )
+    merge = f"""
+MERGE INTO {element.name} pydwt_target
+USING {source}
+ON ({on})
+"""
+    if updates:
+        merge += f"WHEN MATCHED THEN UPDATE SET {updates}\n"
+    merge += "WHEN NOT MATCHED THEN INSERT ({}) VALUES ({})".format(
+        ", ".join(quote(col) for col in element.columns),
+        ", ".join(f"pydwt_new.{quote(col)}" for col in element.columns),
+    )
+    return merge
+
+
+class DropTableIfExists(Executable, ClauseElement):
+    """DROP a table if it exists.
+
+    :param name: Name of the table, optionally prefixed by its schema.
+    """
+
+    inherit_cache = False
+
+    def __init__(self, name: str):
+        self.name = name
+
+
+@compiles(DropTableIfExists)
+def visit_drop_table_if_exists(element: Any, compiler: Any, **kw: str) -> str:
+    return f"DROP TABLE IF EXISTS {element.name}"
+
+
+class RenameTable(Executable, ClauseElement):
+    """Rename a table, the table stays in its schema.
+
+    :param name: Name of the table, optionally prefixed by its schema.
+    :param new_name: New name of the table, without schema.
+    """
+
+    inherit_cache = False
+
+    def __init__(self, name: str, new_name: str):
+        self.name = name
+        self.new_name = new_name
+
+
+@compiles(RenameTable)
+def visit_rename_table(element: Any, compiler: Any, **kw: str) -> str:
+    return f"ALTER TABLE {element.name} RENAME TO {element.new_name}"
+
+
+@compiles(RenameTable, "mssql")
+def visit_rename_table_mssql(element: Any, compiler: Any, **kw: str) -> str:
+    return f"EXEC sp_rename '{element.name}', '{element.new_name}'"
+
+
+class SwapTable(Executable, ClauseElement):
+    """Swap the content of two tables in a single statement, only compiled
+    for the dialects of SWAP_DIALECTS.
+
+    :param name: Name of the first table, optionally prefixed by its schema.
+    :param other: Name of the second table, in the same schema.
+    """
+
+    inherit_cache = False
+
+    def __init__(self, name: str, other: str):
+        self.name = name
+        self.other = other
+
+
+@compiles(SwapTable, "snowflake")
+def visit_swap_table_snowflake(element: Any, compiler: Any, **kw: str) -> str:
+    return f"ALTER TABLE {element.name} SWAP WITH {element.other}"
+
+
+@compiles(SwapTable, "mysql")
+@compiles(SwapTable, "mariadb")
+def visit_swap_table_mysql(element: Any, compiler: Any, **kw: str) -> str:
+    # RENAME TABLE renames all the tables atomically
+    swap = f"{element.other}__swap"
+    return (
+        f"RENAME TABLE {element.name} TO {swap}, "
+        f"{element.other} TO {element.name}, "
+        f"{swap} TO {element.other}"
+    )
+
+
+def supports_merge(dialect: Dialect) -> bool:
+    """True if the database supports the MERGE statement.
+
+    :param dialect: Dialect of the database.
+    """
+    if dialect.name not in MERGE_DIALECTS:
+        return False
+    version = dialect.server_version_info or ()
+    return version >= MERGE_DIALECTS[dialect.name]
+
+
+def incremental_statements(
+    name: str,
+    select_query: Selectable,
+    unique_key: List[str],
+    columns: List[str],
+    dialect: Dialect,
+) -> List[Executable]:
+    """Return the statements upserting the new rows of a query into a table.
+
+    Dialects supporting MERGE get a single MERGE statement, the others
+    delete the rows of the table matching the unique key of a new row,
+    then insert the new rows. Without unique key the new rows are appended.
+
+    :param name: Name of the target table, optionally prefixed by its schema.
+    :param select_query: Query returning the new rows.
+    :param unique_key: Columns identifying a row.
+    :param columns: Columns of the query, in order.
+    :param dialect: Dialect of the database.
+    :return: The statements to execute in a transaction.
+    """
+    if unique_key and supports_merge(dialect):
+        return [MergeInto(name, select_query, unique_key, columns)]
+
+    schema, _, table_name = name.rpartition(".")
+    target = table(table_name, *[column(col) for col in columns], schema=schema or None)
+    statements = []
+    if unique_key:
+        new_rows = select_query.subquery("pydwt_new")
+        matching = and_(*[new_rows.c[key] == target.c[key] for key in unique_key])
+        statements.append(
+            delete(target).where(
+                exists(select(literal(1)).select_from(new_rows).where(matching))
+            )
+        )
+    statements.append(insert(target).from_select(columns, select_query))
+    return statements
+
+
+def swap_statements(
+    name: str, tmp_name: str, exists: bool, dialect: Dialect
+) -> List[Executable]:
+    """Return the statements replacing a table by a table built under a
+    temporary name, in the same schema.
+
+    The previous table is kept until the new one is in place, then dropped.
+    On databases with transactional DDL the swap is atomic when the
+    statements are executed in a transaction.
+
+    :param name: Name of the table, optionally prefixed by its schema.
+    :param tmp_name: Name of the new table, optionally prefixed by its schema.
+    :param exists: True if the table to replace exists.
+    :param dialect: Dialect of the database.
+    :return: The statements to execute in a transaction.
+    """
+    _, _, table_name = name.rpartition(".")
+    if not exists:
+        return [RenameTable(tmp_name, table_name)]
+    if dialect.name in SWAP_DIALECTS:
+        return [SwapTable(name, tmp_name), DropTableIfExists(tmp_name)]
+
+    old_name = f"{name}__pydwt_old"
+    return [
+        DropTableIfExists(old_name),
+        RenameTable(name, old_name.rpartition(".")[2]),
+        RenameTable(tmp_name, table_name),
+        DropTableIfExists(old_name),
+    ]
@@ -0,0 +1,211 @@
+"""
+Module that provide a cache of the reflected tables, shared by the Sessions
+of a run and optionally persisted on disk between runs.
+
+Tables are reflected outside of the lock of the cache, so workers reflecting
+different tables query the catalog concurrently, and the cache is only written
+to disk by `flush`, once per run. Worker processes do not write it: they hand
+the tables they reflected to the parent process, see `take_reflected`, which
+merges them into its own cache before writing it.
+"""
+
+import logging
+import os
+import pickle
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import MetaData, Table
+
+from pydwt.sql import dry_run
+
+
+class MetadataCache(object):
+    """Cache of the tables reflected from the database, keyed by (schema, table).
+
+    Args:
+        path (str): Optional path of the file the cache is persisted to.
+        ttl_minutes (float): Optional time-to-live of a reflected table.
+        Once expired the table is reflected again.
+    """
+
+    def __init__(self, path: str = None, ttl_minutes: float = None) -> None:
+        self.path = path
+        self.ttl_minutes = ttl_minutes
+        self._lock = threading.RLock()
+        self._table_locks: Dict[Tuple[Optional[str], str], threading.Lock] = {}
+        self._metadata: Dict[Optional[str], MetaData] = {}
+        self._reflected_at: Dict[Tuple[Optional[str], str], float] = {}
+        # Tables reflected since the last call to `take_reflected`
+        self._reflected: Dict[Tuple[Optional[str], str], Tuple[float, Table]] = {}
+        self._loaded = False
+        self._dirty = False
+
+    def table(self, engine, name: str, schema: str = None) -> Table:
+        """Return the reflected table, reflect it only if not cached.
+
+        The table is reflected under a lock of its own, into a private
+        metadata copied to the shared one once reflected: only the workers
+        asking for the same table wait for each other.
+
+        Args:
+            engine: A SQLAlchemy engine object.
+            name (str): The name of the table.
+            schema (str): The schema of the table.
+
+        Returns:
+            Table: The reflected table.
+        """
+        key = (schema, name)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+        with self._lock:
+            table_lock = self._table_locks.setdefault(key, threading.Lock())
+        with table_lock:
+            # Reflected by another worker while waiting for the lock
+            cached = self._cached(key)
+            if cached is not None:
+                return cached
+            with dry_run.reflecting():
+                reflected = Table(name, MetaData(schema=schema), autoload_with=engine)
+            with self._lock:
+                reflected_at = time.time()
+                self._reflected[key] = (reflected_at, reflected)
+                return self._store(key, reflected, reflected_at)
+
+    def take_reflected(self) -> Dict[Tuple[Optional[str], str], Tuple[float, Table]]:
+        """Return the tables reflected since the last call, with the time they
+        were reflected, to be merged into the cache of another process.
+
+        Returns:
+            Dict: The time of reflection and the table, by (schema, table).
+        """
+        with self._lock:
+            reflected, self._reflected = self._reflected, {}
+            return reflected
+
+    def merge(
+        self, reflected: Dict[Tuple[Optional[str], str], Tuple[float, Table]]
+    ) -> None:
+        """Add tables reflected by another process, see `take_reflected`.
+
+        Args:
+            reflected (Dict): The time of reflection and the table,
+            by (schema, table).
+        """
+        with self._lock:
+            self._load()
+            for key, (reflected_at, table) in reflected.items():
+                if self._reflected_at.get(key, 0) < reflected_at:
+                    self._store(key, table, reflected_at)
+
+    def invalidate(self, name: str, schema: str = None) -> None:
+        """Drop a table from the cache, for instance after pydwt materialized it.
+
+        Args:
+            name (str): The name of the table.
+            schema (str): The schema of the table.
+        """
+        with self._lock:
+            self._load()
+            self._reflected_at.pop((schema, name), None)
+            metadata = self._metadata.get(schema)
+            if metadata is not None:
+                table = metadata.tables.get(self._table_key(name, schema))
+                if table is not None:
+                    metadata.remove(table)
+            self._dirty = True
+
+    def clear(self) -> None:
+        """Drop every table from the cache."""
+        with self._lock:
+            self._metadata = {}
+            self._reflected_at = {}
+            self._loaded = True
+            self._dirty = True
+
+    def flush(self) -> None:
+        """Persist the cache to its file if it changed since it was loaded
+        or last persisted, called once a run is finished.
+
+        The cache only saves time: a failure to persist it is logged and
+        the run goes on.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                self.save()
+            except Exception as e:
+                logging.warning(f"can not persist metadata cache {self.path}: {e}")
+
+    def save(self) -> None:
+        """Persist the cache to its file, if any."""
+        if self.path is None:
+            return
+        with self._lock:
+            folder = os.path.dirname(self.path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            # A file of its own, two runs may save the same cache at once
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump((self._metadata, self._reflected_at), f)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+
+    def _load(self) -> None:
+        """Load the persisted cache on first use, expired tables are dropped."""
+        if self._loaded:
+            return
+        self._loaded = True
+        if self.path is None or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "rb") as f:
+                self._metadata, self._reflected_at = pickle.load(f)
+        except Exception as e:
+            logging.warning(f"can not load metadata cache {self.path}: {e}")
+            self._metadata, self._reflected_at = {}, {}
+            return
+        for schema, name in list(self._reflected_at):
+            if self._is_expired((schema, name)):
+                self.invalidate(name, schema)
+
+    def _store(
+        self, key: Tuple[Optional[str], str], table: Table, reflected_at: float
+    ) -> Table:
+        """Copy a reflected table to the shared metadata, replacing the
+        cached one. Called with the lock held."""
+        schema, name = key
+        metadata = self._metadata.setdefault(schema, MetaData(schema=schema))
+        previous = metadata.tables.get(self._table_key(name, schema))
+        if previous is not None:
+            metadata.remove(previous)
+        self._reflected_at[key] = reflected_at
+        self._dirty = True
+        return table.to_metadata(metadata)
+
+    def _cached(self, key: Tuple[Optional[str], str]) -> Optional[Table]:
+        """Return the cached table if it is not expired, otherwise None."""
+        schema, name = key
+        with self._lock:
+            self._load()
+            metadata = self._metadata.get(schema)
+            if metadata is None or self._is_expired(key):
+                return None
+            return metadata.tables.get(self._table_key(name, schema))
+
+    def _is_expired(self, key: Tuple[Optional[str], str]) -> bool:
+        reflected_at = self._reflected_at.get(key)
+        if reflected_at is None:
+            return True
+        if self.ttl_minutes is None:
+            return False
+        return time.time() - reflected_at >= self.ttl_minutes * 60
+
+    @staticmethod
+    def _table_key(name: str, schema: str = None) -> str:
+        return f"{schema}.{name}" if schema else name
@@ -0,0 +1,178 @@
+"""
+Module that provide the logical plan of a DataFrame.
+
+A plan is a single SELECT over one FROM clause: a projection, a list of
+filters and an optional DISTINCT. Consecutive projections and filters are
+merged in the same plan as long as the semantics allow it, otherwise the
+current plan is wrapped in a CTE and a new plan is started on top of it.
+SQL is only generated when the plan is executed.
+"""
+
+from __future__ import annotations
+
+from typing import List, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.sql import visitors
+from sqlalchemy.sql.elements import (
+    ColumnClause,
+    ColumnElement,
+    Label,
+    Over,
+    TextClause,
+)
+from sqlalchemy.sql.selectable import FromClause, Select
+from sqlalchemy.sql.util import ClauseAdapter
+
+
+def _is_textual(expr) -> bool:
+    """True if the expression refers to columns by name only
+    (text, literal_column or column without table)."""
+    for element in visitors.iterate(expr):
+        if isinstance(element, TextClause):
+            return True
+        if isinstance(element, ColumnClause) and element.table is None:
+            return True
+    return False
+
+
+def _has_window(expr) -> bool:
+    """True if the expression calls a window function."""
+    return any(isinstance(element, Over) for element in visitors.iterate(expr))
+
+
+class LogicalPlan(object):
+    """Logical plan of a DataFrame.
+
+    Args:
+        source (FromClause): FROM clause of the plan.
+        columns (List[Tuple[str, ColumnElement]]): Projection, as a list of
+        (name, expression).
+        filters (Tuple): Expressions of the WHERE clause.
+        distinct (bool): True to select only distinct rows.
+    """
+
+    def __init__(
+        self,
+        source: FromClause,
+        columns: List[Tuple[str, ColumnElement]],
+        filters: Tuple = (),
+        distinct: bool = False,
+    ) -> None:
+        self.source = source
+        self.columns = list(columns)
+        self.filters = tuple(filters)
+        self.distinct = distinct
+        self._from_clause = None
+
+    @classmethod
+    def scan(cls, source: FromClause) -> LogicalPlan:
+        """Create a plan selecting all the columns of a FROM clause."""
+        return cls(source, [(col.name, col) for col in source.columns])
+
+    @property
+    def names(self) -> List[str]:
+        """Names of the columns of the plan."""
+        return [name for name, _ in self.columns]
+
+    def is_scan(self) -> bool:
+        """True if the plan selects all the columns of its source as is."""
+        return (
+            not self.filters
+            and not self.distinct
+            and len(self.columns) == len(self.source.columns)
+            and all(
+                expr is col
+                for (_, expr), col in zip(self.columns, self.source.columns)
+            )
+        )
+
+    def is_pass_through(self) -> bool:
+        """True if every column of the projection is a column of the source
+        with an unchanged name, so names resolve the same before and after
+        the projection."""
+        source_columns = {id(col) for col in self.source.columns}
+        return all(
+            id(expr) in source_columns and expr.name == name
+            for name, expr in self.columns
+        )
+
+    def project(self, columns: List[Tuple[str, ColumnElement]]) -> LogicalPlan:
+        """Return a plan with a new projection.
+
+        Args:
+            columns (List[Tuple[str, ColumnElement]]): New projection, expressed
+            with the columns of this plan.
+        """
+        columns = [
+            (
+                name,
+                (
+                    expr.element.label(name)
+                    if isinstance(expr, Label) and expr.name != name
+                    else expr
+                ),
+            )
+            for name, expr in columns
+        ]
+        textual = any(_is_textual(expr) for _, expr in columns)
+        if self.distinct or (textual and not self.is_pass_through()):
+            plan = self.wrap()
+            columns = [(name, plan.adapt(expr)) for name, expr in columns]
+            return LogicalPlan(plan.source, columns)
+        return LogicalPlan(self.source, columns, self.filters)
+
+    def filter(self, expr) -> LogicalPlan:
+        """Return a plan with an additional filter.
+
+        Args:
+            expr: Filter, expressed with the columns of this plan.
+        """
+        if self.distinct or not self._can_merge_filter(expr):
+            plan = self.wrap()
+            return LogicalPlan(plan.source, plan.columns, [plan.adapt(expr)])
+        return LogicalPlan(self.source, self.columns, self.filters + (expr,))
+
+    def with_distinct(self) -> LogicalPlan:
+        """Return a plan selecting only distinct rows."""
+        return LogicalPlan(self.source, self.columns, self.filters, distinct=True)
+
+    def wrap(self) -> LogicalPlan:
+        """Return a plan scanning this plan as a CTE."""
+        return LogicalPlan.scan(self.to_from_clause())
+
+    def adapt(self, expr):
+        """Rewrite an expression on the columns of the source of the plan."""
+        return ClauseAdapter(self.source).traverse(expr)
+
+    def to_select(self) -> Select:
+        """Generate the SELECT statement of the plan."""
+        stmt = select(*self._labeled_columns()).select_from(self.source)
+        for expr in self.filters:
+            stmt = stmt.where(expr)
+        if self.distinct:
+            stmt = stmt.distinct()
+        return stmt
+
+    def to_from_clause(self) -> FromClause:
+        """Return the plan as a FROM clause: its source if the plan is a scan,
+        otherwise the SELECT of the plan as a CTE."""
+        if self.is_scan():
+            return self.source
+        if self._from_clause is None:
+            self._from_clause = self.to_select().cte()
+        return self._from_clause
+
+    def _labeled_columns(self) -> List[ColumnElement]:
+        return [
+            expr if getattr(expr, "name", None) == name else expr.label(name)
+            for name, expr in self.columns
+        ]
+
+    def _can_merge_filter(self, expr) -> bool:
+        """A filter can be added to the WHERE clause of the plan if it refers to
+        the same columns before and after the projection, and if the projection
+        has no window function (the WHERE clause is applied before them)."""
+        if _is_textual(expr) and not self.is_pass_through():
+            return False
+        return not any(_has_window(col) for _, col in self.columns)
@@ -1,17 +1,25 @@
 from typing import Any
 from sqlalchemy import select, Table, MetaData
+from pydwt.sql import dry_run
 from pydwt.sql.dataframe import DataFrame
+from pydwt.sql.metadata_cache import MetadataCache
 
 
 class Session:
-    def __init__(self, engine, schema: str = None):
+    def __init__(
+        self, engine, schema: str = None, metadata_cache: MetadataCache = None
+    ):
         """Initialize a new Session object.
 
         Args:
             engine: A SQLAlchemy engine object.
             schema (str): The schema of the database.
+            metadata_cache (MetadataCache): Optional cache of the reflected
+            tables, shared with other sessions.
         """
         self._engine = engine
+        self._schema = schema
+        self._metadata_cache = metadata_cache
         if schema:
             self._metadata = MetaData(schema=schema)
         else:
@@ -26,7 +34,11 @@ class Session:
         Returns:
             DataFrame: A new DataFrame object.
         """
-        t = Table(name, self._metadata, autoload_with=self._engine)
+        if self._metadata_cache is not None:
+            t = self._metadata_cache.table(self._engine, name, self._schema)
+        else:
+            with dry_run.reflecting():
+                t = Table(name, self._metadata, autoload_with=self._engine)
         base = select(t).cte()
         return DataFrame(base, self._engine)
 
@@ -0,0 +1,18 @@
+import multiprocessing
+
+from pydwt.core.task import Task
+
+
+@Task()
+def in_worker_process():
+    assert multiprocessing.parent_process() is not None
+
+
+@Task()
+def failing_model():
+    raise ValueError("fake error")
+
+
+@Task(depends_on=[failing_model])
+def after_failing_model():
+    pass
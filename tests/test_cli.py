@@ -15,6 +15,7 @@ def setup():
     yield None
     # clean up
     shutil.rmtree("my_project")
+    shutil.rmtree(".pydwt", ignore_errors=True)
     os.remove("settings.yml")
 
 
@@ -33,4 +34,24 @@ def test_export_dag(setup):
 def test_connection_testing(setup):
     runner = CliRunner()
     result = runner.invoke(app, ["test-connection"])
-    assert result.exit_code == 0
\ No newline at end of file
+    assert result.exit_code == 0
+
+
+def test_compile(setup):
+    runner = CliRunner()
+    result = runner.invoke(app, ["compile", "--sql"])
+    assert result.exit_code == 0
+    assert os.path.exists(".pydwt/compiled.json")
+
+
+def test_history(setup):
+    runner = CliRunner()
+    result = runner.invoke(app, ["history", "slowest"])
+    assert result.exit_code == 0
+
+
+def test_history_runs(setup):
+    runner = CliRunner()
+    result = runner.invoke(app, ["history", "runs"])
+    assert result.exit_code == 0
+    assert "started at" in result.output
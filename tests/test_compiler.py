@@ -0,0 +1,102 @@
+import sqlalchemy
+from sqlalchemy import create_engine
+
+from pydwt.core import compiler
+from pydwt.core.containers import Container
+from pydwt.core.schedule import Weekly
+from pydwt.core.task import Task
+from pydwt.sql.session import Session
+
+container = Container()
+container.wire(modules=["pydwt.core.task"])
+
+
+def raw_orders():
+    pass
+
+
+def orders():
+    pass
+
+
+def make_tasks():
+    task = Task(tags=["raw"])
+    task(raw_orders)
+    task2 = Task(depends_on=[raw_orders], runs_on=Weekly(weekday=2), pool="heavy")
+    task2(orders)
+    return [task, task2]
+
+
+def test_compile_tasks():
+    manifest = compiler.compile_tasks(make_tasks())
+    tasks = manifest["tasks"]
+
+    assert list(tasks) == [f"{__name__}.orders", f"{__name__}.raw_orders"]
+    entry = tasks[f"{__name__}.orders"]
+    assert entry["depends_on"] == [f"{__name__}.raw_orders"]
+    assert entry["schedule"] == {"type": "Weekly", "weekday": 2}
+    assert entry["pool"] == "heavy"
+    assert tasks[f"{__name__}.raw_orders"]["tags"] == ["raw"]
+
+
+def test_compile_tasks_does_not_run_them():
+    def writes():
+        raise AssertionError("a compiled task must not run")
+
+    task = Task()
+    task(writes)
+
+    manifest = compiler.compile_tasks([task])
+    assert manifest["tasks"][task.name]["module"] == __name__
+
+
+def test_compile_tasks_with_sql_dry_runs_them(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'warehouse.db'}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE orders (order_id INTEGER, amount INTEGER)")
+
+    def fact_orders():
+        with engine.begin() as conn:
+            conn.exec_driver_sql("DELETE FROM orders")
+        df = Session(engine).table("orders")
+        df.where(df.amount > 10).materialize("fact_orders", as_="table")
+
+    task = Task()
+    task(fact_orders)
+
+    entry = compiler.compile_tasks([task], sql=True)["tasks"][task.name]
+    assert entry["statements"] == ["DELETE FROM orders"]
+    [materialization] = entry["materializations"]
+    assert (materialization["name"], materialization["as"]) == ("fact_orders", "table")
+    assert "amount > 10" in materialization["sql"]
+    assert sqlalchemy.inspect(engine).get_table_names() == ["orders"]
+    engine.dispose()
+
+
+def test_compile_tasks_with_sql_keeps_what_failing_tasks_recorded(caplog):
+    def failing():
+        raise RuntimeError("no database")
+
+    task = Task()
+    task(failing)
+
+    entry = compiler.compile_tasks([task], sql=True)["tasks"][task.name]
+    assert entry["materializations"] == entry["statements"] == []
+    assert "dry run of task" in caplog.text
+
+
+def test_save_load_and_diff(tmp_path):
+    path = str(tmp_path / "compiled.json")
+    old = compiler.compile_tasks(make_tasks())
+    compiler.save(old, path)
+    assert compiler.load(path)["tasks"] == old["tasks"]
+
+    new = compiler.load(path)
+    del new["tasks"][f"{__name__}.raw_orders"]
+    new["tasks"][f"{__name__}.orders"]["tags"] = ["nightly"]
+    new["tasks"]["other"] = {}
+    assert compiler.diff(old, new) == {
+        "added": ["other"],
+        "removed": [f"{__name__}.raw_orders"],
+        "modified": [f"{__name__}.orders"],
+    }
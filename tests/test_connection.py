@@ -1,14 +1,94 @@
+import threading
+import time
+
 import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
 from pydwt.context.connection import Connection
 
+# Query counting forever, until cancelled
+INFINITE_QUERY = (
+    "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c) "
+    "SELECT count(*) FROM c"
+)
+
 
 def test_connection():
     args = {"url": "sqlite:///:memory:", "echo": True}
     conn = Connection(args)
     assert conn
 
+
 def test_connection_get_engine():
     args = {"url": "sqlite:///:memory:", "echo": True}
     conn = Connection(args)
     engine = conn.get_engine()
     assert engine.connect()
+
+
+def test_connection_get_engine_is_cached():
+    args = {"url": "sqlite:///:memory:"}
+    conn = Connection(args)
+    assert conn.get_engine() is conn.get_engine()
+
+
+def test_connection_pool_settings():
+    args = {"url": "sqlite:///:memory:", "pool": {"pre_ping": True, "recycle": 60}}
+    conn = Connection(args)
+    engine = conn.get_engine()
+    assert engine.pool._pre_ping
+    assert engine.pool._recycle == 60
+
+
+def test_connection_unsupported_pool_setting():
+    args = {"url": "sqlite:///:memory:", "pool": {"unknown": 1}}
+    conn = Connection(args)
+    with pytest.raises(ValueError):
+        conn.get_engine()
+
+
+def test_connection_pool_metrics(tmp_path):
+    args = {"url": f"sqlite:///{tmp_path / 'metrics.db'}"}
+    conn = Connection(args)
+    engine = conn.get_engine()
+    with engine.connect():
+        with engine.connect():
+            assert conn.metrics.in_use == 2
+    assert conn.metrics.checkouts == 2
+    assert conn.metrics.in_use == 0
+    assert conn.metrics.peak_in_use == 2
+
+
+def test_connection_dispose():
+    args = {"url": "sqlite:///:memory:"}
+    conn = Connection(args)
+    engine = conn.get_engine()
+    conn.dispose()
+    assert conn.engine is None
+    assert conn.get_engine() is not engine
+
+
+def test_connection_cancel_statement_of_thread(tmp_path):
+    conn = Connection({"url": f"sqlite:///{tmp_path / 'cancel.db'}"})
+    engine = conn.get_engine()
+    started = threading.Event()
+    errors = []
+
+    def long_query():
+        with engine.connect() as c:
+            started.set()
+            try:
+                c.execute(text(INFINITE_QUERY)).fetchall()
+            except OperationalError as e:
+                errors.append(e)
+
+    thread = threading.Thread(target=long_query, daemon=True)
+    thread.start()
+    started.wait()
+    time.sleep(0.2)
+    assert conn.cancel(thread.ident)
+    thread.join(5)
+
+    assert not thread.is_alive()
+    assert len(errors) == 1
+    assert not conn.cancel(thread.ident)
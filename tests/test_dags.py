@@ -176,3 +176,71 @@ def test_filter_dag():
         "tests.test_dags.fake_task_three",
         "tests.test_dags.fake_task_four",
     ]
+
+
+def test_build_dag_dependency_registered_later():
+    def fake_task_one():
+        pass
+
+    def fake_task_two():
+        pass
+
+    task2 = Task(depends_on=[fake_task_one])
+    task2(fake_task_two)
+
+    task1 = Task()
+    task1(fake_task_one)
+
+    dag = Dag()
+    dag.tasks = [task2, task1]
+    dag.build_dag()
+    assert list(dag.graph.nodes()) == [0, 1, "s"]
+    assert set(dag.graph.edges()) == {(1, 0), ("s", 1)}
+    assert dag.tasks[next(dag.graph.predecessors(0))] is task1
+
+
+def test_build_dag_rebuilds_from_scratch():
+    def fake_task_one():
+        pass
+
+    def fake_task_two():
+        pass
+
+    def fake_task_three():
+        pass
+
+    task1 = Task()
+    task1(fake_task_one)
+
+    task2 = Task()
+    task2(fake_task_two)
+
+    task3 = Task(depends_on=[fake_task_two])
+    task3(fake_task_three)
+
+    dag = Dag()
+    dag.tasks = [task1, task2, task3]
+    dag.build_dag()
+    dag.filter_dag(task_name="tests.test_dags.fake_task_three")
+
+    assert dag.node_names == {
+        0: "tests.test_dags.fake_task_two",
+        1: "tests.test_dags.fake_task_three",
+    }
+    assert set(dag.graph.edges()) == {(0, 1), ("s", 0)}
+
+
+def test_build_dag_unknown_dependency():
+    def fake_task_one():
+        pass
+
+    def fake_task_two():
+        pass
+
+    task2 = Task(depends_on=[fake_task_one])
+    task2(fake_task_two)
+
+    dag = Dag()
+    dag.tasks = [task2]
+    with pytest.raises(ValueError):
+        dag.build_dag()
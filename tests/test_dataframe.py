@@ -15,6 +15,7 @@ from pydwt.sql.session import Session
 import pytest
 import sqlalchemy
 from pydwt.sql.dataframe import DataFrame
+from pydwt.sql.materializations import incremental_statements, swap_statements
 
 
 # Define a fixture that creates a fake table using SQLite
@@ -209,3 +210,287 @@ def test_distinct_multi_col(session):
         (4, "Product E"),
         (5, "Product F"),
     ]
+
+
+def test_dataframe_chain_is_flattened(session):
+    df = session.table("users")
+    for i in range(10):
+        df = df.with_column(f"age_{i}", df.age + i)
+        df = df.where(df[f"age_{i}"] > i)
+        df = df.with_column_renamed(f"age_{i}", f"renamed_{i}")
+    df = df.drop("user_id")
+
+    sql = str(df._plan.to_select().compile())
+    assert sql.count(" AS \n(") == 1
+    assert len(df.collect()) == 5
+    assert df.columns[:2] == ["name", "age"]
+
+
+def test_dataframe_where_string_after_rename(session):
+    df = session.table("users")
+    df = df.with_column_renamed("age", "user_age")
+    df = df.with_column("age", literal_column("user_age") * 0)
+    df = df.where("age = 0")
+
+    assert len(df.collect()) == 5
+
+
+def test_dataframe_where_after_window_function(session):
+    df = session.table("users")
+    df = df.with_column("rank", func.row_number().over(order_by=df.age))
+    df = df.where(literal_column("age") > 30)
+
+    assert [row.rank for row in df.collect()] == [3, 4, 5]
+
+
+def test_dataframe_where_after_distinct(session):
+    df = session.table("products")
+    df = df.select("user_id").distinct().where("user_id > 3")
+
+    assert df.collect() == [(4,), (5,)]
+
+
+def test_dataframe_iter_batches(session):
+    df = session.table("users")
+    batches = list(df.iter_batches(batch_size=2))
+
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert [row for batch in batches for row in batch] == df.collect()
+
+
+def test_dataframe_iter_batches_invalid_size(session):
+    df = session.table("users")
+    with pytest.raises(ValueError):
+        next(df.iter_batches(batch_size=0))
+
+
+def test_dataframe_stream_closes_connection(session):
+    df = session.table("users").select("name")
+    checkins = []
+
+    def on_checkin(*args):
+        checkins.append(args)
+
+    sqlalchemy.event.listen(df._engine, "checkin", on_checkin)
+
+    rows = df.stream(batch_size=2)
+    assert next(rows) == ("Alice",)
+    assert checkins == []
+    rows.close()
+    assert len(checkins) == 1
+
+    sqlalchemy.event.remove(df._engine, "checkin", on_checkin)
+    assert [row.name for row in df.stream()][-1] == "Eve"
+
+
+def test_dataframe_to_arrow(session):
+    pa = pytest.importorskip("pyarrow")
+    df = session.table("users").with_column("age2", literal_column("age") * 2)
+    table = df.to_arrow(batch_size=2)
+
+    assert table.column_names == ["user_id", "name", "age", "age2"]
+    assert table.schema.field("user_id").type == pa.int64()
+    assert table.column("age2").to_pylist() == [50, 60, 70, 80, 90]
+
+
+def test_dataframe_to_arrow_empty(session):
+    pytest.importorskip("pyarrow")
+    df = session.table("users").where("age > 100")
+    table = df.to_arrow()
+
+    assert table.num_rows == 0
+    assert table.column_names == ["user_id", "name", "age"]
+
+
+def test_dataframe_to_pandas(session):
+    pytest.importorskip("pyarrow")
+    pytest.importorskip("pandas")
+    df = session.table("users").to_pandas(batch_size=2)
+
+    assert list(df.columns) == ["user_id", "name", "age"]
+    assert df["age"].sum() == 175
+
+
+def test_dataframe_to_parquet(session, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = str(tmp_path / "users.parquet")
+    session.table("users").to_parquet(path, batch_size=2)
+
+    assert pq.read_table(path).column("name").to_pylist() == [
+        "Alice",
+        "Bob",
+        "Charlie",
+        "David",
+        "Eve",
+    ]
+
+
+def test_dataframe_to_feather(session, tmp_path):
+    feather = pytest.importorskip("pyarrow.feather")
+    path = str(tmp_path / "users.feather")
+    session.table("users").to_feather(path, batch_size=2)
+
+    assert feather.read_table(path).num_rows == 5
+
+
+@pytest.mark.parametrize("export", ["to_arrow", "to_parquet", "to_feather"])
+def test_dataframe_arrow_column_null_in_first_batch(session, tmp_path, export):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    feather = pytest.importorskip("pyarrow.feather")
+    # Column of unknown type, null in the whole first batch
+    df = session.table("users").with_column(
+        "senior_age", literal_column("CASE WHEN age > 30 THEN age END")
+    )
+    path = str(tmp_path / "users")
+    if export == "to_arrow":
+        table = df.to_arrow(batch_size=2)
+    else:
+        getattr(df, export)(path, batch_size=2)
+        read = pq.read_table if export == "to_parquet" else feather.read_table
+        table = read(path)
+
+    assert table.schema.field("senior_age").type == pa.int64()
+    assert table.column("senior_age").to_pylist() == [None, None, 35, 40, 45]
+
+
+@pytest.fixture
+def events():
+    engine = create_engine("sqlite:///:memory:")
+    metadata = MetaData()
+    events = Table(
+        "events",
+        metadata,
+        Column("event_id", Integer),
+        Column("label", String),
+        Column("updated_at", Integer),
+    )
+    metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(
+            events.insert(),
+            [
+                {"event_id": 1, "label": "a", "updated_at": 1},
+                {"event_id": 2, "label": "b", "updated_at": 2},
+            ],
+        )
+    yield engine, events
+    engine.dispose()
+
+
+def test_dataframe_materialize_incremental(events):
+    engine, events = events
+    session = Session(engine)
+
+    session.table("events").materialize(
+        "events_history",
+        as_="incremental",
+        unique_key="event_id",
+        watermark="updated_at",
+    )
+    with engine.begin() as conn:
+        conn.execute(
+            events.update()
+            .where(events.c.event_id == 2)
+            .values(label="b2", updated_at=3)
+        )
+        conn.execute(events.insert().values(event_id=3, label="c", updated_at=3))
+    session.table("events").materialize(
+        "events_history",
+        as_="incremental",
+        unique_key="event_id",
+        watermark="updated_at",
+    )
+
+    history = Session(engine).table("events_history")
+    assert sorted(history.collect()) == [(1, "a", 1), (2, "b2", 3), (3, "c", 3)]
+
+
+def test_dataframe_materialize_incremental_unknown_watermark(session):
+    with pytest.raises(ValueError):
+        session.table("users").materialize(
+            "users_history", as_="incremental", watermark="x"
+        )
+
+
+def test_merge_into_compiles_for_oracle(session):
+    oracle = pytest.importorskip("sqlalchemy.dialects.oracle")
+    df = session.table("users")
+    statements = incremental_statements(
+        "users_history", df._plan.to_select(), ["user_id"], df.columns, oracle.dialect()
+    )
+    sql = str(statements[0].compile(dialect=oracle.dialect()))
+
+    assert sql.strip().startswith("MERGE INTO users_history pydwt_target")
+    assert "ON (pydwt_target.user_id = pydwt_new.user_id)" in sql
+    assert "UPDATE SET name = pydwt_new.name, age = pydwt_new.age" in sql
+
+
+def test_incremental_statements_without_merge(session):
+    postgresql = pytest.importorskip("sqlalchemy.dialects.postgresql")
+    dialect = postgresql.dialect()
+    dialect.server_version_info = (14, 5)
+    df = session.table("users")
+    statements = incremental_statements(
+        "users_history", df._plan.to_select(), ["user_id"], df.columns, dialect
+    )
+
+    assert [type(statement).__name__ for statement in statements] == [
+        "Delete",
+        "Insert",
+    ]
+
+
+def test_dataframe_materialize_table_swap(events):
+    engine, events = events
+    session = Session(engine)
+
+    session.table("events").materialize("events_copy", as_="table_swap")
+    with engine.begin() as conn:
+        conn.execute(events.insert().values(event_id=3, label="c", updated_at=3))
+    session.table("events").materialize("events_copy", as_="table_swap")
+
+    assert len(Session(engine).table("events_copy").collect()) == 3
+    assert sorted(sqlalchemy.inspect(engine).get_table_names()) == [
+        "events",
+        "events_copy",
+    ]
+
+
+def test_dataframe_materialize_table_swap_keeps_table_on_failure(events):
+    engine, _ = events
+    session = Session(engine)
+    session.table("events").materialize("events_copy", as_="table_swap")
+
+    df = session.table("events").select(text("unknown_column"))
+    with pytest.raises(sqlalchemy.exc.OperationalError):
+        df.materialize("events_copy", as_="table_swap")
+
+    assert len(Session(engine).table("events_copy").collect()) == 2
+    assert "events_copy__pydwt_tmp" not in sqlalchemy.inspect(engine).get_table_names()
+
+
+def test_swap_statements_with_native_swap():
+    snowflake = pytest.importorskip("snowflake.sqlalchemy")
+    statements = swap_statements(
+        "events", "events__pydwt_tmp", True, snowflake.snowdialect.dialect()
+    )
+
+    sql = [
+        str(statement.compile(dialect=snowflake.snowdialect.dialect()))
+        for statement in statements
+    ]
+    assert sql == [
+        "ALTER TABLE events SWAP WITH events__pydwt_tmp",
+        "DROP TABLE IF EXISTS events__pydwt_tmp",
+    ]
+
+
+def test_swap_statements_for_mysql():
+    mysql = pytest.importorskip("sqlalchemy.dialects.mysql")
+    statements = swap_statements("events", "events__pydwt_tmp", True, mysql.dialect())
+
+    assert str(statements[0].compile(dialect=mysql.dialect())) == (
+        "RENAME TABLE events TO events__pydwt_tmp__swap, "
+        "events__pydwt_tmp TO events, events__pydwt_tmp__swap TO events__pydwt_tmp"
+    )
@@ -0,0 +1,115 @@
+import os
+import sys
+
+import pytest
+
+from pydwt.core.containers import Container
+from pydwt.core.discovery import ModelManifest
+from pydwt.core.project import Project
+from pydwt.core.task import Task
+
+container = Container()
+container.wire(modules=["pydwt.core.task"])
+
+MODEL_ONE = """
+from pydwt.core.task import Task
+
+@Task(tags=["raw"])
+def one():
+    pass
+"""
+
+MODEL_TWO = """
+from pydwt.core.task import Task
+from {package}.models.one import one
+
+@Task(depends_on=[one])
+def two():
+    pass
+"""
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch, request):
+    # models/one.py and models/nested/two.py, two depends on one
+    package = f"discovery_{request.node.name}"
+    models = tmp_path / package / "models"
+    (models / "nested").mkdir(parents=True)
+    for folder in (tmp_path / package, models, models / "nested"):
+        (folder / "__init__.py").write_text("")
+    (models / "one.py").write_text(MODEL_ONE)
+    (models / "nested" / "two.py").write_text(MODEL_TWO.format(package=package))
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield package
+    forget_models(package)
+
+
+def forget_models(package):
+    for module in [module for module in sys.modules if module.startswith(package)]:
+        del sys.modules[module]
+
+
+def workflow():
+    # The workflow the tasks register to, from the last wired container
+    return Task().workflow
+
+
+def refresh(package, manifest):
+    return manifest.refresh(
+        os.path.join(package, "models"),
+        f"{package}.models",
+        workflow().tasks,
+    )
+
+
+def test_refresh_finds_nested_models(project):
+    manifest = ModelManifest(".pydwt/models.json")
+    entries = {entry.name: entry for entry in refresh(project, manifest)}
+
+    one, two = f"{project}.models.one.one", f"{project}.models.nested.two.two"
+    assert set(entries) == {one, two}
+    assert entries[two].depends_on_name == [one]
+    assert entries[one].tags == ["raw"]
+    assert os.path.exists(".pydwt/models.json")
+    assert manifest.modules([two]) == {f"{project}.models.nested.two"}
+
+
+def test_refresh_only_imports_changed_models(project):
+    refresh(project, ModelManifest(".pydwt/models.json"))
+    forget_models(project)
+
+    entries = refresh(project, ModelManifest(".pydwt/models.json"))
+    assert len(entries) == 2
+    assert f"{project}.models.one" not in sys.modules
+    assert f"{project}.models.nested.two" not in sys.modules
+
+    with open(os.path.join(project, "models", "nested", "two.py"), "a") as f:
+        f.write("\n# changed\n")
+    entries = refresh(project, ModelManifest(".pydwt/models.json"))
+    assert len(entries) == 2
+    assert f"{project}.models.nested.two" in sys.modules
+
+
+def test_refresh_drops_deleted_models(project):
+    manifest = ModelManifest(".pydwt/models.json")
+    refresh(project, manifest)
+    os.remove(os.path.join(project, "models", "nested", "two.py"))
+
+    entries = refresh(project, ModelManifest(".pydwt/models.json"))
+    assert [entry.name for entry in entries] == [f"{project}.models.one.one"]
+
+
+def test_project_plan_from_manifest(project):
+    proj = Project(
+        workflow=workflow(),
+        name=project,
+        manifest_path=".pydwt/models.json",
+    )
+    one, two = f"{project}.models.one.one", f"{project}.models.nested.two.two"
+    assert proj.plan() == [one, two]
+    forget_models(project)
+
+    assert proj.plan("+two") == [one, two]
+    assert proj.plan("tag:raw") == [one]
+    assert f"{project}.models.one" not in sys.modules
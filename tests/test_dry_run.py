@@ -0,0 +1,87 @@
+import os
+import threading
+
+import pytest
+import sqlalchemy
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, text
+
+from pydwt.sql.dry_run import dry_run
+from pydwt.sql.metadata_cache import MetadataCache
+from pydwt.sql.session import Session
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'warehouse.db'}")
+    metadata = MetaData()
+    users = Table(
+        "users",
+        metadata,
+        Column("user_id", Integer, primary_key=True),
+        Column("name", String),
+    )
+    metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(users.insert(), [{"user_id": 1, "name": "Alice"}])
+    yield engine
+    engine.dispose()
+
+
+def table_names(engine):
+    return sorted(sqlalchemy.inspect(engine).get_table_names())
+
+
+def test_dry_run_records_statements_without_executing_them(engine):
+    with dry_run() as recorded:
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE copy AS SELECT * FROM users"))
+            conn.exec_driver_sql("DROP TABLE users")
+
+    assert recorded.statements == [
+        "CREATE TABLE copy AS SELECT * FROM users",
+        "DROP TABLE users",
+    ]
+    assert table_names(engine) == ["users"]
+
+
+def test_dry_run_records_statements_of_other_threads(engine):
+    def drop():
+        with engine.begin() as conn:
+            conn.exec_driver_sql("DROP TABLE users")
+
+    with dry_run() as recorded:
+        thread = threading.Thread(target=drop)
+        thread.start()
+        thread.join()
+
+    assert recorded.statements == ["DROP TABLE users"]
+    assert table_names(engine) == ["users"]
+
+
+@pytest.mark.parametrize("metadata_cache", [None, MetadataCache()])
+def test_dry_run_reflects_and_records_materializations(engine, metadata_cache):
+    with dry_run() as recorded:
+        df = Session(engine, metadata_cache=metadata_cache).table("users")
+        df = df.where(df.user_id > 0)
+        assert df.materialize("active_users", as_="table_swap") is None
+
+    assert [(m["name"], m["as"]) for m in recorded.materializations] == [
+        ("active_users", "table_swap")
+    ]
+    assert "user_id > 0" in recorded.materializations[0]["sql"]
+    assert table_names(engine) == ["users"]
+
+
+def test_dry_run_stops_reads_before_writing_files(engine, tmp_path):
+    pytest.importorskip("pyarrow.parquet")
+    path = str(tmp_path / "users.parquet")
+    df = Session(engine).table("users")
+
+    with dry_run():
+        with pytest.raises(sqlalchemy.exc.ResourceClosedError):
+            df.collect()
+        with pytest.raises(sqlalchemy.exc.ResourceClosedError):
+            df.to_parquet(path)
+
+    assert not os.path.exists(path)
+    assert [row.name for row in df.collect()] == ["Alice"]
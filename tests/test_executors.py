@@ -1,11 +1,18 @@
+import asyncio
+import importlib
+import threading
+import time
 import unittest
 from pydwt.core.containers import Container
 from pydwt.core.task import Task
 from pydwt.core.dag import Dag
-from pydwt.core.executors import ThreadExecutor
+from pydwt.core.executors import AsyncExecutor, ProcessExecutor, ThreadExecutor
+from pydwt.core.scheduler import DependencyScheduler
+from pydwt.core.enums import Status
+from pydwt.core.retry import RetryPolicy
+from pydwt.core.workflow import Workflow
 import pytest
 
-
 container = Container()
 container.wire(modules=["pydwt.core.task"])
 
@@ -52,7 +59,9 @@ def test_thread_executor_runs_all_tasks(fake_task_one, fake_task_two):
     assert task._count_call == 1
 
 
-def test_thread_executor_no_when_parent_is_error(fake_task_one, fake_task_two, fake_task_three):
+def test_thread_executor_no_when_parent_is_error(
+    fake_task_one, fake_task_two, fake_task_three
+):
     task = Task(retry=2)
     task(fake_task_one)
 
@@ -75,3 +84,324 @@ def test_thread_executor_no_when_parent_is_error(fake_task_one, fake_task_two, f
 
     assert task2._count_call == 0
 
+
+def test_thread_executor_runs_children_of_long_parent():
+    order = []
+
+    def slow_parent():
+        time.sleep(0.2)
+        order.append("slow_parent")
+
+    def child():
+        order.append("child")
+
+    def grand_child():
+        order.append("grand_child")
+
+    task = Task()
+    task(slow_parent)
+    task2 = Task(depends_on=[slow_parent])
+    task2(child)
+    task3 = Task(depends_on=[child])
+    task3(grand_child)
+
+    tasks = [task3, task2, task]
+    dag = Dag()
+    dag.tasks = tasks
+    dag.build_dag()
+    executor = ThreadExecutor(dag, nb_workers=3)
+    executor.tasks = tasks
+    executor.run()
+
+    assert order == ["slow_parent", "child", "grand_child"]
+
+
+def test_thread_executor_propagates_error_to_descendants(
+    fake_task_one, fake_task_three
+):
+    def grand_child():
+        pass
+
+    task = Task()
+    task(fake_task_three)
+    task2 = Task(depends_on=[fake_task_three])
+    task2(fake_task_one)
+    task3 = Task(depends_on=[fake_task_one])
+    task3(grand_child)
+
+    tasks = [task, task2, task3]
+    dag = Dag()
+    dag.tasks = tasks
+    dag.build_dag()
+    executor = ThreadExecutor(dag)
+    executor.tasks = tasks
+    executor.run()
+
+    assert task.status == Status.ERROR
+    assert task2.status == Status.ERROR
+    assert task3.status == Status.ERROR
+    assert task2._count_call == 0
+    assert task3._count_call == 0
+
+
+def test_dependency_scheduler_releases_child_after_last_parent(
+    fake_task_one, fake_task_two
+):
+    def child():
+        pass
+
+    task = Task()
+    task(fake_task_one)
+    task2 = Task()
+    task2(fake_task_two)
+    task3 = Task(depends_on=[fake_task_one, fake_task_two])
+    task3(child)
+
+    tasks = [task, task2, task3]
+    dag = Dag()
+    dag.tasks = tasks
+    dag.build_dag()
+    scheduler = DependencyScheduler(dag, tasks)
+
+    assert scheduler.start() == [task, task2]
+    task.status = Status.SUCCESS
+    assert scheduler.finish(task) == []
+    task2.status = Status.SUCCESS
+    assert scheduler.finish(task2) == [task3]
+    assert not scheduler.finished
+    task3.status = Status.SUCCESS
+    scheduler.finish(task3)
+    assert scheduler.finished
+
+
+def test_dependency_scheduler_prioritizes_critical_path():
+    def short_task():
+        pass
+
+    def chain_head():
+        pass
+
+    def chain_tail():
+        pass
+
+    task = Task()
+    task(short_task)
+    task2 = Task()
+    task2(chain_head)
+    task3 = Task(depends_on=[chain_head])
+    task3(chain_tail)
+
+    tasks = [task, task2, task3]
+    dag = Dag()
+    dag.tasks = tasks
+    dag.build_dag()
+
+    assert DependencyScheduler(dag, tasks).start() == [task2, task]
+
+    durations = {task.name: 10.0, task2.name: 1.0, task3.name: 1.0}
+    scheduler = DependencyScheduler(dag, tasks, durations)
+    assert scheduler.start() == [task, task2]
+    assert scheduler.priority(task2) == 2.0
+
+
+def test_thread_executor_runs_critical_path_first():
+    order = []
+
+    def short_task():
+        order.append("short_task")
+
+    def chain_head():
+        order.append("chain_head")
+
+    def chain_tail():
+        order.append("chain_tail")
+
+    task = Task()
+    task(short_task)
+    task2 = Task()
+    task2(chain_head)
+    task3 = Task(depends_on=[chain_head])
+    task3(chain_tail)
+
+    tasks = [task, task2, task3]
+    dag = Dag()
+    dag.tasks = tasks
+    dag.build_dag()
+    executor = ThreadExecutor(dag, nb_workers=1)
+    executor.tasks = tasks
+    executor.run()
+
+    assert order == ["chain_head", "short_task", "chain_tail"]
+
+
+def test_process_executor_reports_status_to_parent_tasks():
+    importlib.import_module("tests.process_models")
+    tasks = [
+        task
+        for task in Task.workflow.tasks
+        if task.name.startswith("tests.process_models.")
+    ]
+    dag = Dag()
+    dag.tasks = tasks
+    dag.build_dag()
+    executor = ProcessExecutor(dag, nb_workers=2)
+    executor.tasks = tasks
+    executor.run()
+
+    status = {task.name.split(".")[-1]: task.status for task in tasks}
+    assert status == {
+        "in_worker_process": Status.SUCCESS,
+        "failing_model": Status.ERROR,
+        "after_failing_model": Status.ERROR,
+    }
+
+
+def test_container_selects_executor_from_settings():
+    process_container = Container()
+    process_container.config.from_dict({"executor": {"type": "process"}})
+    executor = process_container.executor_factory()
+
+    assert isinstance(executor, ProcessExecutor)
+    assert executor.nb_workers == 5
+    assert isinstance(container.executor_factory(), ThreadExecutor)
+
+
+def test_async_executor_awaits_async_tasks_concurrently():
+    tasks = []
+    for i in range(20):
+
+        async def wait_warehouse():
+            await asyncio.sleep(0.2)
+
+        wait_warehouse.__name__ = f"wait_warehouse_{i}"
+        task = Task()
+        task(wait_warehouse)
+        tasks.append(task)
+
+    dag = Dag()
+    dag.tasks = tasks
+    dag.build_dag()
+    executor = AsyncExecutor(dag, nb_workers=1)
+    executor.tasks = tasks
+
+    start = time.time()
+    executor.run()
+
+    assert time.time() - start < 1
+    assert all(task.status == Status.SUCCESS for task in tasks)
+
+
+def test_async_executor_runs_sync_tasks_and_propagates_error(
+    fake_task_one, fake_task_three
+):
+    async def async_child():
+        pass
+
+    task = Task()
+    task(fake_task_one)
+    task2 = Task()
+    task2(fake_task_three)
+    task3 = Task(depends_on=[fake_task_one, fake_task_three])
+    task3(async_child)
+
+    tasks = [task, task2, task3]
+    dag = Dag()
+    dag.tasks = tasks
+    dag.build_dag()
+    executor = AsyncExecutor(dag)
+    executor.tasks = tasks
+    executor.run()
+
+    assert task.status == Status.SUCCESS
+    assert task2.status == Status.ERROR
+    assert task3.status == Status.ERROR
+    assert task3._count_call == 0
+
+
+@pytest.mark.parametrize("executor_class", [ThreadExecutor, AsyncExecutor])
+def test_executor_runs_other_tasks_while_waiting_to_retry(executor_class):
+    order = []
+
+    def flaky_task():
+        order.append("flaky_task")
+        if order.count("flaky_task") == 1:
+            raise ConnectionError("connection reset")
+
+    def other_task():
+        order.append("other_task")
+
+    task = Task(retry=1, retry_policy=RetryPolicy(base_delay=0.2, jitter=0))
+    task(flaky_task)
+    task2 = Task()
+    task2(other_task)
+
+    tasks = [task, task2]
+    dag = Dag()
+    dag.tasks = tasks
+    dag.build_dag()
+    executor = executor_class(dag, nb_workers=1)
+    executor.tasks = tasks
+    executor.run()
+
+    assert order == ["flaky_task", "other_task", "flaky_task"]
+    assert task.status == Status.SUCCESS
+    assert task._count_call == 2
+
+
+@pytest.mark.parametrize("executor_class", [ThreadExecutor, AsyncExecutor])
+def test_executor_moves_on_without_hung_task(executor_class):
+    release = threading.Event()
+    order = []
+
+    def hung_task():
+        release.wait(10)
+
+    def after_hung_task():
+        order.append("after_hung_task")
+
+    def other_task():
+        order.append("other_task")
+
+    task = Task(timeout=0.1)
+    task(hung_task)
+    task2 = Task(depends_on=[hung_task])
+    task2(after_hung_task)
+    task3 = Task()
+    task3(other_task)
+
+    tasks = [task, task2, task3]
+    dag = Dag()
+    dag.tasks = tasks
+    dag.build_dag()
+    executor = executor_class(dag, nb_workers=1, cancel_grace=0.1)
+    executor.tasks = tasks
+    start = time.time()
+    executor.run()
+    release.set()
+
+    assert time.time() - start < 5
+    assert task.status == Status.ERROR
+    assert task2.status == Status.ERROR
+    assert order == ["other_task"]
+
+
+def test_workflow_deadline_stops_pending_tasks():
+    def slow_task():
+        time.sleep(0.3)
+
+    def next_task():
+        pass
+
+    dag = Dag()
+    workflow = Workflow(
+        dag=dag, executor=ThreadExecutor(dag, nb_workers=1), timeout=0.1
+    )
+    task = Task(workflow=workflow)
+    task(slow_task)
+    task2 = Task(workflow=workflow)
+    task2(next_task)
+    workflow.run()
+
+    assert task.status == Status.ERROR
+    assert task2.status == Status.ERROR
+    assert task2._count_call == 0
@@ -0,0 +1,61 @@
+import pytest
+
+from pydwt.core.dag import Dag
+from pydwt.core.discovery import TaskEntry
+from pydwt.core.executors import ThreadExecutor
+from pydwt.core.export import layout, to_dot, to_html, to_svg
+from pydwt.core.workflow import Workflow
+
+
+@pytest.fixture
+def dag():
+    # sales.orders -> sales.revenue <- crm.customers, sales.orders -> crm.customers
+    dag = Dag()
+    dag.tasks = [
+        TaskEntry("p.models.sales.orders"),
+        TaskEntry("p.models.crm.customers", ["p.models.sales.orders"]),
+        TaskEntry(
+            "p.models.sales.revenue",
+            ["p.models.sales.orders", "p.models.crm.customers"],
+        ),
+    ]
+    dag.build_dag()
+    return dag
+
+
+def test_layout_places_children_right_of_parents(dag):
+    positions = layout(dag)
+    orders, customers, revenue = (positions[i] for i in range(3))
+
+    # revenue is one level from the root orders, but right of customers
+    assert orders[0] < customers[0] < revenue[0]
+    assert orders[1] == customers[1] == revenue[1]
+
+
+def test_to_dot(dag):
+    dot = to_dot(dag)
+
+    assert dot.startswith("digraph pydwt {")
+    assert '"p.models.sales.orders" -> "p.models.sales.revenue";' in dot
+    assert dot.count("subgraph cluster_") == 2
+
+
+def test_to_svg_and_html(dag):
+    svg = to_svg(dag)
+    assert svg.count('<g class="node"') == 3
+    assert svg.count('<path class="edge"') == 3
+    assert 'class="module"' not in svg
+
+    page = to_html(dag)
+    assert page.count('<g class="module"') == 2
+    assert 'id="search"' in page
+    assert 'data-module="p.models.crm"' in page
+
+
+def test_workflow_export_dag(dag, tmp_path):
+    workflow = Workflow(dag=dag, executor=ThreadExecutor(dag))
+    workflow.export_dag(str(tmp_path / "dag.svg"), "svg")
+
+    assert (tmp_path / "dag.svg").read_text().startswith("<svg")
+    with pytest.raises(ValueError):
+        workflow.export_dag(str(tmp_path / "dag.pdf"), "pdf")
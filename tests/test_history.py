@@ -0,0 +1,91 @@
+from types import SimpleNamespace
+
+import pytest
+
+from pydwt.core.enums import Status
+from pydwt.core.history import RunHistory, percentile
+
+
+def fake_task(name, duration, status=Status.SUCCESS, row_count=None):
+    return SimpleNamespace(
+        name=name,
+        started_at=100.0,
+        ended_at=100.0 + duration,
+        _count_call=1,
+        status=status,
+        row_count=row_count,
+    )
+
+
+@pytest.fixture
+def history(tmp_path):
+    history = RunHistory(str(tmp_path / ".pydwt" / "history.db"))
+    for duration in [1.0, 2.0, 3.0, 4.0]:
+        history.record_run(
+            100.0,
+            110.0,
+            [fake_task("fast", duration), fake_task("slow", duration * 10)],
+        )
+    return history
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile([3.0], 95) == 3.0
+
+
+def test_run_history_durations(history):
+    assert history.durations() == {"fast": 2.5, "slow": 25.0}
+    assert history.durations(last_runs=1) == {"fast": 4.0, "slow": 40.0}
+
+
+def test_run_history_ignores_failed_runs(history):
+    history.record_run(100.0, 110.0, [fake_task("fast", 100.0, Status.ERROR)])
+    assert history.durations()["fast"] == 2.5
+
+
+def test_run_history_percentiles_and_slowest(history):
+    stats = history.percentiles()
+    assert [(stat.name, stat.runs, stat.p50, stat.p95) for stat in stats] == [
+        ("fast", 4, 2.0, 4.0),
+        ("slow", 4, 20.0, 40.0),
+    ]
+    assert [stat.name for stat in history.slowest(limit=1)] == ["slow"]
+
+
+def test_run_history_regressions(history):
+    history.record_run(100.0, 110.0, [fake_task("fast", 10.0), fake_task("slow", 30.0)])
+
+    regressions = history.regressions(threshold=2)
+    assert [(r.name, r.baseline, r.last) for r in regressions] == [("fast", 2.5, 10.0)]
+
+
+def test_run_history_disabled():
+    history = RunHistory()
+    assert history.record_run(100.0, 110.0, [fake_task("fast", 1.0)]) is None
+    assert history.durations() == {}
+
+
+def test_run_history_checkpoints_tasks(tmp_path):
+    history = RunHistory(str(tmp_path / "history.db"))
+    run_id = history.start_run(100.0)
+    history.checkpoint(run_id, fake_task("fast", 1.0))
+    history.checkpoint(run_id, fake_task("slow", 10.0, Status.ERROR))
+
+    assert history.task_statuses(run_id) == {"fast": "SUCCESS", "slow": "ERROR"}
+    assert history.runs()[0].ended_at is None
+
+    history.end_run(
+        run_id, 120.0, [fake_task("fast", 1.0), fake_task("slow", 10.0, Status.ERROR)]
+    )
+    summary = history.runs()[0]
+    assert (summary.run_id, summary.ended_at) == (run_id, 120.0)
+    assert (summary.succeeded, summary.failed) == (1, 1)
+    assert history.task_statuses(run_id) == {"fast": "SUCCESS", "slow": "ERROR"}
+
+
+def test_run_history_unknown_run(history):
+    with pytest.raises(ValueError):
+        history.task_statuses(42)
@@ -0,0 +1,66 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Budget of the cumulative import time of the CLI, in seconds, only checked
+# when PYDWT_CHECK_IMPORT_TIME is set: wall-clock time is not stable enough on
+# shared CI runners
+CLI_IMPORT_BUDGET = 0.6
+CHECK_IMPORT_TIME = bool(os.environ.get("PYDWT_CHECK_IMPORT_TIME"))
+
+# Dependencies only loaded by the commands that need them
+HEAVY_MODULES = ["matplotlib", "networkx", "sqlalchemy", "pandas", "pyarrow"]
+
+
+def run_python(*args):
+    return subprocess.run(
+        [sys.executable, *args], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+
+
+def cli_import_time() -> float:
+    """Return the cumulative import time of the CLI module, in seconds."""
+    result = run_python("-X", "importtime", "-c", "import pydwt.app")
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        _, cumulative, name = line.split("|")
+        if name.strip() == "pydwt.app":
+            return int(cumulative) / 1e6
+    raise AssertionError("pydwt.app not found in the import times")
+
+
+def test_cli_does_not_import_heavy_dependencies():
+    result = run_python(
+        "-c",
+        "import sys, pydwt.app; "
+        f"print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))",
+    )
+    assert result.stdout.split() == []
+
+
+@pytest.mark.skipif(
+    not CHECK_IMPORT_TIME, reason="set PYDWT_CHECK_IMPORT_TIME to check the budget"
+)
+def test_cli_import_time_budget():
+    # Best of a few runs, to leave out the cold file system cache
+    best = min(cli_import_time() for _ in range(3))
+    assert best < CLI_IMPORT_BUDGET, f"CLI imported in {best:.3f}s"
+
+
+def test_cli_loader_does_not_wire_pyarrow_and_pandas():
+    pytest.importorskip("pyarrow")
+    pytest.importorskip("pandas")
+    # Wiring their modules crashes the interpreter
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import pydwt.app, pyarrow.parquet, pandas, pyarrow.pandas_compat",
+        ],
+        cwd=ROOT,
+    )
+    assert result.returncode == 0
@@ -0,0 +1,143 @@
+import os
+import pickle
+import threading
+from unittest import mock
+
+import pytest
+from sqlalchemy import (
+    Column,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    create_engine,
+    event,
+)
+
+from pydwt.sql.metadata_cache import MetadataCache
+from pydwt.sql.session import Session
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite:///:memory:")
+    metadata = MetaData()
+    Table(
+        "users",
+        metadata,
+        Column("user_id", Integer, primary_key=True),
+        Column("name", String),
+    )
+    metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+def test_metadata_cache_reflects_once(engine):
+    cache = MetadataCache()
+    table = cache.table(engine, "users")
+
+    assert cache.table(mock.Mock(), "users") is table
+    assert [col.name for col in table.columns] == ["user_id", "name"]
+
+
+def test_metadata_cache_shared_by_sessions(engine):
+    cache = MetadataCache()
+    df1 = Session(engine, metadata_cache=cache).table("users")
+    df2 = Session(engine, metadata_cache=cache).table("users")
+
+    assert df1.columns == df2.columns == ["user_id", "name"]
+    assert list(cache._reflected_at) == [(None, "users")]
+
+
+def test_metadata_cache_invalidate(engine):
+    cache = MetadataCache()
+    table = cache.table(engine, "users")
+    cache.invalidate("users")
+
+    assert cache.table(engine, "users") is not table
+
+
+def test_metadata_cache_persisted(engine, tmp_path):
+    path = str(tmp_path / "cache" / "metadata.pickle")
+    cache = MetadataCache(path=path, ttl_minutes=60)
+    cache.table(engine, "users")
+    cache.flush()
+
+    table = MetadataCache(path=path, ttl_minutes=60).table(mock.Mock(), "users")
+    assert [col.name for col in table.columns] == ["user_id", "name"]
+
+
+def test_metadata_cache_persisted_expired(engine, tmp_path):
+    path = str(tmp_path / "metadata.pickle")
+    cache = MetadataCache(path=path, ttl_minutes=0)
+    cache.table(engine, "users")
+    cache.flush()
+
+    cache = MetadataCache(path=path, ttl_minutes=0)
+    with pytest.raises(Exception):
+        cache.table(mock.Mock(), "users")
+
+
+def test_metadata_cache_persisted_on_flush_only(engine, tmp_path):
+    path = tmp_path / "metadata.pickle"
+    cache = MetadataCache(path=str(path))
+    cache.table(engine, "users")
+    assert not path.exists()
+
+    cache.flush()
+    mtime = path.stat().st_mtime_ns
+    cache.table(engine, "users")
+    cache.flush()
+    assert path.stat().st_mtime_ns == mtime
+
+
+def test_metadata_cache_reflects_tables_concurrently(engine, tmp_path):
+    # A reflection blocked on the catalog does not block the other tables
+    cache = MetadataCache()
+    started, release = threading.Event(), threading.Event()
+    slow_engine = create_engine(f"sqlite:///{tmp_path / 'slow.db'}")
+    event.listen(
+        slow_engine, "connect", lambda *args: started.set() or release.wait(5)
+    )
+    blocked = threading.Thread(
+        target=lambda: pytest.raises(Exception, cache.table, slow_engine, "slow"),
+        daemon=True,
+    )
+    blocked.start()
+    assert started.wait(5)
+
+    assert [col.name for col in cache.table(engine, "users").columns] == [
+        "user_id",
+        "name",
+    ]
+    assert blocked.is_alive()
+    release.set()
+    blocked.join(5)
+    slow_engine.dispose()
+
+
+def test_metadata_cache_merges_tables_of_another_process(engine, tmp_path):
+    # A worker hands its reflected tables over, pickled like a future result
+    worker = MetadataCache(path=str(tmp_path / "metadata.pickle"))
+    worker.table(engine, "users")
+    reflected = pickle.loads(pickle.dumps(worker.take_reflected()))
+    assert worker.take_reflected() == {}
+    worker.flush()
+
+    parent = MetadataCache(path=str(tmp_path / "parent.pickle"))
+    parent.merge(reflected)
+    assert [col.name for col in parent.table(mock.Mock(), "users").columns] == [
+        "user_id",
+        "name",
+    ]
+    parent.flush()
+    assert os.path.exists(tmp_path / "parent.pickle")
+
+
+def test_metadata_cache_flush_failure_is_logged(engine, tmp_path, caplog):
+    cache = MetadataCache(path=str(tmp_path / "metadata.pickle"))
+    cache.table(engine, "users")
+    with mock.patch("pickle.dump", side_effect=OSError("disk full")):
+        cache.flush()
+    assert "can not persist metadata cache" in caplog.text
@@ -0,0 +1,103 @@
+import threading
+import time
+
+import pytest
+
+from pydwt.core.containers import Container
+from pydwt.core.dag import Dag
+from pydwt.core.enums import Status
+from pydwt.core.executors import AsyncExecutor, ThreadExecutor
+from pydwt.core.pools import ResourcePools
+from pydwt.core.task import Task
+
+container = Container()
+container.wire(modules=["pydwt.core.task"])
+
+
+def test_pool_slots_are_acquired_and_released():
+    pools = ResourcePools({"heavy": 3})
+    task = Task(pool="heavy", slots=2)
+    task2 = Task(pool="heavy", slots=2)
+    free_task = Task()
+
+    assert pools.acquire(task)
+    assert not pools.acquire(task2)
+    assert pools.acquire(free_task)
+    assert pools.used("heavy") == 2
+    pools.release(task)
+    assert pools.acquire(task2)
+
+
+def test_pool_check_rejects_tasks_never_dispatched():
+    def unknown_pool_task():
+        pass
+
+    def too_large_task():
+        pass
+
+    task = Task(pool="unknown")
+    task(unknown_pool_task)
+    task2 = Task(pool="heavy", slots=3)
+    task2(too_large_task)
+
+    with pytest.raises(ValueError):
+        ResourcePools({"heavy": 2}).check([task])
+    with pytest.raises(ValueError):
+        ResourcePools({"heavy": 2}).check([task2])
+
+
+@pytest.mark.parametrize("slots", [0, -1])
+def test_pool_check_rejects_tasks_without_slots(slots):
+    def no_slot_task():
+        pass
+
+    task = Task(pool="heavy", slots=slots)
+    task(no_slot_task)
+
+    with pytest.raises(ValueError, match="at least 1"):
+        ResourcePools({"heavy": 2}).check([task])
+
+
+@pytest.mark.parametrize("executor_class", [ThreadExecutor, AsyncExecutor])
+def test_executor_respects_pool_slots(executor_class):
+    lock = threading.Lock()
+    running = []
+    peak = []
+
+    def make_heavy_task(name):
+        def heavy_task():
+            with lock:
+                running.append(name)
+                peak.append(len(running))
+            time.sleep(0.05)
+            with lock:
+                running.remove(name)
+
+        heavy_task.__name__ = name
+        return heavy_task
+
+    tasks = []
+    for i in range(6):
+        task = Task(pool="heavy", slots=2)
+        task(make_heavy_task(f"heavy_task_{i}"))
+        tasks.append(task)
+
+    dag = Dag()
+    dag.tasks = tasks
+    dag.build_dag()
+    executor = executor_class(dag, nb_workers=6, pools=ResourcePools({"heavy": 4}))
+    executor.tasks = tasks
+    executor.run()
+
+    assert all(task.status == Status.SUCCESS for task in tasks)
+    assert max(peak) == 2
+    assert executor.pools.used("heavy") == 0
+
+
+def test_container_builds_pools_from_settings():
+    pools_container = Container()
+    pools_container.config.from_dict({"pools": {"warehouse_heavy": 2}})
+    executor = pools_container.executor_factory()
+
+    assert executor.pools.pools == {"warehouse_heavy": 2}
+    assert executor.pools is pools_container.pools()
@@ -0,0 +1,32 @@
+from unittest import mock
+
+from pydwt.core.retry import RetryPolicy
+
+
+def test_retry_policy_delay_is_exponential():
+    policy = RetryPolicy(base_delay=1.0, multiplier=2.0, max_delay=60.0, jitter=0)
+
+    assert [policy.delay(attempt) for attempt in range(1, 5)] == [1.0, 2.0, 4.0, 8.0]
+
+
+def test_retry_policy_delay_is_capped():
+    policy = RetryPolicy(base_delay=1.0, multiplier=10.0, max_delay=30.0, jitter=0)
+
+    assert policy.delay(3) == 30.0
+
+
+def test_retry_policy_jitter_reduces_delay():
+    policy = RetryPolicy(base_delay=10.0, jitter=0.5)
+
+    with mock.patch("pydwt.core.retry.random.random", return_value=1.0):
+        assert policy.delay(1) == 5.0
+    with mock.patch("pydwt.core.retry.random.random", return_value=0.0):
+        assert policy.delay(1) == 10.0
+
+
+def test_retry_policy_retried_errors():
+    policy = RetryPolicy(retry_on=(OSError,), no_retry_on=(FileNotFoundError,))
+
+    assert policy.should_retry(ConnectionError())
+    assert not policy.should_retry(FileNotFoundError())
+    assert not policy.should_retry(ValueError())
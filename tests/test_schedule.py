@@ -75,3 +75,50 @@ def test_is_not_schedule_last_open_day_in_month():
     s = MonthlyLastOpenDayInMonth()
     for d in dates:
         assert not s.is_scheduled(d)
+
+
+def test_run_dates_are_memoized_by_schedule_and_month():
+    calls = []
+
+    class CountingMonthly(Monthly):
+        def month_run_dates(self, year, month):
+            calls.append((year, month))
+            return super().month_run_dates(year, month)
+
+    first, second = CountingMonthly(weekday=2), CountingMonthly(weekday=2)
+    assert first.is_scheduled(datetime.datetime(2024, 5, 1))
+    assert not second.is_scheduled(datetime.datetime(2024, 5, 8))
+    assert CountingMonthly(weekday=3).is_scheduled(datetime.date(2024, 5, 2))
+    assert calls == [(2024, 5), (2024, 5)]
+
+
+def test_next_run_after_lists_a_year():
+    schedule = MonthlyLastOpenDayInMonth()
+    runs = []
+    date = datetime.date(2022, 12, 31)
+    while True:
+        date = schedule.next_run_after(date)
+        if date.year > 2023:
+            break
+        runs.append(date)
+
+    assert len(runs) == 12
+    assert runs[0] == datetime.date(2023, 1, 31)
+    assert runs[8] == datetime.date(2023, 9, 29)
+    assert Weekly(weekday=0).next_run_after(datetime.date(2023, 1, 2)) == (
+        datetime.date(2023, 1, 9)
+    )
+    assert SemiMonthly(weekday=0).next_run_after(datetime.date(2023, 1, 2)) == (
+        datetime.date(2023, 1, 16)
+    )
+
+
+def test_custom_schedule_run_dates_use_is_scheduled():
+    class FirstOfMonth(ScheduleInterface):
+        def is_scheduled(self, date=None):
+            return date.day == 1
+
+    assert FirstOfMonth().run_dates(2023, 2) == {datetime.date(2023, 2, 1)}
+    assert FirstOfMonth().next_run_after(datetime.date(2023, 2, 1)) == (
+        datetime.date(2023, 3, 1)
+    )
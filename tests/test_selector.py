@@ -0,0 +1,93 @@
+import pytest
+
+from pydwt.core.containers import Container
+from pydwt.core.dag import Dag
+from pydwt.core.selector import Atom, parse, select_tasks
+from pydwt.core.task import Task
+
+container = Container()
+container.wire(modules=["pydwt.core.task"])
+
+
+@pytest.fixture
+def dag():
+    # raw_orders -> orders -> revenue, raw_customers -> customers -> revenue
+    def raw_orders():
+        pass
+
+    def orders():
+        pass
+
+    def raw_customers():
+        pass
+
+    def customers():
+        pass
+
+    def revenue():
+        pass
+
+    task = Task(tags=["raw"])
+    task(raw_orders)
+    task2 = Task(depends_on=[raw_orders], tags=["nightly"])
+    task2(orders)
+    task3 = Task(tags=["raw"])
+    task3(raw_customers)
+    task4 = Task(depends_on=[raw_customers])
+    task4(customers)
+    task5 = Task(depends_on=[orders, customers], tags=["nightly"])
+    task5(revenue)
+
+    dag = Dag()
+    dag.tasks = [task, task2, task3, task4, task5]
+    dag.build_dag()
+    return dag
+
+
+def short_names(names):
+    return {name.rsplit(".", 1)[-1] for name in names}
+
+
+def test_parse_selector():
+    assert parse("+orders tag:nightly,customers+") == [
+        [Atom("orders", ancestors=True)],
+        [Atom("tag:nightly"), Atom("customers", descendants=True)],
+    ]
+    with pytest.raises(ValueError):
+        parse("  ")
+    with pytest.raises(ValueError):
+        parse("orders,+")
+
+
+@pytest.mark.parametrize(
+    "selector, expected",
+    [
+        ("orders", {"orders"}),
+        ("orders+", {"orders", "revenue"}),
+        ("+orders", {"raw_orders", "orders"}),
+        ("+orders+", {"raw_orders", "orders", "revenue"}),
+        ("tag:raw", {"raw_orders", "raw_customers"}),
+        ("orders customers", {"orders", "customers"}),
+        ("tag:nightly,+revenue", {"orders", "revenue"}),
+        ("raw_customers+,+orders", set()),
+        ("test_selector.orders", {"orders"}),
+        ("tag:unknown", set()),
+    ],
+)
+def test_select_tasks(dag, selector, expected):
+    assert short_names(select_tasks(dag, selector)) == expected
+
+
+def test_select_unknown_task(dag):
+    with pytest.raises(ValueError):
+        select_tasks(dag, "unknown+")
+
+
+def test_dag_select_skips_unselected_dependencies(dag):
+    dag.select("customers+")
+
+    assert short_names(task.name for task in dag.tasks) == {"customers", "revenue"}
+    revenue = dag.node_index["tests.test_selector.revenue"]
+    customers = dag.node_index["tests.test_selector.customers"]
+    assert set(dag.graph.predecessors(revenue)) == {customers}
+    assert set(dag.graph.predecessors(customers)) == {dag.source}
@@ -0,0 +1,99 @@
+from unittest import mock
+
+from pydwt.core.containers import Container
+from pydwt.core.dag import Dag
+from pydwt.core.enums import Status
+from pydwt.core.executors import ThreadExecutor
+from pydwt.core.state import RunState
+from pydwt.core.task import Task
+from pydwt.core.workflow import Workflow
+
+container = Container()
+container.database_client.override(mock.Mock())
+container.wire(modules=["pydwt.core.task"])
+
+
+def make_workflow(state, config, ttl_minutes=None):
+    def fake_parent():
+        pass
+
+    def fake_child():
+        pass
+
+    dag = Dag()
+    workflow = Workflow(
+        dag=dag, executor=ThreadExecutor(dag), state=state, skip_unchanged=True
+    )
+    parent = Task(workflow=workflow, config=config, ttl_minutes=ttl_minutes)
+    parent(fake_parent)
+    child = Task(depends_on=[fake_parent], workflow=workflow, config=config)
+    child(fake_child)
+    return workflow, parent, child
+
+
+def test_unchanged_tasks_are_skipped(tmp_path):
+    path = str(tmp_path / "state.json")
+    config = {"tasks": {"fake_parent": {"materialize": "table"}}}
+
+    workflow, parent, child = make_workflow(RunState(path), config)
+    workflow.run()
+    assert parent.status == child.status == Status.SUCCESS
+
+    workflow, parent, child = make_workflow(RunState(path), config)
+    workflow.run()
+    assert parent.status == child.status == Status.SKIPPED
+    assert parent._count_call == child._count_call == 0
+
+
+def test_changed_parent_runs_its_children(tmp_path):
+    path = str(tmp_path / "state.json")
+    workflow, _, _ = make_workflow(
+        RunState(path), {"tasks": {"fake_parent": {"materialize": "table"}}}
+    )
+    workflow.run()
+
+    workflow, parent, child = make_workflow(
+        RunState(path), {"tasks": {"fake_parent": {"materialize": "view"}}}
+    )
+    workflow.run()
+    assert parent.status == child.status == Status.SUCCESS
+    assert parent._count_call == child._count_call == 1
+
+
+def test_tasks_run_without_skip_unchanged(tmp_path):
+    path = str(tmp_path / "state.json")
+    workflow, _, _ = make_workflow(RunState(path), {})
+    workflow.run()
+
+    workflow, parent, child = make_workflow(RunState(path), {})
+    workflow.skip_unchanged = False
+    workflow.run()
+    assert parent._count_call == child._count_call == 1
+    assert RunState(path).get(child.name)["last_success"] == child.ended_at
+
+
+def test_task_within_ttl_is_skipped(tmp_path):
+    path = str(tmp_path / "state.json")
+    workflow, _, _ = make_workflow(RunState(path), {}, ttl_minutes=60)
+    workflow.run()
+
+    workflow, parent, child = make_workflow(RunState(path), {}, ttl_minutes=60)
+    workflow.skip_unchanged = False
+    workflow.run()
+    assert parent.status == Status.SKIPPED
+    assert parent._count_call == 0
+    assert child.status == Status.SUCCESS
+
+
+def test_task_past_ttl_is_run(tmp_path):
+    path = str(tmp_path / "state.json")
+    workflow, parent, _ = make_workflow(RunState(path), {}, ttl_minutes=60)
+    workflow.run()
+    state = RunState(path)
+    state.get(parent.name)
+    state._tasks[parent.name]["last_success"] -= 3600
+
+    workflow, parent, _ = make_workflow(state, {}, ttl_minutes=60)
+    workflow.skip_unchanged = False
+    workflow.run()
+    assert parent.status == Status.SUCCESS
@@ -1,9 +1,17 @@
+import asyncio
+import datetime
+import time
+
 from pydwt.core.task import Task
 import pytest
 from unittest import mock
+from sqlalchemy import text
+from pydwt.context.connection import Connection
 from pydwt.core.containers import Container
 from pydwt.core.schedule import Monthly
 from pydwt.core.enums import Status
+from pydwt.core.retry import RetryPolicy
+from tests.test_connection import INFINITE_QUERY
 
 
 container = Container()
@@ -58,6 +66,15 @@ def test_task_not_scheduled(fake_task_one):
     task.run()
     assert task._count_call == 0
 
+
+def test_task_scheduled_at_run_date_of_workflow(fake_task_one):
+    # 2026-10-05 is the first Monday of the month
+    workflow = mock.Mock(run_date=datetime.datetime(2026, 10, 5, 23, 59), deadline=None)
+    task = Task(runs_on=Monthly(), workflow=workflow)
+    task(fake_task_one)
+    task.run()
+    assert task._count_call == 1
+
 def test_task_is_scheduled(fake_task_one):
     task = Task()
     task(fake_task_one)
@@ -87,4 +104,85 @@ def test_task_status_success(fake_task_one):
     task(fake_task_one)
     task.run()
 
-    assert task.status == Status.SUCCESS
\ No newline at end of file
+    assert task.status == Status.SUCCESS
+
+
+def test_task_run_async_function():
+    calls = []
+
+    async def inner_func_async():
+        calls.append(1)
+
+    task = Task()
+    task(inner_func_async)
+    task.run()
+
+    assert task.is_async
+    assert calls == [1]
+    assert task.status == Status.SUCCESS
+
+
+def test_task_retries_after_policy_delay():
+    calls = []
+
+    def flaky_task():
+        calls.append(1)
+        if len(calls) < 3:
+            raise ConnectionError("connection reset")
+
+    task = Task(retry=3, retry_policy=RetryPolicy(base_delay=0.5, jitter=0))
+    task(flaky_task)
+    with mock.patch("pydwt.core.task.time.sleep") as sleep:
+        task.run()
+
+    assert task.status == Status.SUCCESS
+    assert task._count_call == 3
+    assert [c.args[0] for c in sleep.call_args_list] == [0.5, 1.0]
+
+
+def test_task_no_retry_on_error(fake_task_three):
+    task = Task(retry=3, retry_policy=RetryPolicy(no_retry_on=(ValueError,)))
+    task(fake_task_three)
+    task.run()
+
+    assert task.status == Status.ERROR
+    assert task._count_call == 1
+
+
+def test_task_timeout_cancels_statement(tmp_path):
+    connection = Connection({"url": f"sqlite:///{tmp_path / 'timeout.db'}"})
+    workflow = mock.Mock(connection=connection, deadline=None, state=None)
+
+    def hung_query():
+        with connection.get_engine().connect() as conn:
+            conn.execute(text(INFINITE_QUERY)).fetchall()
+
+    task = Task(retry=2, timeout=0.2, workflow=workflow)
+    task(hung_query)
+    task.run()
+
+    assert task.status == Status.ERROR
+    assert task._count_call == 1
+    assert task.ended_at - task.started_at < 5
+
+
+def test_async_task_timeout():
+    async def hung_task():
+        await asyncio.sleep(10)
+
+    task = Task(timeout=0.1, workflow=mock.Mock(deadline=None, state=None))
+    task(hung_task)
+    asyncio.run(task.arun())
+
+    assert task.status == Status.ERROR
+    assert task.ended_at - task.started_at < 5
+
+
+def test_task_not_run_after_workflow_deadline(fake_task_one):
+    workflow = mock.Mock(deadline=time.time(), state=None)
+    task = Task(workflow=workflow)
+    task(fake_task_one)
+    task.run()
+
+    assert task.status == Status.ERROR
+    assert task._count_call == 0
@@ -0,0 +1,114 @@
+from unittest import mock
+
+from pydwt.core.containers import Container
+from pydwt.core.dag import Dag
+from pydwt.core.enums import Status
+from pydwt.core.executors import ThreadExecutor
+from pydwt.core.history import RunHistory
+from pydwt.core.task import Task
+from pydwt.core.workflow import Workflow
+
+
+container = Container()
+container.database_client.override(mock.Mock())
+container.wire(modules=["pydwt.core.task"])
+
+
+def test_workflow_run_disposes_connection():
+    def fake_task_one():
+        pass
+
+    connection = mock.Mock()
+    dag = Dag()
+    workflow = Workflow(dag=dag, executor=ThreadExecutor(dag), connection=connection)
+    task = Task(workflow=workflow)
+    task(fake_task_one)
+    workflow.run()
+
+    assert task.status == Status.SUCCESS
+    connection.dispose.assert_called_once()
+
+
+def test_workflow_run_records_history(tmp_path):
+    def fake_task_two():
+        return 42
+
+    dag = Dag()
+    history = RunHistory(str(tmp_path / "history.db"))
+    workflow = Workflow(dag=dag, executor=ThreadExecutor(dag), history=history)
+    task = Task(workflow=workflow)
+    task(fake_task_two)
+    workflow.run()
+    workflow.run()
+
+    assert task.row_count == 42
+    assert list(history.durations()) == ["tests.test_workflow.fake_task_two"]
+    assert list(workflow.executor.durations) == ["tests.test_workflow.fake_task_two"]
+
+
+def test_workflow_resume_runs_tasks_that_did_not_succeed(tmp_path):
+    history = RunHistory(str(tmp_path / "history.db"))
+    fail = [True]
+
+    def make_workflow():
+        def extract():
+            pass
+
+        def transform():
+            if fail[0]:
+                raise ValueError("fake error")
+
+        def load():
+            pass
+
+        dag = Dag()
+        workflow = Workflow(dag=dag, executor=ThreadExecutor(dag), history=history)
+        tasks = [Task(workflow=workflow)]
+        tasks[0](extract)
+        tasks.append(Task(depends_on=[extract], workflow=workflow))
+        tasks[1](transform)
+        tasks.append(Task(depends_on=[transform], workflow=workflow))
+        tasks[2](load)
+        return workflow, tasks
+
+    workflow, _ = make_workflow()
+    workflow.run()
+    failed_run_id = workflow.run_id
+    assert history.task_statuses(failed_run_id) == {
+        "tests.test_workflow.extract": "SUCCESS",
+        "tests.test_workflow.transform": "ERROR",
+        "tests.test_workflow.load": "ERROR",
+    }
+
+    fail[0] = False
+    workflow, (extract, transform, load) = make_workflow()
+    workflow.resume(failed_run_id)
+
+    assert extract._count_call == 0
+    assert transform._count_call == load._count_call == 1
+    assert extract.status == transform.status == load.status == Status.SUCCESS
+    assert workflow.run_id != failed_run_id
+
+
+def test_workflow_run_selection_runs_downstream_tasks():
+    def upstream():
+        pass
+
+    def fixed_model():
+        pass
+
+    def downstream():
+        pass
+
+    dag = Dag()
+    workflow = Workflow(dag=dag, executor=ThreadExecutor(dag))
+    task = Task(workflow=workflow)
+    task(upstream)
+    task2 = Task(depends_on=[upstream], workflow=workflow)
+    task2(fixed_model)
+    task3 = Task(depends_on=[fixed_model], workflow=workflow)
+    task3(downstream)
+    workflow.run_selection("fixed_model+")
+
+    assert task._count_call == 0
+    assert task2.status == task3.status == Status.SUCCESS